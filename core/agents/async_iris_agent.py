@@ -0,0 +1,139 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from core.agents.iris_agent import (IRISAgent, build_gemini_config, compact_tools, load_client_pool,
+                                     load_context_budget, load_response_cache, load_tool_executor)
+from core.tools.wrappers import make_async_tools
+from core.utils.logger import get_logger
+
+def prepare_async_tools(config: dict, tools: list, executor: ThreadPoolExecutor = None) -> list:
+    """Compact `tools` as configured and make them awaitable, running synchronous ones on `executor`."""
+    return make_async_tools(compact_tools(config, tools), executor)
+
+class AsyncIRISAgent(IRISAgent):
+    """
+    asyncio-native IRISAgent. Each instance is one conversation; many instances can share
+    one genai.Client and one tool executor and be driven concurrently from a single event loop.
+
+    Status handling, fallback hand-over and reset_chat are inherited from IRISAgent.
+    """
+    def __init__(self, system_prompt: str, memory, config: dict, tools: list = None,
+                 client=None, executor: ThreadPoolExecutor = None, response_cache=None, chat_state=None,
+                 prepared_tools: list = None, tool_executor=None):
+        """
+        Parameters:
+            system_prompt (str): The system prompt guiding the agent.
+            memory: A list-like conversation log; defaults to a deque bounded by memory.agent_log_limit.
+            config (dict): Configuration dictionary with model settings.
+            tools (list): Tool callables; synchronous ones are run on `executor`.
+            client (genai.Client): Optional client shared between sessions.
+            executor (ThreadPoolExecutor): Optional pool for synchronous tools, shared between sessions.
+            response_cache (ResponseCache): Optional cache shared between sessions; when omitted one is
+                built from the response_cache config section.
+            chat_state (ChatStateStore): Optional store for the model-side history, as for IRISAgent.
+            prepared_tools (list): Tools already compacted and made async (see prepare_async_tools),
+                shared between sessions; they are used as they are, ahead of `tools`.
+            tool_executor (ToolExecutor): Optional executor shared between sessions; the agent uses
+                a copy bound to its own tools. One is built from the tool_execution config when omitted.
+        """
+        self.logger = get_logger()
+        log_limit = config.get("memory", {}).get("agent_log_limit", 200)
+        self.memory = memory if memory is not None else deque(maxlen=log_limit)
+        self.config = config
+        self.system_prompt = system_prompt
+        self.executor = executor
+        self.tools = list(prepared_tools or []) + self._prepare_tools(tools or [])
+        if tool_executor is not None:
+            self.tool_executor = tool_executor.bind(self.tools, self._handle_tool_status)
+        else:
+            self.tool_executor = load_tool_executor(config.get("tool_execution", {}), self.tools,
+                                                    self._handle_tool_status)
+        gemini_config = build_gemini_config(system_prompt, config, self.tools,
+                                            manual_function_calling=self.tool_executor is not None)
+        if response_cache is None:
+            response_cache = load_response_cache(config.get("response_cache", {}), self.tools)
+        self.response_cache = response_cache
+        self.client_pool = load_client_pool(config, gemini_config, asynchronous=True,
+                                            client=client, response_cache=response_cache,
+                                            context_budget=load_context_budget(config.get("context_budget", {})),
+                                            tool_executor=self.tool_executor)
+        self.gemini_agent = self.client_pool.primary
+        self.chat_state = chat_state
+        self._history_restored = False
+        self.status_callback = None
+        self.client_pool.set_status_callback(self._handle_status_update)
+
+    def _prepare_tools(self, tools: list) -> list:
+        return prepare_async_tools(self.config, tools, self.executor)
+
+    async def send_message(self, message: str) -> str:
+        """
+        Send a user's message to Gemini, log the conversation in memory, and return the response.
+
+        Fallback and circuit breaking work as in IRISAgent.send_message.
+
+        Parameters:
+            message (str): The user's query.
+
+        Returns:
+            str: The agent's response.
+        """
+        self.memory.append(f"User: {message}")
+        self._handle_status_update("Processing your message...")
+        self._restore_history()
+        history = self.gemini_agent.get_history()
+        error = None
+        for attempt, entry in enumerate(self.client_pool.route()):
+            session = self._prepare_session(entry, attempt, history)
+            try:
+                response = await session.send_message(message)
+                if isinstance(response, str) and response.startswith("Error"):
+                    raise Exception(response)
+            except Exception as e:
+                entry.breaker.record_failure()
+                self.logger.error(f"[AsyncIRISAgent] Gemini error during send_message on {entry.model}.")
+                error = e
+                continue
+            entry.breaker.record_success()
+            self._finish_session(session, response)
+            return response
+        return self._fail(history, error)
+
+    async def send_message_stream(self, message: str):
+        """
+        Send a user's message to Gemini and yield the response text as it is generated.
+
+        If a model fails before producing any text the next model in the client pool is
+        streamed instead, continuing from the same history.
+
+        Parameters:
+            message (str): The user's query.
+
+        Yields:
+            str: Response text chunks, in order.
+        """
+        self.memory.append(f"User: {message}")
+        self._handle_status_update("Processing your message...")
+        self._restore_history()
+        history = self.gemini_agent.get_history()
+        error = None
+        for attempt, entry in enumerate(self.client_pool.route()):
+            session = self._prepare_session(entry, attempt, history)
+            parts = []
+            try:
+                async for chunk in session.send_message_stream(message):
+                    parts.append(chunk)
+                    yield chunk
+            except Exception as e:
+                entry.breaker.record_failure()
+                if not parts:
+                    self.logger.error(f"[AsyncIRISAgent] Gemini error during send_message_stream on {entry.model}.")
+                    error = e
+                    continue
+                self.logger.error(f"[AsyncIRISAgent] Gemini stream interrupted: {e}")
+                parts.append(f"\n[Response interrupted: {e}]")
+                yield parts[-1]
+            else:
+                entry.breaker.record_success()
+            self._finish_session(session, "".join(parts))
+            return
+        yield self._fail(history, error)
@@ -1,62 +1,221 @@
 import os
-from core.llms.gemini import Gemini
+from collections import deque
+from core.llms.client_pool import ClientPool
+from core.llms.context_budget import ContextBudget
+from core.llms.gemini import AsyncGemini, Gemini
+from core.llms.replay import AsyncReplayLLM, ReplayLLM
+from core.llms.response_cache import ResponseCache
+from core.tools.result_compactor import ResultCompactor
+from core.tools.tool_executor import ToolExecutor
+from core.tools.tool_flags import side_effect_tool_names
 from google.genai import types
 from dotenv import load_dotenv
 from core.utils.logger import get_logger
 
 load_dotenv()
 
+FRIENDLY_TOOL_NAMES = {
+    "search": "Web Search",
+    "research": "Research",
+    "query_wolfram_alpha": "Wolfram Alpha",
+    "grok_response": "Grok AI",
+    "add_reminder": "Reminder System",
+    "remove_reminder": "Reminder System",
+    "get_current_datetime": "Date & Time",
+    "store_memory": "Memory Storage",
+    "write_persistent_memory": "Persistent Memory",
+    "read_persistent_memory": "Persistent Memory",
+    "recall_memory": "Memory Recall",
+    "read_chat_history": "Chat History",
+    "search_history": "History Search",
+}
+
+def build_gemini_config(system_prompt: str, config: dict, tools: list,
+                        manual_function_calling: bool = False) -> types.GenerateContentConfig:
+    """
+    Build the GenerateContentConfig shared by the sync and async agents.
+
+    Parameters:
+        system_prompt (str): The system prompt guiding the agent.
+        config (dict): Configuration dictionary; reads the generate_config section.
+        tools (list): Callables exposed to the model.
+        manual_function_calling (bool): Disable the SDK's automatic function calling because
+            IRIS runs the calls itself.
+
+    Returns:
+        types.GenerateContentConfig: The generation config.
+    """
+    generate_conf = config.get("generate_config", {})
+    return types.GenerateContentConfig(
+        system_instruction=system_prompt,
+        tools=tools,
+        automatic_function_calling=types.AutomaticFunctionCallingConfig(
+            disable=manual_function_calling or generate_conf.get("automatic_function_calling_disable", False)
+        ),
+        top_p=generate_conf.get("top_p", 0.6),
+        seed=generate_conf.get("seed", 42),
+        top_k=generate_conf.get("top_k", 64),
+        temperature=generate_conf.get("temperature", 64)
+    )
+
+def load_result_compactor(compaction_conf: dict):
+    """Build the ResultCompactor described by the result_compaction config section, or None when disabled."""
+    if not compaction_conf.get("enabled", True):
+        return None
+    return ResultCompactor(
+        tool_budgets=compaction_conf.get("tool_budgets", {}),
+        min_chars=compaction_conf.get("min_chars", 1500),
+    )
+
+def compact_tools(config: dict, tools: list) -> list:
+    """Wrap `tools` so their results pass through the configured ResultCompactor."""
+    compactor = load_result_compactor(config.get("result_compaction", {}))
+    return compactor.wrap_all(tools) if compactor is not None else list(tools)
+
+def load_tool_executor(exec_conf: dict, tools: list, on_status=None):
+    """
+    Build the ToolExecutor described by the tool_execution config section, or None when
+    function calls are left to the SDK ("mode": "sdk").
+    """
+    if exec_conf.get("mode", "parallel") != "parallel" or not tools:
+        return None
+    return ToolExecutor(
+        tools,
+        max_workers=exec_conf.get("max_workers", 8),
+        timeout_seconds=exec_conf.get("timeout_seconds", 60),
+        tool_timeouts=exec_conf.get("tool_timeouts", {}),
+        max_rounds=exec_conf.get("max_rounds", 10),
+        on_status=on_status,
+    )
+
+def load_response_cache(cache_conf: dict, tools: list):
+    """
+    Build the ResponseCache described by the response_cache config section, or None when disabled.
+
+    Tools marked with @side_effects always bypass the cache, in addition to the
+    configured bypass_tools.
+    """
+    if not cache_conf.get("enabled", False):
+        return None
+    return ResponseCache(
+        db_file=cache_conf.get("db_file", "data/response_cache.db"),
+        max_entries=cache_conf.get("max_entries", 1000),
+        ttl_seconds=cache_conf.get("ttl_seconds", 86400),
+        history_turns=cache_conf.get("history_turns", 6),
+        bypass_tools=side_effect_tool_names(tools) | set(cache_conf.get("bypass_tools", [])),
+    )
+
+def load_context_budget(budget_conf: dict):
+    """Build the ContextBudget described by the context_budget config section, or None when disabled."""
+    if not budget_conf.get("enabled", True):
+        return None
+    return ContextBudget(
+        max_history_tokens=budget_conf.get("max_history_tokens", 24000),
+        keep_recent_turns=budget_conf.get("keep_recent_turns", 6),
+        tool_result_chars=budget_conf.get("tool_result_chars", 2000),
+        summary_model=budget_conf.get("summary_model", "gemini-2.0-flash"),
+        summary_max_words=budget_conf.get("summary_max_words", 250),
+    )
+
+# config "provider" -> (sync session class, async session class)
+PROVIDERS = {
+    "gemini": (Gemini, AsyncGemini),
+    "replay": (ReplayLLM, AsyncReplayLLM),
+}
+
+def load_client_pool(config: dict, gemini_config, asynchronous: bool = False, client=None, **session_kwargs) -> ClientPool:
+    """
+    Build the ClientPool for the configured provider, model and the fallback section's models.
+
+    With "provider": "replay" every model is a scripted ReplayLLM configured by the replay section.
+    """
+    provider = config.get("provider", "gemini")
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{provider}', expected one of {sorted(PROVIDERS)}")
+    session_class = PROVIDERS[provider][1 if asynchronous else 0]
+    if provider == "replay":
+        replay_conf = config.get("replay", {})
+        session_kwargs.update(
+            script=replay_conf.get("script"),
+            latency_seconds=replay_conf.get("latency_seconds", 0.0),
+            chunk_delay_seconds=replay_conf.get("chunk_delay_seconds", 0.0),
+            chunk_words=replay_conf.get("chunk_words", 3),
+        )
+    fallback_conf = config.get("fallback", {})
+    models = [config.get("model", "gemini-2.0-flash")] + list(fallback_conf.get("models", ["gemini-1.5-flash"]))
+    return ClientPool(
+        models,
+        gemini_config,
+        client=client,
+        session_class=session_class,
+        failure_threshold=fallback_conf.get("failure_threshold", 3),
+        cooldown_seconds=fallback_conf.get("cooldown_seconds", 60),
+        **session_kwargs,
+    )
+
 class IRISAgent:
-    def __init__(self, system_prompt: str, memory, config: dict, tools: list = None):
+    def __init__(self, system_prompt: str, memory, config: dict, tools: list = None, chat_state=None):
         """
         Initialize IRISAgent with system prompt, memory instance, configuration, and integrated tools.
         
         Parameters:
             system_prompt (str): The system prompt guiding the agent.
-            memory: A persistent Memory instance for logging conversation.
+            memory: A list-like conversation log; defaults to a deque bounded by memory.agent_log_limit.
             config (dict): Configuration dictionary with model settings.
             tools (list): List of callable tools/tools.
+            chat_state (ChatStateStore): Optional store the model-side history is saved to after every
+                turn and restored from before the first message.
         """
         self.logger = get_logger()
-        self.memory = memory if memory is not None else []  # Ensure memory is a list, not None.
+        # Ensure memory is a list-like log, not None, and bounded for long-running sessions.
+        log_limit = config.get("memory", {}).get("agent_log_limit", 200)
+        self.memory = memory if memory is not None else deque(maxlen=log_limit)
         
-        # Track tool names for status updates
-        self.tools = tools or []
+        self.config = config
+        self.system_prompt = system_prompt
+        # Track tool names for status updates; results are compacted before they reach the model.
+        self.tools = self._prepare_tools(tools or [])
         
-        generate_conf = config.get("generate_config", {})
-        gemini_config = types.GenerateContentConfig(
-            system_instruction=system_prompt,
-            tools=self.tools,
-            automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                disable=generate_conf.get("automatic_function_calling_disable", False)
-            ),
-            top_p=generate_conf.get("top_p", 0.6),
-            seed=generate_conf.get("seed", 42),
-            top_k=generate_conf.get("top_k", 64),
-            temperature=generate_conf.get("temperature", 64)
-        )
-        model_name = config.get("model", "gemini-2.0-flash")
-        self.gemini_agent = Gemini(model_name, gemini_config)
+        # Function calls of one model turn run concurrently on IRIS's own executor.
+        self.tool_executor = load_tool_executor(config.get("tool_execution", {}), self.tools, self._handle_tool_status)
+        gemini_config = build_gemini_config(system_prompt, config, self.tools,
+                                            manual_function_calling=self.tool_executor is not None)
+        self.response_cache = load_response_cache(config.get("response_cache", {}), self.tools)
+        # The primary model and its fallbacks are created up front and share one client.
+        self.client_pool = load_client_pool(config, gemini_config, response_cache=self.response_cache,
+                                            context_budget=load_context_budget(config.get("context_budget", {})),
+                                            tool_executor=self.tool_executor)
+        self.gemini_agent = self.client_pool.primary
+        self.chat_state = chat_state
+        self._history_restored = False
         
         # Status tracking
         self.status_callback = None
-        self.gemini_agent.set_status_callback(self._handle_status_update)
+        self.client_pool.set_status_callback(self._handle_status_update)
     
+    def _prepare_tools(self, tools: list) -> list:
+        return compact_tools(self.config, tools)
+
+    def update_tools(self, tools: list, prepared_tools: list = None) -> None:
+        """
+        Swap in a new tool set, e.g. after a hot reload, keeping the conversation. The
+        executor, the response cache's bypass list and every pooled session's tool
+        declarations are updated; call it between turns. `prepared_tools` are added as
+        they are, as in AsyncIRISAgent.
+        """
+        self.tools = list(prepared_tools or []) + self._prepare_tools(tools)
+        if self.tool_executor is not None:
+            self.tool_executor.set_tools(self.tools)
+        if self.response_cache is not None:
+            self.response_cache.bypass_tools |= side_effect_tool_names(self.tools)
+        gemini_config = build_gemini_config(self.system_prompt, self.config, self.tools,
+                                            manual_function_calling=self.tool_executor is not None)
+        for entry in self.client_pool.entries:
+            entry.session.update_config(gemini_config)
+
     def _get_friendly_tool_name(self, function_name):
         """Convert function names to friendly tool names for status updates"""
-        name_map = {
-            "search": "Web Search",
-            "research": "Research",
-            "query_wolfram_alpha": "Wolfram Alpha",
-            "grok_response": "Grok AI",
-            "add_reminder": "Reminder System",
-            "remove_reminder": "Reminder System",
-            "get_current_datetime": "Date & Time",
-            "store_memory": "Memory Storage",
-            "write_persistent_memory": "Persistent Memory",
-            "read_persistent_memory": "Persistent Memory",
-        }
-        return name_map.get(function_name, function_name.replace("_", " ").title())
+        return FRIENDLY_TOOL_NAMES.get(function_name, function_name.replace("_", " ").title())
     
     def set_status_callback(self, callback):
         """Set a callback function to be called when status changes"""
@@ -67,9 +226,21 @@ class IRISAgent:
         if self.status_callback:
             self.status_callback(status)
     
+    def _handle_tool_status(self, names):
+        """Report the tools the executor is about to run (or None when they are done)."""
+        if names is None:
+            self._handle_status_update("Processing your message...")
+            return
+        friendly = dict.fromkeys(self._get_friendly_tool_name(name) for name in names)
+        self._handle_status_update(f"Using {', '.join(friendly)}...")
+
     def send_message(self, message: str) -> str:
         """
         Send a user's message to Gemini, log the conversation in memory, and return the response.
+
+        Models are tried in the client pool's order, skipping those whose circuit is open.
+        A fallback model continues from the same conversation history, and the primary
+        session takes over the fallback's history afterwards.
         
         Parameters:
             message (str): The user's query.
@@ -77,43 +248,114 @@ class IRISAgent:
         Returns:
             str: The agent's response.
         """
-        try:
-            # Log the user's message
-            self.memory.append(f"User: {message}")
-            
-            # Update status to indicate we're processing
-            self._handle_status_update("Processing your message...")
-            
-            # Send to Gemini (which will update status for tool usage)
-            response = self.gemini_agent.send_message(message)
-            
-            if isinstance(response, str) and response.startswith("Error"):
-                raise Exception(response)
-            
-            # Log agent's response
-            self.memory.append(f"IRIS: {response}")
-            
-            # Clear status when done
-            self._handle_status_update(None)
-            
+        # Log the user's message
+        self.memory.append(f"User: {message}")
+        
+        # Update status to indicate we're processing
+        self._handle_status_update("Processing your message...")
+        
+        self._restore_history()
+        history = self.gemini_agent.get_history()
+        error = None
+        for attempt, entry in enumerate(self.client_pool.route()):
+            session = self._prepare_session(entry, attempt, history)
+            try:
+                # Send to Gemini (which will update status for tool usage)
+                response = session.send_message(message)
+                if isinstance(response, str) and response.startswith("Error"):
+                    raise Exception(response)
+            except Exception as e:
+                entry.breaker.record_failure()
+                self.logger.error(f"[IRISAgent] Gemini error during send_message on {entry.model}.")
+                error = e
+                continue
+            entry.breaker.record_success()
+            self._finish_session(session, response)
             return response
-        except Exception as e:
-            self.logger.error("[IRISAgent] Gemini error during send_message, falling back to alternative model.")
+        return self._fail(history, error)
+
+    def _restore_history(self) -> None:
+        """Rehydrate the saved conversation into the primary session; done once, before the first message."""
+        if self._history_restored or self.chat_state is None:
+            return
+        self._history_restored = True
+        history = self.chat_state.load()
+        if history and not self.gemini_agent.get_history():
+            self.gemini_agent.set_history(history)
+            self.logger.success(f"[IRISAgent] Restored {len(history)} history entries from the last session.")
+
+    def _save_history(self) -> None:
+        if self.chat_state is not None:
+            self.chat_state.save(self.gemini_agent.get_history())
+
+    def _prepare_session(self, entry, attempt: int, history: list):
+        """Hand the conversation to `entry`'s session if it is not the primary's first try."""
+        if entry.session is not self.gemini_agent:
+            self.logger.warning(f"[IRISAgent] Falling back to {entry.model}.")
+            self._handle_status_update("Falling back to alternative model...")
+        if attempt or entry.session is not self.gemini_agent:
+            entry.session.set_history(history)
+        return entry.session
+
+    def _finish_session(self, session, response: str) -> None:
+        """Log the response and, after a fallback, carry the conversation back to the primary session."""
+        if session is self.gemini_agent:
+            self.memory.append(f"IRIS: {response}")
+        else:
+            self.gemini_agent.set_history(session.get_history())
+            self.memory.append(f"IRIS (fallback): {response}")
+        self._save_history()
+        self._handle_status_update(None)
+
+    def _fail(self, history: list, error) -> str:
+        """Restore the pre-turn history after every model failed and return an error text."""
+        self.gemini_agent.set_history(history)
+        self.logger.error("[IRISAgent] Gemini fallback error")
+        error_response = f"Error processing message: {error}"
+        self.memory.append(error_response)
+        self._handle_status_update(f"Error: {str(error)}")
+        return error_response
+
+    def send_message_stream(self, message: str):
+        """
+        Send a user's message to Gemini and yield the response text as it is generated.
+
+        If a model fails before producing any text the next model in the client pool is
+        streamed instead, continuing from the same history.
+
+        Parameters:
+            message (str): The user's query.
+
+        Yields:
+            str: Response text chunks, in order.
+        """
+        self.memory.append(f"User: {message}")
+        self._handle_status_update("Processing your message...")
+        self._restore_history()
+        history = self.gemini_agent.get_history()
+        error = None
+        for attempt, entry in enumerate(self.client_pool.route()):
+            session = self._prepare_session(entry, attempt, history)
+            parts = []
             try:
-                self._handle_status_update("Falling back to alternative model...")
-                fallback_agent = Gemini("gemini-1.5-flash", self.gemini_agent.config)
-                fallback_agent.set_status_callback(self._handle_status_update)
-                response = fallback_agent.send_message(message)
-                self.memory.append(f"IRIS (fallback): {response}")
-                self._handle_status_update(None)
-                return response
-            except Exception as e2:
-                self.logger.error("[IRISAgent] Gemini fallback error")
-                error_response = f"Error processing message: {e2}"
-                self.memory.append(error_response)
-                self._handle_status_update(f"Error: {str(e2)}")
-                return error_response
-    
+                for chunk in session.send_message_stream(message):
+                    parts.append(chunk)
+                    yield chunk
+            except Exception as e:
+                entry.breaker.record_failure()
+                if not parts:
+                    self.logger.error(f"[IRISAgent] Gemini error during send_message_stream on {entry.model}.")
+                    error = e
+                    continue
+                self.logger.error(f"[IRISAgent] Gemini stream interrupted: {e}")
+                parts.append(f"\n[Response interrupted: {e}]")
+                yield parts[-1]
+            else:
+                entry.breaker.record_success()
+            self._finish_session(session, "".join(parts))
+            return
+        yield self._fail(history, error)
+
     def execute_task(self, task: dict):
         """
         Execute a given task as defined in the task dictionary.
@@ -147,6 +389,10 @@ class IRISAgent:
         """
         try:
             self.gemini_agent.reset_chat()
+            # A reset conversation must not come back after a restart.
+            self._history_restored = True
+            if self.chat_state is not None:
+                self.chat_state.clear()
             self.logger.success("[IRISAgent] Chat reset successfully.")
         except Exception as e:
             self.logger.error(f"[IRISAgent] Error resetting Gemini chat: {e}") 
\ No newline at end of file
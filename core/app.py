@@ -2,7 +2,10 @@ from core.core import IRISCore
 
 def main():
     iris = IRISCore()
-    iris.run()
+    try:
+        iris.run()
+    finally:
+        iris.shutdown()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+@dataclass
+class ChatEntry:
+    timestamp: str
+    user: str
+    response: str
+
+@dataclass
+class ChatLog:
+    chat_history: list = field(default_factory=list)
+    reminders: list = field(default_factory=list)
+    last_interaction: datetime = None
+
+    def reset(self):
+        self.chat_history.clear()
+        self.reminders.clear()
@@ -19,7 +19,14 @@ class ConfigManager:
 
     def _default_config(self) -> dict:
         return {
+            "users": ["kitsunelynx0", "seyon0"],
+            "provider": "gemini",
             "model": "gemini-2.0-flash",
+            "fallback": {
+                "models": ["gemini-1.5-flash"],
+                "failure_threshold": 3,
+                "cooldown_seconds": 60
+            },
             "generate_config": {
                 "top_p": 0.6,
                 "top_k": 64,
@@ -29,7 +36,111 @@ class ConfigManager:
             },
             "tts_type": "simple",
             "default_voice_mode": False,
-            "default_tts_enabled": False
+            "default_tts_enabled": False,
+            "stream_responses": True,
+            "persistence": {
+                "flush_interval": 0.5,
+                "fsync": "always"
+            },
+            "memory": {
+                "backend": "json",
+                "db_file": "data/memory.db",
+                "max_entries": 10000,
+                "default_ttl_seconds": None,
+                "eviction": "lru",
+                "cold_archive": "data/memory_cold.jsonl",
+                "agent_log_limit": 200,
+                "vector_index": {
+                    "enabled": True,
+                    "directory": "data/vectors",
+                    "dim": 256
+                }
+            },
+            "search": {
+                "enabled": True,
+                "db_file": "data/search.db"
+            },
+            "replay": {
+                "script": "data/replay_script.json",
+                "latency_seconds": 0.5,
+                "chunk_delay_seconds": 0.05,
+                "chunk_words": 3
+            },
+            "result_compaction": {
+                "enabled": True,
+                "min_chars": 1500,
+                "tool_budgets": {
+                    "search_research": 4000,
+                    "websearch": 3000,
+                    "open_pdf": 4000,
+                    "fetch_transcript": 3000
+                }
+            },
+            "tool_execution": {
+                "mode": "parallel",
+                "max_workers": 8,
+                "timeout_seconds": 60,
+                "tool_timeouts": {
+                    "search_research": 180,
+                    "execute_command_tool": 120
+                },
+                "max_rounds": 10
+            },
+            "context_budget": {
+                "enabled": True,
+                "max_history_tokens": 24000,
+                "keep_recent_turns": 6,
+                "tool_result_chars": 2000,
+                "summary_model": "gemini-2.0-flash",
+                "summary_max_words": 250
+            },
+            "response_cache": {
+                "enabled": False,
+                "db_file": "data/response_cache.db",
+                "max_entries": 1000,
+                "ttl_seconds": 86400,
+                "history_turns": 6,
+                "bypass_tools": ["get_current_datetime", "read_persistent_memory", "recall_memory"]
+            },
+            "chatlog": {
+                "compact_every": 500,
+                "tail_turns": 50,
+                "segment_max_turns": 1000,
+                "archive_dir": "data/history"
+            },
+            "chat_state": {
+                "enabled": True,
+                "file": "data/chat_state.json",
+                "restore_turns": 20
+            },
+            "tool_cache": {
+                "enabled": True,
+                "db_file": "data/tool_cache.db",
+                "memory_entries": 256,
+                "max_entries": 5000,
+                "tool_ttls": {}
+            },
+            "tool_isolation": {
+                "enabled": True,
+                "max_workers": 2,
+                "tool_limits": {}
+            },
+            "tool_loading": {
+                "lazy": True,
+                "manifest": "data/tool_manifest.json",
+                "parallel": True,
+                "max_workers": 8,
+                "module_timeout_seconds": 30,
+                "watch": False,
+                "watch_interval_seconds": 2
+            },
+            "server": {
+                "host": "127.0.0.1",
+                "port": 8765,
+                "data_dir": "data/users",
+                "tool_workers": 16,
+                "max_body_bytes": 1048576
+            }
         }
 
     def get(self, key, default=None):
@@ -1,203 +1,114 @@
-import os
-import json
-from dataclasses import dataclass, field
+import threading
 from datetime import datetime
-from pathlib import Path
 from dotenv import load_dotenv
 from core.agents.iris_agent import IRISAgent
+from core.session import IRISSession, load_system_prompt
+from core.storage.writer import PersistenceWorker
 from core.utils.logger import get_logger
-from core.tools.tool_manager import ToolManager
+from core.utils.profiler import get_profiler
+from core.tools.isolation import load_worker_pool
+from core.tools.result_cache import load_tool_cache
+from core.tools.tool_manager import load_tool_manager
+from core.tools.tool_watcher import load_tool_watcher
 from core.utils.ui import UIHandler
+from core.utils.tts.sentence_splitter import SentenceSplitter
 from core.config.config_manager import ConfigManager
-from core.utils.error_handler import handle_errors
 
 load_dotenv()
 logger = get_logger()
 
-@dataclass
-class ChatEntry:
-    timestamp: str
-    user: str
-    response: str
-
-@dataclass
-class ChatLog:
-    chat_history: list = field(default_factory=list)
-    reminders: list = field(default_factory=list)
-    last_interaction: datetime = None
-
-    def reset(self):
-        self.chat_history.clear()
-        self.reminders.clear()
-
 class IRISCore:
     def __init__(self, ui_handler: UIHandler = None):
         self.logger = get_logger()
-        self.ui = ui_handler if ui_handler else UIHandler()
+        profiler = get_profiler()
+        with profiler.phase("ui"):
+            self.ui = ui_handler if ui_handler else UIHandler()
         self.logger.success("Starting IRIS...")
         self.logger.success("Loading configuration...")
-        self.config = ConfigManager()
+        with profiler.phase("config"):
+            self.config = ConfigManager()
 
         # Login process for authorized users before initialization starts
-        self.current_user = self.login_user()
+        with profiler.phase("login (user input)"):
+            self.current_user = self.login_user()
 
-        self.logger.success("Loading chat log...")
-        self.chatlog = self._load_chatlog()
-
-        # Initialize memory as an empty list for IRISAgent's usage.
-        self.memory = []
+        with profiler.phase("persistence"):
+            persistence_conf = self.config.get("persistence", {})
+            self.writer = PersistenceWorker(
+                flush_interval=persistence_conf.get("flush_interval", 0.5),
+                fsync=persistence_conf.get("fsync", "always"),
+            ).start()
 
         # Load system prompt from all files in the data directory (.id is preferred, .txt as fallback)
-        system_prompt = self._load_system_prompt() + f"\nLogged in as: {self.current_user}"
+        with profiler.phase("system prompt"):
+            system_prompt = self._load_system_prompt() + f"\nLogged in as: {self.current_user}"
         self.logger.success("System prompt loaded.")
 
         self.logger.success("Loading web search module...")
 
         self.logger.success("Loading tools...")
-        self.tool_manager = ToolManager()
-        tools = self.tool_manager.load_tools()
-
-        integrated_tools = [
-            self.add_reminder,
-            self.remove_reminder,
-            self.get_current_datetime,
-            self.store_memory,
-            self.write_persistent_memory,
-            self.read_persistent_memory,
-        ]
-        all_tools = tools + integrated_tools
+        with profiler.phase("tools"):
+            self.worker_pool = load_worker_pool(self.config.get("tool_isolation", {}))
+            self.tool_cache = load_tool_cache(self.config.get("tool_cache", {}))
+            loading_conf = self.config.get("tool_loading", {})
+            self.tool_manager = load_tool_manager(loading_conf, result_cache=self.tool_cache)
+            tools = self.tool_manager.load_tools()
+            # Reloaded tools are handed over between turns, never while a reply is in progress.
+            self._pending_tools = None
+            self._pending_tools_lock = threading.Lock()
+            self.tool_watcher = load_tool_watcher(loading_conf, self.tool_manager, self._on_tools_changed)
 
         self.logger.success("Loading TTS module...")
-        from core.utils.tts import get_tts
-        self.tts = get_tts()
+        with profiler.phase("tts"):
+            from core.utils.tts import get_tts
+            self.tts = get_tts()
 
-        # Instantiate the unified memory manager for persistent memory operations
-        from core.memory import MemoryManager
-        self.memory_manager = MemoryManager()
+        self.logger.success("Loading chat log and memory...")
+        with profiler.phase("chat log and memory"):
+            self.session = IRISSession(self.config, self.current_user, self.writer, on_reminder=self._show_reminder)
 
         self.logger.success("Loading agent...")
-        self.agent = IRISAgent(system_prompt, None, self.config.config, tools=all_tools)
+        with profiler.phase("agent"):
+            self.agent = IRISAgent(system_prompt, None, self.config.config, tools=tools + self.session.tools(),
+                                    chat_state=self.session.chat_state)
 
         self.voice_mode = self.config.get("default_voice_mode", False)
         self.tts_enabled = self.config.get("default_tts_enabled", False)
+        self.stream_responses = self.config.get("stream_responses", True)
+        self.speech_queue = None
 
         self.logger.success("Starting background tasks...")
-        self._start_background_tasks()
+        with profiler.phase("background tasks"):
+            self._start_background_tasks()
+        profiler.finish()
 
     def _load_system_prompt(self) -> str:
-        data_dir = Path("data")
-        sysdt_files = sorted(data_dir.glob("*.id"), reverse=True)
-        if sysdt_files:
-            system_prompt = "\n".join(f.read_text(encoding="utf-8") for f in sysdt_files)
-        else:
-            txt_files = sorted(data_dir.glob("*.txt"))
-            system_prompt = "\n".join(f.read_text(encoding="utf-8") for f in txt_files) if txt_files else "Default system prompt."
-        return system_prompt
-
-
-    @handle_errors(default_return=ChatLog())
-    def _load_chatlog(self) -> ChatLog:
-        chatlog_path = "data/chatlog.json"
-        if not os.path.exists(chatlog_path):
-            return ChatLog()
-        with open(chatlog_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        data.setdefault("chat_history", [])
-        data.setdefault("reminders", [])
-        if data.get("last_interaction"):
-            data["last_interaction"] = datetime.fromisoformat(data["last_interaction"])
-        else:
-            data["last_interaction"] = None
-        data["chat_history"] = [ChatEntry(**entry) for entry in data["chat_history"]]
-        return ChatLog(**data)
+        return load_system_prompt()
 
     def _start_background_tasks(self):
-        import threading
-
-        # Start a synchronous thread for checking reminders
-        thread = threading.Thread(target=self._reminder_checker_sync, daemon=True)
-        thread.start()
-
-    def _reminder_checker_sync(self):
-        from datetime import datetime
-        import time
-        while True:
-            now = datetime.now()
-            due_reminders = []
-            for reminder in list(self.chatlog.reminders):
-                due_date_str = reminder.get("due_date")
-                if due_date_str:
-                    try:
-                        due_date = datetime.fromisoformat(due_date_str)
-                        if now >= due_date:
-                            due_reminders.append(reminder)
-                    except Exception as e:
-                        self.logger.error(f"Error parsing reminder due_date: {e}")
-            for reminder in due_reminders:
-                message = f"Reminder: {reminder.get('text')} (Due: {reminder.get('due_date')})"
-                self.ui.print_message(message, style="warning")
-            time.sleep(60)
-
-    def add_reminder(self, reminder_name: str, reminder_text: str, due_date: str) -> str:
-        from datetime import datetime
-        try:
-            parsed_date = datetime.strptime(due_date, "%Y-%m-%d %H:%M")
-        except Exception as e:
-            return f"Error parsing date: {e}"
-        new_reminder = {
-            "name": reminder_name,
-            "text": reminder_text,
-            "due_date": parsed_date.isoformat(),
-            "created_at": datetime.now().isoformat()
-        }
-        self.chatlog.reminders.append(new_reminder)
-        self._save_chatlog()
-        self.logger.success(f"Reminder '{reminder_name}' set: {reminder_text} at {due_date}")
-        return f"Reminder '{reminder_name}' set: {reminder_text} at {due_date}"
-
-    @handle_errors(default_return="Error removing reminder")
-    def remove_reminder(self, reminder_name: str) -> str:
-        found = False
-        for r in self.chatlog.reminders:
-            if r.get("name") == reminder_name:
-                self.chatlog.reminders.remove(r)
-                found = True
-                break
-        self._save_chatlog()
-        if found:
-            return f"Removed reminder '{reminder_name}'."
-        else:
-            return f"No reminder found with the name '{reminder_name}'."
-
-    def get_current_datetime(self) -> str:
+        # Reminders fire from a heap-ordered scheduler thread that sleeps until the next due time.
+        self.session.start()
+        if self.tool_watcher is not None:
+            self.tool_watcher.start()
+
+    def _on_tools_changed(self, tools: list):
+        with self._pending_tools_lock:
+            self._pending_tools = tools
+
+    def _apply_tool_updates(self):
+        with self._pending_tools_lock:
+            tools, self._pending_tools = self._pending_tools, None
+        if tools is not None:
+            self.agent.update_tools(tools + self.session.tools())
+            self.logger.success(f"Tools reloaded ({len(tools)} available).")
+
+    def _show_reminder(self, message: str):
+        self.ui.print_message(message, style="warning")
+
+    def _show_history(self, args: list):
         from datetime import datetime
-        return datetime.now().isoformat()
-
-    @handle_errors(default_return=None)
-    def store_memory(self, content: str) -> None:
-        self.memory_manager.append(content)
-
-    @handle_errors(default_return="Error writing persistent memory")
-    def write_persistent_memory(self, key: str, value: str) -> str:
-        self.memory_manager.set(key, value)
-        return f"Persistent memory written for key: {key}"
-
-    @handle_errors(default_return="Error reading persistent memory")
-    def read_persistent_memory(self, key: str) -> str:
-        return self.memory_manager.get(key)
-
-    def _save_chatlog(self):
-        try:
-            chatlog_dict = {
-                "chat_history": [entry.__dict__ for entry in self.chatlog.chat_history],
-                "reminders": self.chatlog.reminders,
-                "last_interaction": self.chatlog.last_interaction.isoformat() if self.chatlog.last_interaction else None,
-            }
-            chatlog_path = Path("data/chatlog.json")
-            chatlog_path.parent.mkdir(exist_ok=True)
-            chatlog_path.write_text(json.dumps(chatlog_dict, indent=2), encoding="utf-8")
-        except Exception as e:
-            self.logger.error(f"Chat log Save Error: {e}")
+        result = self.session.history_command(args)
+        self.ui.print_message(result, style="info", sender="System", timestamp=datetime.now().strftime("%H:%M:%S"))
 
     def run(self):
         from datetime import datetime  # Added to format timestamps
@@ -225,20 +136,79 @@ class IRISCore:
                 self.ui.print_message("Text-to-speech disabled.", style="info", sender="System", timestamp=datetime.now().strftime("%H:%M:%S"))
                 continue
 
+            if command == "/history" or command.startswith("/history "):
+                self._show_history(user_input.split()[1:])
+                continue
+
+            if command.startswith("/search "):
+                result = self.session.search_history(user_input.strip()[len("/search "):])
+                self.ui.print_message(result, style="info", sender="System", timestamp=datetime.now().strftime("%H:%M:%S"))
+                continue
+
             if not user_input.strip():
                 continue
 
             # Echo the user's message in a chat bubble with timestamp
             self.ui.print_message(user_input, sender="You", timestamp=datetime.now().strftime("%H:%M:%S"))
+            self._apply_tool_updates()
             
+            if self.stream_responses:
+                response = self._stream_response(user_input)
+                self.session.record_turn(user_input, response)
+                continue
+
             response = self.agent.send_message(user_input)
+            self.session.record_turn(user_input, response)
             # Display the agent's response as a chat bubble with timestamp and info style
             self.ui.print_message(response, style="info", sender="IRIS", timestamp=datetime.now().strftime("%H:%M:%S"))
             if self.tts_enabled:
                 self.tts.speak(response)
 
+    def _stream_response(self, user_input: str) -> str:
+        """
+        Render the agent's reply as it streams in, speaking each sentence as soon as it is complete.
+        """
+        on_chunk = None
+        splitter = None
+        if self.tts_enabled:
+            if self.speech_queue is None:
+                from core.utils.tts.speech_queue import SpeechQueue
+                self.speech_queue = SpeechQueue(self.tts)
+            splitter = SentenceSplitter()
+
+            def on_chunk(chunk):
+                for sentence in splitter.feed(chunk):
+                    self.speech_queue.say(sentence)
+
+        response = self.ui.stream_message(
+            self.agent.send_message_stream(user_input),
+            style="info", sender="IRIS", timestamp=datetime.now().strftime("%H:%M:%S"), on_chunk=on_chunk,
+        )
+        if splitter is not None:
+            self.speech_queue.say(splitter.flush())
+            self.speech_queue.wait()
+        return response
+
+    def shutdown(self):
+        """
+        Drain pending chat log and memory writes to disk.
+        """
+        self.session.stop_reminders()
+        if self.tool_watcher is not None:
+            self.tool_watcher.stop()
+        self.logger.success("Flushing pending writes...")
+        self.writer.stop()
+        self.session.close()
+        if self.agent.response_cache is not None:
+            self.agent.response_cache.close()
+        if self.agent.tool_executor is not None:
+            self.agent.tool_executor.shutdown()
+        self.worker_pool.shutdown()
+        if self.tool_cache is not None:
+            self.tool_cache.close()
+
     def login_user(self) -> str:
-        valid_users = ["kitsunelynx0", "seyon0"]
+        valid_users = [user.lower() for user in self.config.get("users", [])]
         while True:
             username = self.ui.get_input("Enter username: ")
             if username.lower() in valid_users:
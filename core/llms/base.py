@@ -0,0 +1,159 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, List
+
+def copy_config(config):
+    """Private copy of a GenerateContentConfig (or dict) for one session; {} when there is none."""
+    if not config:
+        return {}
+    return config.model_copy() if hasattr(config, "model_copy") else dict(config)
+
+class LLMProvider(ABC):
+    """
+    One chat session with one model. IRISAgent only talks to models through this
+    interface, so any backend constructible as
+    `Provider(model_name, config, client=None, response_cache=None, context_budget=None)`
+    can be used through the client pool.
+
+    send_message and send_message_stream compact the history, consult the response
+    cache and store the answer; providers implement only `_send` and `_stream`, and keep
+    `chat`, `model_name`, `config`, `response_cache`, `context_budget` and `logger`.
+    """
+    # Whether the client pool must create a shared genai.Client for this provider.
+    requires_client = True
+    # Start of the text send_message returns when a request fails.
+    error_prefix = "Error sending message"
+
+    def set_status_callback(self, callback):
+        """Set a callback function to be called when status changes"""
+        self.status_callback = callback
+
+    def update_status(self, status):
+        """Update the current status and call the callback if set"""
+        self.current_status = status
+        if self.status_callback:
+            self.status_callback(status)
+
+    def update_config(self, config) -> None:
+        """Use `config` (e.g. with new tool declarations) from the next request on, keeping the conversation."""
+        self.config = copy_config(config)
+        self.set_history(self.get_history())
+
+    def _lookup_cached(self, message: str) -> tuple:
+        """Return (cache key, cached answer or None, history length before the request)."""
+        if self.response_cache is None:
+            return None, None, 0
+        key, cached = self.response_cache.lookup(self.chat, self.model_name, self.config, message)
+        return key, cached, len(self.chat.get_history())
+
+    def _store_cached(self, key, history_start: int, text: str) -> None:
+        if self.response_cache is not None:
+            self.response_cache.store(key, self.chat, history_start, text)
+
+    def send_message(self, message: str) -> str:
+        """
+        Send a message and return the final response text.
+
+        Parameters:
+            message (str): The user's input message.
+
+        Returns:
+            str: The response text, or an "Error ..." text if the request failed.
+        """
+        try:
+            if self.context_budget is not None:
+                self.context_budget.compact(self)
+            key, cached, history_start = self._lookup_cached(message)
+            if cached is not None:
+                return cached
+            text = self._send(message)
+            self._store_cached(key, history_start, text)
+            return text
+        except Exception as e:
+            self.logger.error(f"{self.error_prefix}: {e}", exc_info=True)
+            return f"{self.error_prefix}: {str(e)}"
+
+    def send_message_stream(self, message: str) -> Iterator[str]:
+        """
+        Send a message and yield the response text in chunks.
+
+        Parameters:
+            message (str): The user's input message.
+
+        Yields:
+            str: Successive non-empty text chunks of the response. Errors are raised to the caller.
+        """
+        if self.context_budget is not None:
+            self.context_budget.compact(self)
+        key, cached, history_start = self._lookup_cached(message)
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        for text in self._stream(message):
+            parts.append(text)
+            yield text
+        self._store_cached(key, history_start, "".join(parts))
+
+    @abstractmethod
+    def _send(self, message) -> str:
+        """Make the request (and any tool rounds) for `message` and return the response text."""
+        pass
+
+    @abstractmethod
+    def _stream(self, message) -> Iterator[str]:
+        """Streaming counterpart of `_send`: yield the response text as it arrives."""
+        pass
+
+    @abstractmethod
+    def get_history(self) -> List:
+        """Return the curated conversation history as a list of Content."""
+        pass
+
+    @abstractmethod
+    def set_history(self, history: List) -> None:
+        """Continue the conversation from `history` without sending a request."""
+        pass
+
+    @abstractmethod
+    def reset_chat(self) -> None:
+        pass
+
+class AsyncLLMProvider(LLMProvider):
+    """LLMProvider whose send_message is a coroutine and send_message_stream an async generator."""
+
+    async def send_message(self, message: str) -> str:
+        """Async counterpart of LLMProvider.send_message; the event loop is free while waiting."""
+        try:
+            if self.context_budget is not None:
+                await self.context_budget.compact_async(self)
+            key, cached, history_start = self._lookup_cached(message)
+            if cached is not None:
+                return cached
+            text = await self._send(message)
+            self._store_cached(key, history_start, text)
+            return text
+        except Exception as e:
+            self.logger.error(f"{self.error_prefix}: {e}", exc_info=True)
+            return f"{self.error_prefix}: {str(e)}"
+
+    async def send_message_stream(self, message: str):
+        """Async counterpart of LLMProvider.send_message_stream."""
+        if self.context_budget is not None:
+            await self.context_budget.compact_async(self)
+        key, cached, history_start = self._lookup_cached(message)
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        async for text in self._stream(message):
+            parts.append(text)
+            yield text
+        self._store_cached(key, history_start, "".join(parts))
+
+    @abstractmethod
+    async def _send(self, message) -> str:
+        pass
+
+    @abstractmethod
+    async def _stream(self, message):
+        pass
@@ -0,0 +1,101 @@
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, List
+from core.llms.gemini import Gemini, create_client
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+class CircuitBreaker:
+    """
+    Failure counter for one model.
+
+    After `failure_threshold` consecutive failures the circuit opens and the model is
+    skipped for `cooldown_seconds`. Then it is half-open: the next request is a trial,
+    which closes the circuit on success and re-opens it on failure.
+    """
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 60.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                # A failed half-open trial re-opens the circuit for another full cool-down.
+                self._opened_at = time.monotonic()
+
+@dataclass
+class PoolEntry:
+    model: str
+    session: Any
+    breaker: CircuitBreaker
+
+class ClientPool:
+    """
+    Pre-initialized chat sessions for a primary model and its fallbacks.
+
+    All sessions share one genai.Client and are created up front, so falling back costs
+    neither client setup nor a new connection pool. Each model has its own circuit
+    breaker; `route()` yields the models worth trying for the next request, in order.
+    """
+    def __init__(self, models: List[str], config, client=None, session_class=Gemini,
+                 failure_threshold: int = 3, cooldown_seconds: float = 60.0, **session_kwargs):
+        """
+        Parameters:
+            models (list): Model names, primary first.
+            config: GenerateContentConfig shared by every session.
+            client (genai.Client): Optional shared client; created when omitted.
+            session_class: The LLMProvider class, e.g. Gemini, AsyncGemini or ReplayLLM.
+            failure_threshold (int): Consecutive failures that open a model's circuit.
+            cooldown_seconds (float): How long an open circuit skips its model.
+            session_kwargs: Extra keyword arguments for every session (e.g. response_cache).
+        """
+        if client is None and session_class.requires_client:
+            client = create_client()
+        self.client = client
+        self.entries = [
+            PoolEntry(model, session_class(model, config, client=self.client, **session_kwargs),
+                      CircuitBreaker(failure_threshold, cooldown_seconds))
+            for model in dict.fromkeys(models)
+        ]
+
+    @property
+    def primary(self):
+        return self.entries[0].session
+
+    def route(self) -> List[PoolEntry]:
+        """
+        Return the entries to try for the next request, in preference order. Models with
+        an open circuit are left out; if every circuit is open all models are tried anyway.
+        """
+        allowed = [entry for entry in self.entries if entry.breaker.allow()]
+        if len(allowed) < len(self.entries):
+            skipped = [entry.model for entry in self.entries if entry not in allowed]
+            logger.debug(f"Circuit open for {', '.join(skipped)}")
+        return allowed or list(self.entries)
+
+    def set_status_callback(self, callback) -> None:
+        for entry in self.entries:
+            entry.session.set_status_callback(callback)
@@ -0,0 +1,167 @@
+import json
+from typing import List, Optional, Tuple
+from google.genai import types
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+SUMMARY_PREFIX = "[Summary of the earlier conversation]"
+SUMMARY_ACK = "Understood. I'll continue from that summary."
+
+def _part_chars(part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_call is not None:
+        return len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+    if part.function_response is not None:
+        return len(json.dumps(part.function_response.response or {}, default=str))
+    return 0
+
+def estimate_tokens(history: List[types.Content]) -> int:
+    """Rough token count of a history (about four characters per token)."""
+    return sum(_part_chars(part) for content in history for part in (content.parts or [])) // 4
+
+def _is_user_message(content: types.Content) -> bool:
+    """True for a user turn carrying text, as opposed to a function response."""
+    return content.role == "user" and any(part.text for part in (content.parts or []))
+
+class ContextBudget:
+    """
+    Keeps a chat history within a token budget.
+
+    When the estimated history size passes `max_history_tokens`, large tool results are
+    cut down first (everywhere but the latest turn). If that is not enough, everything
+    before the last `keep_recent_turns` user turns is folded into a summary written by
+    `summary_model`; a previous summary is part of that older history, so summaries roll
+    forward instead of piling up. The chat is then rebuilt from summary + recent turns.
+    """
+    def __init__(self, max_history_tokens: int = 24000, keep_recent_turns: int = 6,
+                 tool_result_chars: int = 2000, summary_model: str = "gemini-2.0-flash",
+                 summary_max_words: int = 250):
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_turns = max(1, keep_recent_turns)
+        self.tool_result_chars = tool_result_chars
+        self.summary_model = summary_model
+        self.summary_max_words = summary_max_words
+
+    def over_budget(self, history: List[types.Content]) -> bool:
+        return estimate_tokens(history) > self.max_history_tokens
+
+    def _truncate_part(self, part: types.Part) -> types.Part:
+        response = part.function_response
+        if response is None or response.response is None:
+            return part
+        text = json.dumps(response.response, ensure_ascii=False, default=str)
+        if len(text) <= self.tool_result_chars:
+            return part
+        result = response.response.get("result", text)
+        result = result if isinstance(result, str) else text
+        clipped = result[:self.tool_result_chars] + f"... [truncated {len(result) - self.tool_result_chars} characters]"
+        return types.Part(function_response=types.FunctionResponse(name=response.name, id=response.id, response={"result": clipped}))
+
+    def truncate_tool_results(self, history: List[types.Content]) -> List[types.Content]:
+        """Clip function responses in every turn except the latest one."""
+        starts = [i for i, content in enumerate(history) if _is_user_message(content)]
+        cutoff = starts[-1] if starts else len(history)
+        clipped = []
+        for i, content in enumerate(history):
+            if i < cutoff and any(part.function_response is not None for part in (content.parts or [])):
+                content = types.Content(role=content.role, parts=[self._truncate_part(p) for p in content.parts])
+            clipped.append(content)
+        return clipped
+
+    def split(self, history: List[types.Content]) -> Tuple[List[types.Content], List[types.Content]]:
+        """Split into (older, recent), where recent starts at one of the last keep_recent_turns user turns."""
+        starts = [i for i, content in enumerate(history) if _is_user_message(content)]
+        if len(starts) <= self.keep_recent_turns:
+            return [], history
+        boundary = starts[-self.keep_recent_turns]
+        return history[:boundary], history[boundary:]
+
+    def summary_prompt(self, older: List[types.Content]) -> str:
+        lines = []
+        for content in older:
+            for part in content.parts or []:
+                if part.text:
+                    speaker = "User" if content.role == "user" else "IRIS"
+                    lines.append(f"{speaker}: {part.text}")
+                elif part.function_call is not None:
+                    lines.append(f"IRIS called {part.function_call.name}({json.dumps(part.function_call.args or {}, default=str)})")
+                elif part.function_response is not None:
+                    result = json.dumps(part.function_response.response or {}, ensure_ascii=False, default=str)
+                    lines.append(f"Tool {part.function_response.name} returned: {result[:500]}")
+        return (
+            "Summarize the conversation below between a user and the assistant IRIS so that IRIS can "
+            "continue it without the original messages. Keep facts about the user, decisions, names, "
+            f"numbers, open tasks and useful tool findings. Use at most {self.summary_max_words} words.\n\n"
+            + "\n".join(lines)
+        )
+
+    def fallback_summary(self, older: List[types.Content]) -> str:
+        """Extractive summary used when the summary model cannot be reached."""
+        notes = [part.text[:200] for content in older if content.role == "user"
+                 for part in (content.parts or []) if part.text]
+        return "Earlier the user said:\n" + "\n".join(f"- {note}" for note in notes[-20:])
+
+    def rebuild(self, summary: str, recent: List[types.Content]) -> List[types.Content]:
+        return [
+            types.Content(role="user", parts=[types.Part(text=f"{SUMMARY_PREFIX}\n{summary}")]),
+            types.Content(role="model", parts=[types.Part(text=SUMMARY_ACK)]),
+        ] + list(recent)
+
+    def plan(self, history: List[types.Content]) -> Tuple[Optional[List[types.Content]], List[types.Content], List[types.Content]]:
+        """
+        Decide what compaction a history needs.
+
+        Returns:
+            tuple: (history to use if no summary is needed, or None; older turns to summarize; recent turns)
+        """
+        clipped = self.truncate_tool_results(history)
+        if not self.over_budget(clipped):
+            return clipped, [], []
+        older, recent = self.split(clipped)
+        if not older:
+            return clipped, [], []
+        return None, older, recent
+
+    def _log(self, before: List[types.Content], after: List[types.Content]) -> None:
+        logger.debug(f"Context budget: history compacted from ~{estimate_tokens(before)} to ~{estimate_tokens(after)} tokens")
+
+    def compact(self, session) -> None:
+        """
+        Compact a Gemini session's history in place if it is over budget.
+
+        Parameters:
+            session: A Gemini session (get_history, set_history, client).
+        """
+        history = session.get_history()
+        if not self.over_budget(history):
+            return
+        compacted, older, recent = self.plan(history)
+        if compacted is None:
+            try:
+                response = session.client.models.generate_content(model=self.summary_model, contents=self.summary_prompt(older))
+                summary = response.text or self.fallback_summary(older)
+            except Exception as e:
+                logger.error(f"Context budget: summarization failed, using extractive summary: {e}")
+                summary = self.fallback_summary(older)
+            compacted = self.rebuild(summary, recent)
+        session.set_history(compacted)
+        self._log(history, compacted)
+
+    async def compact_async(self, session) -> None:
+        """Async counterpart of `compact` for AsyncGemini sessions."""
+        history = session.get_history()
+        if not self.over_budget(history):
+            return
+        compacted, older, recent = self.plan(history)
+        if compacted is None:
+            try:
+                response = await session.client.aio.models.generate_content(model=self.summary_model, contents=self.summary_prompt(older))
+                summary = response.text or self.fallback_summary(older)
+            except Exception as e:
+                logger.error(f"Context budget: summarization failed, using extractive summary: {e}")
+                summary = self.fallback_summary(older)
+            compacted = self.rebuild(summary, recent)
+        session.set_history(compacted)
+        self._log(history, compacted)
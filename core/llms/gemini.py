@@ -1,70 +1,215 @@
 import os
 from google import genai
+from google.genai import types
 from dotenv import load_dotenv
+from core.llms.base import AsyncLLMProvider, LLMProvider, copy_config
 from core.utils.logger import get_logger
 
 # Load environment variables
 
 load_dotenv()
 
-class Gemini:
-    def __init__(self, model_name, config):
+def response_text(response) -> str:
+    """Concatenated text parts of a (chunk of a) response, ignoring function calls and thoughts."""
+    if not response.candidates or not response.candidates[0].content:
+        return ""
+    return "".join(part.text for part in response.candidates[0].content.parts or [] if part.text and not part.thought)
+
+def stop_tool_rounds(chat, tool_executor, calls, text: str = "") -> str:
+    """
+    End a turn in which the model still calls tools after `max_rounds` rounds: the pending
+    calls are answered with errors in the history, so the next message continues from a
+    valid conversation, and a non-empty reply is returned in place of the missing answer.
+    """
+    fallback = (f"I stopped after {tool_executor.max_rounds} rounds of tool calls without reaching an answer. "
+                "Please narrow the request or ask me to continue.")
+    reply = f"{text}\n\n{fallback}" if text else fallback
+    chat.record_history(
+        types.Content(role="user", parts=tool_executor.abandon(calls)),
+        [types.Content(role="model", parts=[types.Part(text=fallback)])],
+        True,
+    )
+    return reply
+
+def create_client() -> genai.Client:
+    """
+    Create a Gemini API client from GEMINI_API_KEY.
+
+    A client holds the HTTP connection pools, so one client can be shared by many
+    chat sessions (sync and async) instead of opening a new one per conversation.
+    """
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY is not set in the environment.")
+    return genai.Client(api_key=api_key)
+
+class Gemini(LLMProvider):
+    error_prefix = "Error sending message via Gemini"
+
+    def __init__(self, model_name, config, client: genai.Client = None, response_cache=None,
+                 context_budget=None, tool_executor=None):
         """
         Initialize the Gemini agent using the Gemini API.
 
         Parameters:
             model_name (str): The identifier for the Gemini model to use (e.g., "gemini-2.0-flash").
             config (dict): Configuration options for text generation, including system_instruction and tools.
+            client (genai.Client): Optional shared client; a new one is created when omitted.
+            response_cache (ResponseCache): Optional cache answering repeated requests without a round trip.
+            context_budget (ContextBudget): Optional budget that compacts the history before each request.
+            tool_executor (ToolExecutor): When set, function calls are run by IRIS (in parallel) instead of
+                the SDK; the config must then have automatic function calling disabled.
         """
         self.logger = get_logger()
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY is not set in the environment.")
-        self.client = genai.Client(api_key=api_key)
+        self.client = client or create_client()
         self.model_name = model_name
+        self.response_cache = response_cache
+        self.context_budget = context_budget
+        self.tool_executor = tool_executor
         # Create a clean copy of the config removing any extra keys not accepted by GenerateContentConfig.
-        self.config = config.copy() if config else {}
+        self.config = copy_config(config)
         # Create a chat session with the given model and configuration.
         self.chat = self.client.chats.create(model=model_name, config=self.config)
         # Add status tracking
         self.current_status = None
         self.status_callback = None
 
-    def set_status_callback(self, callback):
-        """Set a callback function to be called when status changes"""
-        self.status_callback = callback
+    def _send(self, message) -> str:
+        """Send a message, then answer the model's function calls until it replies with text."""
+        response = self.chat.send_message(message)
+        rounds = 0
+        while self.tool_executor is not None and response.function_calls and rounds < self.tool_executor.max_rounds:
+            rounds += 1
+            response = self.chat.send_message(self.tool_executor.execute(response.function_calls))
+        if self.tool_executor is not None and response.function_calls:
+            return stop_tool_rounds(self.chat, self.tool_executor, response.function_calls, response_text(response))
+        return response_text(response)
 
-    def update_status(self, status):
-        """Update the current status and call the callback if set"""
-        self.current_status = status
-        if self.status_callback:
-            self.status_callback(status)
+    def _stream(self, message):
+        """Streaming counterpart of `_send`: yields text while collecting each round's function calls."""
+        rounds = 0
+        streamed = False
+        while True:
+            calls = []
+            for chunk in self.chat.send_message_stream(message):
+                calls.extend(chunk.function_calls or [])
+                text = response_text(chunk)
+                if text:
+                    streamed = True
+                    yield text
+            if self.tool_executor is None or not calls:
+                return
+            if rounds >= self.tool_executor.max_rounds:
+                fallback = stop_tool_rounds(self.chat, self.tool_executor, calls)
+                yield "\n\n" + fallback if streamed else fallback
+                return
+            rounds += 1
+            message = self.tool_executor.execute(calls)
 
-    def send_message(self, message: str) -> str:
-        """
-        Sends a message to Gemini using the chat conversation API and returns the generated text.
+    def get_history(self) -> list:
+        """Return the curated conversation history (list of Content) of the current chat."""
+        return self.chat.get_history(curated=True)
 
-        Parameters:
-            message (str): The user's input message.
+    def set_history(self, history: list) -> None:
+        """
+        Replace the chat session with one that continues from `history`. No request is made,
+        so this is how a conversation is handed over between models.
+        """
+        self.chat = self.client.chats.create(model=self.model_name, config=self.config, history=list(history))
 
-        Returns:
-            str: The generated response text from Gemini.
+    def reset_chat(self):
+        """
+        Resets the chat conversation by creating a new chat session.
         """
         try:
-            
-            # Send the message to Gemini
-            response = self.chat.send_message(message)
-            return response.text
+            self.chat = self.client.chats.create(model=self.model_name, config=self.config)
+            self.logger.success("Gemini chat session reset successfully.")
         except Exception as e:
-            self.logger.error(f"Error sending message via Gemini: {e}", exc_info=True)
-            return f"Error sending message via Gemini: {str(e)}"
+            self.logger.error(f"Error resetting Gemini chat session: {e}", exc_info=True)
+
+class AsyncGemini(AsyncLLMProvider):
+    """
+    Non-blocking counterpart of Gemini built on the SDK's asyncio client (client.aio).
+
+    While a request waits on the network the event loop is free, so one loop can drive
+    many concurrent chat sessions. With automatic function calling, coroutine tools are
+    awaited and plain tools run in a worker thread; with a tool_executor, the calls of one
+    model turn run concurrently.
+    """
+    error_prefix = "Error sending message via Gemini"
+
+    def __init__(self, model_name, config, client: genai.Client = None, response_cache=None,
+                 context_budget=None, tool_executor=None):
+        """
+        Parameters:
+            model_name (str): The identifier for the Gemini model to use.
+            config: GenerateContentConfig (or dict) including system_instruction and tools.
+            client (genai.Client): Optional shared client; a new one is created when omitted.
+            response_cache (ResponseCache): Optional cache answering repeated requests without a round trip.
+            context_budget (ContextBudget): Optional budget that compacts the history before each request.
+            tool_executor (ToolExecutor): When set, function calls are run by IRIS (in parallel) instead of
+                the SDK; the config must then have automatic function calling disabled.
+        """
+        self.logger = get_logger()
+        self.client = client or create_client()
+        self.model_name = model_name
+        self.response_cache = response_cache
+        self.context_budget = context_budget
+        self.tool_executor = tool_executor
+        self.config = copy_config(config)
+        self.chat = self.client.aio.chats.create(model=model_name, config=self.config)
+        self.current_status = None
+        self.status_callback = None
+
+    async def _send(self, message) -> str:
+        """Send a message, then answer the model's function calls until it replies with text."""
+        response = await self.chat.send_message(message)
+        rounds = 0
+        while self.tool_executor is not None and response.function_calls and rounds < self.tool_executor.max_rounds:
+            rounds += 1
+            response = await self.chat.send_message(await self.tool_executor.execute_async(response.function_calls))
+        if self.tool_executor is not None and response.function_calls:
+            return stop_tool_rounds(self.chat, self.tool_executor, response.function_calls, response_text(response))
+        return response_text(response)
+
+    async def _stream(self, message):
+        """Streaming counterpart of `_send`: yields text while collecting each round's function calls."""
+        rounds = 0
+        streamed = False
+        while True:
+            calls = []
+            async for chunk in await self.chat.send_message_stream(message):
+                calls.extend(chunk.function_calls or [])
+                text = response_text(chunk)
+                if text:
+                    streamed = True
+                    yield text
+            if self.tool_executor is None or not calls:
+                return
+            if rounds >= self.tool_executor.max_rounds:
+                fallback = stop_tool_rounds(self.chat, self.tool_executor, calls)
+                yield "\n\n" + fallback if streamed else fallback
+                return
+            rounds += 1
+            message = await self.tool_executor.execute_async(calls)
+
+    def get_history(self) -> list:
+        """Return the curated conversation history (list of Content) of the current chat."""
+        return self.chat.get_history(curated=True)
+
+    def set_history(self, history: list) -> None:
+        """
+        Replace the chat session with one that continues from `history`. No request is made,
+        so this is how a conversation is handed over between models.
+        """
+        self.chat = self.client.aio.chats.create(model=self.model_name, config=self.config, history=list(history))
 
     def reset_chat(self):
         """
         Resets the chat conversation by creating a new chat session.
         """
         try:
-            self.chat = self.client.chats.create(model=self.model_name, config=self.config)
+            self.chat = self.client.aio.chats.create(model=self.model_name, config=self.config)
             self.logger.success("Gemini chat session reset successfully.")
         except Exception as e:
             self.logger.error(f"Error resetting Gemini chat session: {e}", exc_info=True)
@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import time
+import asyncio
+import inspect
+from typing import List
+from google.genai import types
+from core.llms.base import AsyncLLMProvider, LLMProvider, copy_config
+from core.utils.logger import get_logger
+
+class ReplayChat:
+    """Minimal stand-in for the SDK chat object: curated and comprehensive history."""
+    def __init__(self, history: List[types.Content] = None):
+        self._history = list(history or [])
+
+    def get_history(self, curated: bool = False) -> List[types.Content]:
+        return list(self._history)
+
+    def record_history(self, user_input: types.Content, model_output: List[types.Content], is_valid: bool) -> None:
+        self._history.append(user_input)
+        self._history.extend(model_output or [types.Content(role="model", parts=[])])
+
+class ReplayLLM(LLMProvider):
+    """
+    Offline stand-in for Gemini that plays back a scripted conversation.
+
+    The script is a JSON file:
+
+        {"turns": [
+            {"match": "weather", "calls": [{"name": "get_weather", "args": {"location": "Paris"}}],
+             "response": "It is sunny in Paris."},
+            {"response": "You said: {message}"}
+        ]}
+
+    Turns are played in order and loop. A turn with "match" (a case-insensitive regex)
+    is only used for messages it matches; otherwise the next turn is tried. "calls" are
+    dispatched to the real tool callables from the config, and recorded in the history
+    as function call/response parts just as automatic function calling would. Each
+    request waits `latency_seconds` (plus per-turn "latency"), and streamed chunks are
+    `chunk_words` words apart by `chunk_delay_seconds`, so the agent, tool dispatch and
+    UI paths can be benchmarked without a network or an API key.
+    """
+    requires_client = False
+    error_prefix = "Error in replay backend"
+
+    def __init__(self, model_name, config, client=None, response_cache=None, context_budget=None,
+                 tool_executor=None, script: str = None, latency_seconds: float = 0.0, chunk_delay_seconds: float = 0.0,
+                 chunk_words: int = 3):
+        """
+        Parameters:
+            model_name (str): Reported model name; only used in logs and cache keys.
+            config: GenerateContentConfig whose tools the scripted calls are dispatched to.
+            client: Unused; accepted so the client pool can construct any provider alike.
+            response_cache (ResponseCache): Optional cache, as for Gemini.
+            context_budget (ContextBudget): Optional budget, as for Gemini.
+            tool_executor (ToolExecutor): Optional executor for scripted calls, as for Gemini.
+            script (str): Path of the JSON script. Without one every message is echoed back.
+            latency_seconds (float): Simulated time to the first response byte.
+            chunk_delay_seconds (float): Simulated delay between streamed chunks.
+            chunk_words (int): Words per streamed chunk.
+        """
+        self.logger = get_logger()
+        self.client = client
+        self.model_name = model_name
+        self.config = copy_config(config)
+        self.response_cache = response_cache
+        self.context_budget = context_budget
+        self.tool_executor = tool_executor
+        self.latency_seconds = latency_seconds
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.chunk_words = max(1, chunk_words)
+        self.turns = self._load_script(script)
+        self._cursor = 0
+        self.tools = self._config_tools()
+        self.chat = ReplayChat()
+        self.current_status = None
+        self.status_callback = None
+
+    def _config_tools(self) -> dict:
+        tools = getattr(self.config, "tools", None) if not isinstance(self.config, dict) else self.config.get("tools")
+        return {getattr(tool, "__name__", ""): tool for tool in (tools or []) if callable(tool)}
+
+    def update_config(self, config) -> None:
+        super().update_config(config)
+        self.tools = self._config_tools()
+
+    def _load_script(self, script: str) -> list:
+        if script and os.path.exists(script):
+            try:
+                with open(script, "r", encoding="utf-8") as f:
+                    turns = json.load(f).get("turns", [])
+                if turns:
+                    return turns
+            except Exception as e:
+                self.logger.error(f"Error loading replay script {script}: {e}")
+        elif script:
+            self.logger.error(f"Replay script {script} not found; echoing messages instead.")
+        return [{"response": "You said: {message}"}]
+
+    def _next_turn(self, message: str) -> dict:
+        for offset in range(len(self.turns)):
+            index = (self._cursor + offset) % len(self.turns)
+            turn = self.turns[index]
+            pattern = turn.get("match")
+            if pattern is None or re.search(pattern, message, re.IGNORECASE):
+                self._cursor = index + 1
+                return turn
+        return {"response": "You said: {message}"}
+
+    def _call_tool(self, name: str, args: dict):
+        tool = self.tools.get(name)
+        if tool is None:
+            return {"error": f"Unknown tool {name}"}
+        try:
+            return {"result": tool(**args)}
+        except Exception as e:
+            return {"error": str(e)}
+
+    @staticmethod
+    def _function_calls(calls: list) -> list:
+        return [types.FunctionCall(name=c["name"], args=c.get("args", {})) for c in calls]
+
+    def _record_calls(self, message: str, calls: list, results: list) -> types.Content:
+        """Record the user message and function call round into the history; return the next user input."""
+        user_input = types.Content(role="user", parts=[types.Part(text=message)])
+        if not calls:
+            return user_input
+        call_content = types.Content(role="model", parts=[types.Part(function_call=c) for c in self._function_calls(calls)])
+        self.chat.record_history(user_input, [call_content], True)
+        return types.Content(role="user", parts=[
+            types.Part(function_response=types.FunctionResponse(name=c["name"], response=r)) for c, r in zip(calls, results)
+        ])
+
+    def _play(self, message: str):
+        """Dispatch one scripted turn's calls. Returns (turn, next user input, response text)."""
+        turn = self._next_turn(message)
+        calls = turn.get("calls", [])
+        if calls and self.tool_executor is not None:
+            results = [p.function_response.response for p in self.tool_executor.execute(self._function_calls(calls))]
+        else:
+            for call in calls:
+                self.update_status(f"Using {call['name']}...")
+            results = [self._call_tool(call["name"], call.get("args", {})) for call in calls]
+            if calls:
+                self.update_status(None)
+        return turn, self._record_calls(message, calls, results), turn.get("response", "").replace("{message}", message)
+
+    def _chunks(self, text: str) -> List[str]:
+        words = re.findall(r"\S+\s*", text)
+        return ["".join(words[i:i + self.chunk_words]) for i in range(0, len(words), self.chunk_words)]
+
+    def _finish(self, user_input: types.Content, text: str) -> None:
+        self.chat.record_history(user_input, [types.Content(role="model", parts=[types.Part(text=text)])], True)
+
+    def _send(self, message: str) -> str:
+        turn, user_input, text = self._play(message)
+        time.sleep(self.latency_seconds + turn.get("latency", 0.0))
+        self._finish(user_input, text)
+        return text
+
+    def _stream(self, message: str):
+        turn, user_input, text = self._play(message)
+        time.sleep(self.latency_seconds + turn.get("latency", 0.0))
+        for i, chunk in enumerate(self._chunks(text)):
+            if i and self.chunk_delay_seconds:
+                time.sleep(self.chunk_delay_seconds)
+            yield chunk
+        self._finish(user_input, text)
+
+    def get_history(self) -> list:
+        return self.chat.get_history(curated=True)
+
+    def set_history(self, history: list) -> None:
+        self.chat = ReplayChat(history)
+
+    def reset_chat(self):
+        self.chat = ReplayChat()
+        self._cursor = 0
+
+class AsyncReplayLLM(ReplayLLM, AsyncLLMProvider):
+    """ReplayLLM for AsyncIRISAgent: waits with asyncio.sleep and awaits coroutine tools."""
+
+    async def _call_tool_async(self, name: str, args: dict):
+        tool = self.tools.get(name)
+        if tool is None or not inspect.iscoroutinefunction(tool):
+            return self._call_tool(name, args)
+        try:
+            return {"result": await tool(**args)}
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _play_async(self, message: str):
+        turn = self._next_turn(message)
+        calls = turn.get("calls", [])
+        if calls and self.tool_executor is not None:
+            parts = await self.tool_executor.execute_async(self._function_calls(calls))
+            results = [p.function_response.response for p in parts]
+        else:
+            results = await asyncio.gather(*(self._call_tool_async(c["name"], c.get("args", {})) for c in calls))
+        await asyncio.sleep(self.latency_seconds + turn.get("latency", 0.0))
+        return self._record_calls(message, calls, list(results)), turn.get("response", "").replace("{message}", message)
+
+    async def _send(self, message: str) -> str:
+        user_input, text = await self._play_async(message)
+        self._finish(user_input, text)
+        return text
+
+    async def _stream(self, message: str):
+        user_input, text = await self._play_async(message)
+        for i, chunk in enumerate(self._chunks(text)):
+            if i and self.chunk_delay_seconds:
+                await asyncio.sleep(self.chunk_delay_seconds)
+            yield chunk
+        self._finish(user_input, text)
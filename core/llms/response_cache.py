@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Iterable, Optional, Tuple
+from google.genai import types
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+class ResponseCache:
+    """
+    On-disk cache of final model answers, keyed by a hash of everything that determines
+    the answer under a fixed seed: model name, generation config (including the system
+    instruction and tool names), the most recent history turns and the new message.
+
+    Entries expire after `ttl_seconds`; beyond `max_entries` the least recently used are
+    dropped. Answers produced by calling a bypass tool (side effects, or output that
+    depends on the moment, such as the clock) are never stored, so replaying a cached
+    answer can never skip an action the user asked for.
+    """
+    def __init__(self, db_file: str = "data/response_cache.db", max_entries: int = 1000,
+                 ttl_seconds: float = 86400, history_turns: int = 6, bypass_tools: Iterable[str] = ()):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.history_turns = history_turns
+        self.bypass_tools = set(bypass_tools)
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+        """)
+
+    def make_key(self, model_name: str, config, history: list, message: str) -> str:
+        """
+        Hash the inputs of one request.
+
+        Parameters:
+            model_name (str): The model identifier.
+            config: The chat's GenerateContentConfig (or dict).
+            history (list): The chat's curated history before this message (list of Content).
+            message (str): The new user message.
+
+        Returns:
+            str: Hex digest identifying the request.
+        """
+        if hasattr(config, "model_dump"):
+            tools = config.tools or []
+            config_data = config.model_dump(mode="json", exclude={"tools"}, exclude_none=True)
+        else:
+            config_data = {k: v for k, v in (config or {}).items() if k != "tools"}
+            tools = (config or {}).get("tools") or []
+        config_data["tool_names"] = sorted(getattr(tool, "__name__", repr(tool)) for tool in tools)
+        recent = history[-self.history_turns:] if self.history_turns else []
+        payload = {
+            "model": model_name,
+            "config": config_data,
+            "history": [c.model_dump(mode="json", exclude_none=True) if hasattr(c, "model_dump") else c for c in recent],
+            "message": message,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, new_history: list) -> bool:
+        """
+        Return False if the history produced by a request (the contents appended to the
+        chat for it, including automatic function calls) called any bypass tool.
+        """
+        for content in new_history:
+            for part in getattr(content, "parts", None) or []:
+                call = getattr(part, "function_call", None)
+                if call is not None and call.name in self.bypass_tools:
+                    return False
+        return True
+
+    def lookup(self, chat, model_name: str, config, message: str) -> Tuple[str, Optional[str]]:
+        """
+        Look up `message` for a chat session before it is sent.
+
+        On a hit the cached exchange is appended to the chat's history, exactly as if
+        the model had answered, so later turns see a consistent conversation.
+
+        Returns:
+            tuple: (key, cached response or None). Pass the key to `store` after a miss.
+        """
+        key = self.make_key(model_name, config, chat.get_history(curated=True), message)
+        cached = self.get(key)
+        if cached is not None:
+            chat.record_history(
+                user_input=types.Content(role="user", parts=[types.Part(text=message)]),
+                model_output=[types.Content(role="model", parts=[types.Part(text=cached)])],
+                is_valid=True,
+            )
+            logger.debug(f"Response cache hit {key[:12]}")
+        return key, cached
+
+    def store(self, key: str, chat, history_start: int, response: str) -> None:
+        """
+        Cache `response` unless it is empty or the turn (the chat's comprehensive history
+        from `history_start` on) called a bypass tool.
+        """
+        if response and self.is_cacheable(chat.get_history()[history_start:]):
+            self.put(key, response)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds and row[1] + self.ttl_seconds <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, response, now, now),
+                )
+                if self.ttl_seconds:
+                    self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl_seconds,))
+                if self.max_entries is not None:
+                    count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                    if count > self.max_entries:
+                        self._conn.execute(
+                            "DELETE FROM responses WHERE key IN "
+                            "(SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                            (count - self.max_entries,),
+                        )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
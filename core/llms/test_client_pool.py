@@ -0,0 +1,29 @@
+import time
+from core.llms.client_pool import CircuitBreaker, ClientPool
+
+class FakeSession:
+    def __init__(self, model_name, config, client=None):
+        self.model_name = model_name
+
+def test_breaker_opens_after_threshold_and_half_opens_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=0.2)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.25)
+    assert breaker.state == "half_open" and breaker.allow()
+    breaker.record_failure()  # failed trial
+    assert breaker.state == "open"
+    time.sleep(0.25)
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_route_skips_open_models_unless_all_are_open():
+    pool = ClientPool(["primary", "fallback", "primary"], {}, client=object(), session_class=FakeSession,
+                      failure_threshold=1, cooldown_seconds=60)
+    assert [entry.model for entry in pool.route()] == ["primary", "fallback"]
+    pool.entries[0].breaker.record_failure()
+    assert [entry.model for entry in pool.route()] == ["fallback"]
+    pool.entries[1].breaker.record_failure()
+    assert [entry.model for entry in pool.route()] == ["primary", "fallback"]
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+from google.genai import types
+from core.llms.gemini import AsyncGemini, Gemini
+from core.tools.tool_executor import ToolExecutor
+
+def calling_response(n: int):
+    call = types.FunctionCall(id=f"c{n}", name="lookup", args={"n": n})
+    content = types.Content(role="model", parts=[types.Part(function_call=call)])
+    return types.GenerateContentResponse(candidates=[types.Candidate(content=content)])
+
+class LoopingChat:
+    """A chat whose model answers every message with another function call."""
+    def __init__(self):
+        self.sent = []
+        self.history = []
+
+    def send_message(self, message):
+        self.sent.append(message)
+        return calling_response(len(self.sent))
+
+    def send_message_stream(self, message):
+        yield self.send_message(message)
+
+    def record_history(self, user_input, model_output, is_valid):
+        self.history.append(user_input)
+        self.history.extend(model_output)
+
+class AsyncLoopingChat(LoopingChat):
+    async def send_message(self, message):
+        return LoopingChat.send_message(self, message)
+
+    async def send_message_stream(self, message):
+        async def chunks():
+            yield LoopingChat.send_message(self, message)
+        return chunks()
+
+def lookup(n: int) -> str:
+    return f"value {n}"
+
+def make_executor():
+    return ToolExecutor([lookup], max_workers=2, max_rounds=2)
+
+def assert_stopped(chat, reply):
+    assert "2 rounds of tool calls" in reply
+    assert len(chat.sent) == 3  # the message and two rounds of results
+    answered = chat.history[0].parts[0].function_response
+    assert answered.id == "c3" and "limit" in answered.response["error"]
+    assert chat.history[1].role == "model" and chat.history[1].parts[0].text
+
+def test_send_answers_pending_calls_when_rounds_run_out():
+    chat = LoopingChat()
+    client = SimpleNamespace(chats=SimpleNamespace(create=lambda **kwargs: chat))
+    llm = Gemini("test-model", {}, client=client, tool_executor=make_executor())
+    assert_stopped(chat, llm.send_message("hi"))
+
+def test_stream_yields_fallback_when_rounds_run_out():
+    chat = LoopingChat()
+    client = SimpleNamespace(chats=SimpleNamespace(create=lambda **kwargs: chat))
+    llm = Gemini("test-model", {}, client=client, tool_executor=make_executor())
+    assert_stopped(chat, "".join(llm.send_message_stream("hi")))
+
+def test_async_send_and_stream_answer_pending_calls():
+    async def run(stream):
+        chat = AsyncLoopingChat()
+        client = SimpleNamespace(aio=SimpleNamespace(chats=SimpleNamespace(create=lambda **kwargs: chat)))
+        llm = AsyncGemini("test-model", {}, client=client, tool_executor=make_executor())
+        if stream:
+            return chat, "".join([text async for text in llm.send_message_stream("hi")])
+        return chat, await llm.send_message("hi")
+
+    for stream in (False, True):
+        assert_stopped(*asyncio.run(run(stream)))
@@ -0,0 +1,45 @@
+import json
+import asyncio
+from core.llms.replay import AsyncReplayLLM, ReplayLLM
+from core.llms.response_cache import ResponseCache
+
+def make_llm(cls, tmp_path):
+    script = tmp_path / "script.json"
+    script.write_text(json.dumps({"turns": [{"response": "first answer"}, {"response": "second answer"}]}))
+    cache = ResponseCache(db_file=str(tmp_path / "responses.db"))
+    return cls("replay", {}, response_cache=cache, script=str(script))
+
+def test_stream_stores_and_reuses_cached_answers(tmp_path):
+    llm = make_llm(ReplayLLM, tmp_path)
+    assert "".join(llm.send_message_stream("hi")) == "first answer"
+    llm.set_history([])
+    assert "".join(llm.send_message_stream("hi")) == "first answer"
+    assert llm._cursor == 1  # the script was not played again
+    assert len(llm.get_history()) == 2
+    llm.response_cache.close()
+
+def test_async_stream_stores_and_reuses_cached_answers(tmp_path):
+    llm = make_llm(AsyncReplayLLM, tmp_path)
+
+    async def stream():
+        return "".join([chunk async for chunk in llm.send_message_stream("hi")])
+
+    assert asyncio.run(stream()) == "first answer"
+    llm.set_history([])
+    assert asyncio.run(stream()) == "first answer"
+    assert llm._cursor == 1
+    llm.response_cache.close()
+
+def test_send_and_stream_share_the_cache(tmp_path):
+    llm = make_llm(ReplayLLM, tmp_path)
+    assert llm.send_message("hi") == "first answer"
+    llm.set_history([])
+    assert "".join(llm.send_message_stream("hi")) == "first answer"
+    assert llm._cursor == 1
+    llm.response_cache.close()
+
+def test_send_reports_errors_with_the_provider_prefix(tmp_path, monkeypatch):
+    llm = make_llm(ReplayLLM, tmp_path)
+    monkeypatch.setattr(llm, "_play", lambda message: 1 / 0)
+    assert llm.send_message("hi").startswith("Error in replay backend: division by zero")
+    llm.response_cache.close()
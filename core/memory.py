@@ -1,44 +1,182 @@
 import os
 import json
+import time
 import datetime
+import threading
+from typing import Dict, List, Tuple
+from core.storage.eviction import EvictionTracker
+from core.storage.memory_backends import MemoryBackend, JSONMemoryBackend, SQLiteMemoryBackend
+from core.storage.writer import append_lines
+from core.utils.logger import get_logger
+
+logger = get_logger()
 
 class MemoryManager:
-    def __init__(self, memory_file: str = None):
+    def __init__(self, memory_file: str = None, writer=None, backend: str = "json", db_file: str = None,
+                 max_entries: int = None, default_ttl: float = None, eviction: str = "lru", cold_archive: str = None):
+        """
+        Parameters:
+            memory_file (str): JSON memory file; also the one-time import source for the SQLite backend.
+            writer: Optional PersistenceWorker used for write-behind saves.
+            backend (str | MemoryBackend): "json" (default), "sqlite", or a ready MemoryBackend instance.
+            db_file (str): SQLite database path (defaults to memory.db next to the JSON file).
+            max_entries (int): Capacity limit; the eviction policy drops entries beyond it. None means unbounded.
+            default_ttl (float): Seconds an entry lives unless a per-key TTL is given. None means forever.
+            eviction (str): "lru" or "lfu".
+            cold_archive (str): JSONL file that evicted and expired entries are spilled to. None drops them.
+        """
         if memory_file is None:
             self.memory_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'memory.json')
         else:
             self.memory_file = memory_file
-        self.memory = self.load_memory()
-
-    def load_memory(self) -> dict:
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if isinstance(data, dict):
-                    return data
-                else:
-                    return {}
-            except Exception:
-                return {}
+        if isinstance(backend, MemoryBackend):
+            self.backend = backend
+        elif backend == "sqlite":
+            db_file = db_file or os.path.join(os.path.dirname(self.memory_file), "memory.db")
+            self.backend = SQLiteMemoryBackend(db_file, import_json_file=self.memory_file)
+        elif backend == "json":
+            self.backend = JSONMemoryBackend(self.memory_file, writer=writer)
         else:
-            return {}
+            raise ValueError(f"Unknown memory backend: {backend}")
+        self._listeners = []
+        self.writer = writer
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.cold_archive = cold_archive
+        # Expiry times and access statistics are kept by the backend, per key; only the keys
+        # touched since the last flush are written.
+        self._lock = threading.RLock()
+        self._meta_dirty = {}
+        self._meta_flush_pending = False
+        self.tracker = EvictionTracker(eviction)
+        self.tracker.load(self.backend.load_meta(), self.backend.keys())
+        self.enforce_limits()
+
+    def _mark_meta(self, keys) -> None:
+        """Record that the bookkeeping of `keys` changed. Call with the lock held."""
+        for key in keys:
+            self._meta_dirty[key] = self.tracker.meta(key)
+
+    def _flush_meta(self, fsync: bool = False) -> None:
+        with self._lock:
+            updates, self._meta_dirty = self._meta_dirty, {}
+            self._meta_flush_pending = False
+        if updates:
+            self.backend.save_meta(updates)
+
+    def _save_meta(self) -> None:
+        if self.writer is None:
+            self._flush_meta()
+            return
+        with self._lock:
+            if self._meta_flush_pending or not self._meta_dirty:
+                return
+            self._meta_flush_pending = True
+        # Changes made before the worker runs are written in the same batch.
+        self.writer.submit(self._flush_meta)
+
+    def add_listener(self, listener) -> None:
+        """
+        Register listener(op, items) to be called after every write, where op is
+        "set" or "delete" and items maps the affected keys to their new values.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, op: str, items: dict) -> None:
+        for listener in self._listeners:
+            listener(op, items)
 
-    def save_memory(self) -> None:
-        data_dir = os.path.dirname(self.memory_file)
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        with open(self.memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.memory, f, indent=2)
+    def set(self, key: str, value: str, ttl: float = None) -> None:
+        self.set_many({key: value}, ttl)
 
-    def set(self, key: str, value: str) -> None:
-        self.memory[key] = value
-        self.save_memory()
+    def set_many(self, items: Dict[str, str], ttl: float = None) -> None:
+        if len(items) == 1:
+            self.backend.set(*next(iter(items.items())))
+        else:
+            self.backend.set_many(items)
+        with self._lock:
+            now = time.time()
+            for key in items:
+                self.tracker.record_set(key, ttl or self.default_ttl, now)
+            self._mark_meta(items)
+        self._notify("set", items)
+        self.enforce_limits()
 
     def get(self, key: str) -> str:
-        return self.memory.get(key, "")
+        with self._lock:
+            if self.tracker.is_expired(key):
+                self._evict([key], "expired")
+                return ""
+            tracked = key in self.tracker
+            if tracked:
+                self.tracker.touch(key)
+                self._mark_meta([key])
+        if tracked:
+            self._save_meta()
+        value = self.backend.get(key)
+        return value if value is not None else ""
+
+    def delete(self, key: str) -> bool:
+        found = self.backend.delete(key)
+        with self._lock:
+            tracked = key in self.tracker
+            if tracked:
+                self.tracker.forget(key)
+                self._mark_meta([key])
+        if found:
+            self._notify("delete", {key: None})
+        if tracked:
+            self._save_meta()
+        return found
+
+    def scan(self, prefix: str, limit: int = None) -> List[Tuple[str, str]]:
+        return self.backend.scan_prefix(prefix, limit)
 
-    def append(self, content: str) -> str:
+    def append(self, content: str, ttl: float = None) -> str:
         key = "memory_" + datetime.datetime.now().isoformat()
-        self.set(key, content)
-        return key 
\ No newline at end of file
+        self.set(key, content, ttl)
+        return key
+
+    def enforce_limits(self) -> None:
+        """
+        Drop expired entries, then evict by policy until the store fits in max_entries.
+        """
+        with self._lock:
+            expired = self.tracker.pop_expired()
+            victims = []
+            if self.max_entries is not None:
+                while len(self.tracker) > self.max_entries:
+                    key = self.tracker.pop_victim()
+                    if key is None:
+                        break
+                    victims.append(key)
+        if expired:
+            self._evict(expired, "expired")
+        if victims:
+            self._evict(victims, "evicted")
+        self._save_meta()
+
+    def _evict(self, keys: List[str], reason: str) -> None:
+        spilled = []
+        now = datetime.datetime.now().isoformat()
+        for key in keys:
+            value = self.backend.get(key)
+            with self._lock:
+                self.tracker.forget(key)
+                self._mark_meta([key])
+            if value is None or not self.backend.delete(key):
+                continue
+            spilled.append(json.dumps({"key": key, "value": value, "reason": reason, "at": now}, ensure_ascii=False))
+            self._notify("delete", {key: None})
+        if spilled and self.cold_archive:
+            if self.writer is not None:
+                for line in spilled:
+                    self.writer.append(self.cold_archive, line)
+            else:
+                append_lines(self.cold_archive, spilled)
+        if spilled:
+            logger.debug(f"Memory: {len(spilled)} entries {reason}")
+
+    def close(self) -> None:
+        self._flush_meta()
+        self.backend.close()
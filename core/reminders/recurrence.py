@@ -0,0 +1,140 @@
+import re
+from datetime import datetime, timedelta
+
+DAY_NAMES = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
+INTERVAL_UNITS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+# Bounds the search in CronSchedule.next_after; a valid expression always matches within this window.
+MAX_CRON_SEARCH_DAYS = 366 * 5
+
+class IntervalSchedule:
+    """Fires every `interval`, counted from `anchor`."""
+    def __init__(self, interval: timedelta, anchor: datetime):
+        if interval <= timedelta(0):
+            raise ValueError("Recurrence interval must be positive.")
+        self.interval = interval
+        self.anchor = anchor
+
+    def next_after(self, moment: datetime) -> datetime:
+        if moment < self.anchor:
+            return self.anchor
+        # Jump straight to the next multiple of the interval instead of stepping through the missed ones.
+        steps = (moment - self.anchor) // self.interval + 1
+        return self.anchor + steps * self.interval
+
+class CronSchedule:
+    """
+    Standard five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Fields accept `*`, numbers, ranges `a-b`, steps `*/n` and `a-b/n`, and comma lists.
+    Day-of-week is 0-7 (0 and 7 are Sunday) and accepts three-letter names. As in cron,
+    when both day fields are restricted a day matching either one fires.
+    """
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expression}'")
+        self.expression = expression
+        self.minutes = self._parse_field(fields[0], 0, 59)
+        self.hours = self._parse_field(fields[1], 0, 23)
+        self.days = self._parse_field(fields[2], 1, 31)
+        self.months = self._parse_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in self._parse_field(fields[4], 0, 7, DAY_NAMES)}
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+        self._sorted_minutes = sorted(self.minutes)
+        self._sorted_hours = sorted(self.hours)
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int, names: dict = None) -> set:
+        values = set()
+        for part in field.lower().split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step in '{field}'")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = CronSchedule._value(start_text, names), CronSchedule._value(end_text, names)
+            else:
+                start = CronSchedule._value(part, names)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field '{field}' is out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    @staticmethod
+    def _value(text: str, names: dict = None) -> int:
+        if names and text[:3] in names:
+            return names[text[:3]]
+        return int(text)
+
+    def _day_matches(self, day: datetime) -> bool:
+        dom = day.day in self.days
+        # datetime.weekday() is Monday=0; cron counts from Sunday=0.
+        dow = (day.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return dom or dow
+        if self.days_restricted:
+            return dom
+        if self.weekdays_restricted:
+            return dow
+        return True
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = candidate.replace(hour=0, minute=0)
+        for _ in range(MAX_CRON_SEARCH_DAYS):
+            if day.month in self.months and self._day_matches(day):
+                # Within a matching day, pick the first hour/minute at or after the candidate.
+                start_hour = candidate.hour if day.date() == candidate.date() else 0
+                for hour in self._sorted_hours:
+                    if hour < start_hour:
+                        continue
+                    start_minute = candidate.minute if (day.date() == candidate.date() and hour == start_hour) else 0
+                    for minute in self._sorted_minutes:
+                        if minute >= start_minute:
+                            return day.replace(hour=hour, minute=minute)
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression '{self.expression}' never fires.")
+
+def parse_recurrence(spec: str, anchor: datetime) -> object:
+    """
+    Parse a recurrence specification into a schedule with a `next_after(datetime)` method.
+
+    Supported forms:
+        "every 30 minutes", "every 2 hours", "every day", "every 3 weeks"
+        "daily 08:30", "weekdays 09:00", "mon,wed,fri 18:15"
+        "cron */15 9-17 * * 1-5" (a bare five-field expression also works)
+
+    `anchor` is the first occurrence for interval schedules.
+    """
+    text = " ".join(spec.strip().lower().split())
+    match = re.fullmatch(r"every (?:(\d+) )?(minute|hour|day|week)s?", text)
+    if match:
+        count = int(match.group(1) or 1)
+        return IntervalSchedule(count * INTERVAL_UNITS[match.group(2)], anchor)
+    match = re.fullmatch(r"(daily|weekdays|weekends|[a-z]{3}(?:,[a-z]{3})*) (\d{1,2}):(\d{2})", text)
+    if match:
+        days, hour, minute = match.group(1), int(match.group(2)), int(match.group(3))
+        if days == "daily":
+            dow = "*"
+        elif days == "weekdays":
+            dow = "1-5"
+        elif days == "weekends":
+            dow = "0,6"
+        else:
+            dow = days
+        return CronSchedule(f"{minute} {hour} * * {dow}")
+    if text.startswith("cron "):
+        text = text[len("cron "):]
+    return CronSchedule(text)
@@ -0,0 +1,113 @@
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+# Upper bound on a single sleep so a suspended machine or a wall-clock change
+# is noticed without a fresh schedule() call. One O(1) wake-up per interval.
+MAX_SLEEP_SECONDS = 300
+
+class ReminderScheduler:
+    """
+    Fires reminders at their due time using a min-heap keyed on the parsed due datetime.
+
+    `schedule()` and `cancel()` are O(log n) and wake the scheduler thread through a
+    condition variable, so it only ever sleeps until the earliest due entry. Cancelled
+    or rescheduled entries are left in the heap and skipped when they surface.
+    """
+    def __init__(self, on_due):
+        """
+        Parameters:
+            on_due (callable): Called on the scheduler thread as on_due(name, payload) once per due entry.
+        """
+        self.on_due = on_due
+        self._heap = []
+        self._live = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def start(self) -> "ReminderScheduler":
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="iris-reminders", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(1.0)
+        self._thread = None
+
+    def schedule(self, name: str, due: datetime, payload=None) -> None:
+        """
+        Schedule (or reschedule) the entry `name` to fire at `due`.
+        """
+        with self._cond:
+            token = next(self._counter)
+            self._live[name] = token
+            heapq.heappush(self._heap, (due, token, name, payload))
+            self._cond.notify_all()
+
+    def cancel(self, name: str) -> bool:
+        with self._cond:
+            found = self._live.pop(name, None) is not None
+            if found:
+                self._maybe_rebuild()
+                self._cond.notify_all()
+            return found
+
+    def next_due(self):
+        """Return the earliest pending due datetime, or None."""
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _maybe_rebuild(self) -> None:
+        # Keep stale entries from dominating the heap after many cancels/reschedules.
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [item for item in self._heap if self._live.get(item[2]) == item[1]]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._live.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            due_now = []
+            with self._cond:
+                while not self._stopping:
+                    self._drop_stale()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = (self._heap[0][0] - datetime.now()).total_seconds()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(min(delay, MAX_SLEEP_SECONDS))
+                if self._stopping:
+                    return
+                now = datetime.now()
+                while self._heap and self._heap[0][0] <= now:
+                    due, token, name, payload = heapq.heappop(self._heap)
+                    if self._live.get(name) == token:
+                        del self._live[name]
+                        due_now.append((name, payload))
+            for name, payload in due_now:
+                try:
+                    self.on_due(name, payload)
+                except Exception as e:
+                    logger.error(f"Error delivering reminder '{name}': {e}", exc_info=True)
@@ -0,0 +1,78 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from core.reminders.scheduler import ReminderScheduler
+
+class Recorder:
+    def __init__(self):
+        self.fired = []
+        self.event = threading.Event()
+
+    def __call__(self, name, payload):
+        self.fired.append((name, payload, datetime.now()))
+        self.event.set()
+
+def in_seconds(seconds: float) -> datetime:
+    return datetime.now() + timedelta(seconds=seconds)
+
+def test_entries_fire_in_due_order():
+    recorder = Recorder()
+    scheduler = ReminderScheduler(recorder).start()
+    scheduler.schedule("late", in_seconds(0.3), "b")
+    scheduler.schedule("early", in_seconds(0.1), "a")
+    time.sleep(0.6)
+    scheduler.stop()
+    assert [(name, payload) for name, payload, _ in recorder.fired] == [("early", "a"), ("late", "b")]
+    assert len(scheduler) == 0
+
+def test_scheduling_an_earlier_entry_wakes_the_thread():
+    recorder = Recorder()
+    scheduler = ReminderScheduler(recorder).start()
+    scheduler.schedule("far", in_seconds(60))
+    time.sleep(0.05)  # the thread is now sleeping until "far"
+    due = in_seconds(0.1)
+    scheduler.schedule("soon", due)
+    assert recorder.event.wait(2)
+    assert recorder.fired[0][0] == "soon"
+    assert recorder.fired[0][2] - due < timedelta(seconds=0.5)
+    scheduler.stop()
+
+def test_cancel_and_reschedule_fire_at_most_once():
+    recorder = Recorder()
+    scheduler = ReminderScheduler(recorder).start()
+    scheduler.schedule("cancelled", in_seconds(0.1))
+    assert scheduler.cancel("cancelled")
+    assert not scheduler.cancel("cancelled")
+    scheduler.schedule("moved", in_seconds(0.1), "old")
+    scheduler.schedule("moved", in_seconds(0.2), "new")
+    time.sleep(0.5)
+    scheduler.stop()
+    assert [(name, payload) for name, payload, _ in recorder.fired] == [("moved", "new")]
+
+def test_failing_callback_does_not_stop_the_scheduler():
+    fired = []
+
+    def on_due(name, payload):
+        fired.append(name)
+        if name == "bad":
+            raise RuntimeError("boom")
+
+    scheduler = ReminderScheduler(on_due).start()
+    scheduler.schedule("bad", in_seconds(0.05))
+    scheduler.schedule("good", in_seconds(0.15))
+    time.sleep(0.4)
+    scheduler.stop()
+    assert fired == ["bad", "good"]
+
+def test_stale_heap_entries_are_pruned():
+    scheduler = ReminderScheduler(lambda name, payload: None)
+    for i in range(500):
+        scheduler.schedule("same", in_seconds(60 + i))
+    other = in_seconds(30)
+    scheduler.schedule("other", other)
+    for _ in range(200):
+        scheduler.schedule("x", in_seconds(90))
+        scheduler.cancel("x")
+    assert len(scheduler) == 2
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+    assert scheduler.next_due() == other
@@ -0,0 +1,482 @@
+import os
+import hmac
+import json
+import base64
+import struct
+import asyncio
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from dotenv import load_dotenv
+from core.agents.async_iris_agent import AsyncIRISAgent, prepare_async_tools
+from core.agents.iris_agent import PROVIDERS, load_response_cache, load_tool_executor
+from core.config.config_manager import ConfigManager
+from core.llms.gemini import create_client
+from core.reminders.scheduler import ReminderScheduler
+from core.session import IRISSession, dispatch_reminder, load_system_prompt
+from core.storage.writer import PersistenceWorker
+from core.tools.isolation import load_worker_pool
+from core.tools.result_cache import load_tool_cache
+from core.tools.tool_manager import load_tool_manager
+from core.tools.tool_watcher import load_tool_watcher
+from core.utils.logger import get_logger
+from core.utils.profiler import get_profiler
+
+load_dotenv()
+logger = get_logger()
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+                405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class Request:
+    def __init__(self, method: str, target: str, headers: dict, body: bytes):
+        self.method = method
+        url = urlsplit(target)
+        self.path = url.path
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    @property
+    def is_websocket(self) -> bool:
+        return (self.headers.get("upgrade", "").lower() == "websocket"
+                and "upgrade" in self.headers.get("connection", "").lower())
+
+    def json(self) -> dict:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+async def read_request(reader: asyncio.StreamReader, max_body_bytes: int):
+    """Read one HTTP/1.1 request; return None when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > max_body_bytes:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body)
+
+def http_response(status: int, payload: dict, keep_alive: bool = True) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+class WebSocket:
+    """
+    Server side of an RFC 6455 connection: text frames only, no extensions.
+    Pings are answered while waiting in `recv()`; sends are serialized so status
+    events and streamed chunks never interleave inside a frame.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_message_bytes: int):
+        self.reader = reader
+        self.writer = writer
+        self.max_message_bytes = max_message_bytes
+        self.closed = False
+        self._send_lock = asyncio.Lock()
+
+    @classmethod
+    async def accept(cls, request: Request, reader, writer, max_message_bytes: int) -> "WebSocket":
+        key = request.headers.get("sec-websocket-key")
+        if not key:
+            raise HTTPError(400, "Missing Sec-WebSocket-Key")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode("latin-1")
+        )
+        await writer.drain()
+        return cls(reader, writer, max_message_bytes)
+
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        async with self._send_lock:
+            if self.closed and opcode != 0x8:
+                raise ConnectionError("WebSocket is closed")
+            self.writer.write(header + payload)
+            await self.writer.drain()
+
+    async def send_json(self, payload: dict) -> None:
+        await self._send_frame(0x1, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    async def close(self, code: int = 1000) -> None:
+        if not self.closed:
+            self.closed = True
+            try:
+                await self._send_frame(0x8, struct.pack("!H", code))
+            except ConnectionError:
+                pass
+
+    async def _read_frame(self):
+        first, second = await self.reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        if length > self.max_message_bytes:
+            await self.close(1009)
+            raise ConnectionError("WebSocket message too large")
+        mask = await self.reader.readexactly(4) if second & 0x80 else None
+        payload = await self.reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return bool(first & 0x80), first & 0x0F, payload
+
+    async def recv(self):
+        """Return the next text message, or None once the connection is closed."""
+        message = b""
+        while not self.closed:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+            if opcode == 0x8:
+                await self.close()
+                return None
+            if opcode == 0x9:
+                await self._send_frame(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            message += payload
+            if len(message) > self.max_message_bytes:
+                await self.close(1009)
+                return None
+            if fin:
+                return message.decode("utf-8", errors="replace")
+        return None
+
+class UserSession:
+    """One user's IRISSession and agent, plus the WebSockets listening for their events."""
+    def __init__(self, user: str, session: IRISSession):
+        self.user = user
+        self.session = session
+        self.agent = None
+        # IRISServer.tools_version the agent's tools were built from.
+        self.tools_version = 0
+        # Turns of one user run one at a time so the chat history stays linear.
+        self.lock = asyncio.Lock()
+        self.sockets = set()
+        # Events (such as reminders) raised while no socket was connected.
+        self.pending = deque(maxlen=50)
+
+    def notify(self, event: dict) -> None:
+        """Send an event to every connected socket, or keep it for the next connection. Loop thread only."""
+        if not self.sockets:
+            self.pending.append(event)
+            return
+        for ws in list(self.sockets):
+            asyncio.ensure_future(self._send(ws, event))
+
+    async def _send(self, ws: WebSocket, event: dict) -> None:
+        try:
+            await ws.send_json(event)
+        except ConnectionError:
+            self.sockets.discard(ws)
+
+class IRISServer:
+    """
+    Hosts many IRIS users in one process over HTTP and WebSocket (stdlib asyncio only).
+
+    The tool modules, TTS engine, genai client, response cache, persistence worker,
+    reminder scheduler, the thread pool for synchronous tools, the tool executor and the
+    tool worker processes are loaded once and shared. Each user gets an isolated IRISSession under
+    data/users/<user>/ (chat log, memory, search indexes, reminders) and an
+    AsyncIRISAgent, created on first use.
+
+    Endpoints:
+        GET  /health              -> {"status": "ok", "sessions": n}
+        POST /chat {"message"}    -> {"response": "..."}
+        GET  /ws                  -> WebSocket; send {"message": "..."} (or plain text) and receive
+                                     {"type": "chunk"|"done"|"status"|"reminder"|"error", ...} events.
+
+    The user is given by the X-IRIS-User header or the `user` query parameter and must be
+    listed in the config's "users". When IRIS_SERVER_TOKEN is set, requests must also
+    send it as "Authorization: Bearer <token>" or the `token` query parameter.
+    """
+    def __init__(self, config: ConfigManager = None):
+        self.logger = get_logger()
+        self.config = config or ConfigManager()
+        server_conf = self.config.get("server", {})
+        self.host = server_conf.get("host", "127.0.0.1")
+        self.port = server_conf.get("port", 8765)
+        self.data_dir = server_conf.get("data_dir", "data/users")
+        self.max_body_bytes = server_conf.get("max_body_bytes", 1 << 20)
+        self.users = {user.lower() for user in self.config.get("users", [])}
+        self.token = os.getenv("IRIS_SERVER_TOKEN")
+
+        profiler = get_profiler()
+        with profiler.phase("persistence"):
+            persistence_conf = self.config.get("persistence", {})
+            self.writer = PersistenceWorker(
+                flush_interval=persistence_conf.get("flush_interval", 0.5),
+                fsync=persistence_conf.get("fsync", "always"),
+            ).start()
+
+        self.logger.success("Loading tools...")
+        with profiler.phase("tools"):
+            self.worker_pool = load_worker_pool(self.config.get("tool_isolation", {}))
+            self.tool_cache = load_tool_cache(self.config.get("tool_cache", {}))
+            loading_conf = self.config.get("tool_loading", {})
+            self.tool_manager = load_tool_manager(loading_conf, result_cache=self.tool_cache)
+            self.tools = list(self.tool_manager.load_tools())
+            # Bumped on every hot reload; each agent picks the new tools up before its next turn.
+            self.tools_version = 0
+            self.tool_watcher = load_tool_watcher(loading_conf, self.tool_manager, self._on_tools_changed)
+        self.system_prompt = load_system_prompt()
+        self.executor = ThreadPoolExecutor(max_workers=server_conf.get("tool_workers", 16),
+                                           thread_name_prefix="iris-server-tool")
+        integrated = [getattr(IRISSession, name) for name in IRISSession.INTEGRATED_TOOLS]
+        # Compacted and wrapped once for every session; each agent adds its own session's tools.
+        self.prepared_tools = prepare_async_tools(self.config.config, self.tools, self.executor)
+        self.tool_executor = load_tool_executor(self.config.get("tool_execution", {}), self.tools + integrated)
+        with profiler.phase("client"):
+            provider = PROVIDERS.get(self.config.get("provider", "gemini"), PROVIDERS["gemini"])
+            self.client = create_client() if provider[1].requires_client else None
+        with profiler.phase("response cache"):
+            self.response_cache = load_response_cache(self.config.get("response_cache", {}), self.tools + integrated)
+        self.reminder_scheduler = ReminderScheduler(dispatch_reminder)
+        self.sessions = {}
+        self._opening = {}
+        self._loop = None
+        profiler.finish()
+
+    def _open_session(self, user: str) -> UserSession:
+        """Build a user's session and agent. Runs on a worker thread: loading indexes touches the disk."""
+        name = user.capitalize()
+        session = IRISSession(self.config, name, self.writer, data_dir=str(Path(self.data_dir, user)),
+                              reminder_scheduler=self.reminder_scheduler)
+        user_session = UserSession(user, session)
+        user_session.tools_version = self.tools_version
+        emit = lambda event: self._loop.call_soon_threadsafe(user_session.notify, event)
+        session.on_reminder = lambda message: emit({"type": "reminder", "text": message})
+        user_session.agent = AsyncIRISAgent(
+            self.system_prompt + f"\nLogged in as: {name}", None, self.config.config,
+            tools=session.tools(), client=self.client, executor=self.executor,
+            response_cache=self.response_cache, chat_state=session.chat_state,
+            prepared_tools=self.prepared_tools, tool_executor=self.tool_executor,
+        )
+        user_session.agent.set_status_callback(lambda status: emit({"type": "status", "status": status}))
+        session.start()
+        self.logger.success(f"Opened session for {name}")
+        return user_session
+
+    def _on_tools_changed(self, tools: list) -> None:
+        """Called on the watcher thread after a hot reload."""
+        prepared_tools = prepare_async_tools(self.config.config, tools, self.executor)
+
+        def publish():
+            self.tools = tools
+            self.prepared_tools = prepared_tools
+            self.tools_version += 1
+        self._loop.call_soon_threadsafe(publish)
+
+    async def get_session(self, user: str) -> UserSession:
+        user_session = self.sessions.get(user)
+        if user_session is not None:
+            return user_session
+        future = self._opening.get(user)
+        if future is None:
+            future = self._opening[user] = self._loop.run_in_executor(None, self._open_session, user)
+        try:
+            user_session = await asyncio.shield(future)
+        finally:
+            self._opening.pop(user, None)
+        self.sessions[user] = user_session
+        return user_session
+
+    def authenticate(self, request: Request) -> str:
+        """Return the request's user name (lower case) or raise HTTPError."""
+        if self.token:
+            supplied = request.headers.get("authorization", "")
+            supplied = supplied[len("Bearer "):] if supplied.startswith("Bearer ") else request.query.get("token", "")
+            if not hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8")):
+                raise HTTPError(401, "Invalid or missing token")
+        user = (request.headers.get("x-iris-user") or request.query.get("user") or "").lower()
+        if user not in self.users:
+            raise HTTPError(403, "Unknown user")
+        return user
+
+    async def chat(self, user_session: UserSession, message: str, ws: WebSocket = None) -> str:
+        """
+        Run one turn for a user and record it in their chat log. With `ws` the response is
+        streamed to it as chunk events. /history and /search work as in the terminal.
+        """
+        session = user_session.session
+        command = message.strip().lower()
+        if command == "/history" or command.startswith("/history "):
+            return await self._loop.run_in_executor(self.executor, session.history_command, message.split()[1:])
+        if command.startswith("/search "):
+            return await self._loop.run_in_executor(self.executor, session.search_history,
+                                                    message.strip()[len("/search "):])
+        async with user_session.lock:
+            if user_session.tools_version != self.tools_version:
+                user_session.agent.update_tools(session.tools(), prepared_tools=self.prepared_tools)
+                user_session.tools_version = self.tools_version
+            if ws is None:
+                response = await user_session.agent.send_message(message)
+            else:
+                parts = []
+                async for chunk in user_session.agent.send_message_stream(message):
+                    parts.append(chunk)
+                    await ws.send_json({"type": "chunk", "text": chunk})
+                response = "".join(parts)
+            session.record_turn(message, response)
+        return response
+
+    async def _route(self, request: Request) -> tuple:
+        if request.path == "/health":
+            return 200, {"status": "ok", "sessions": len(self.sessions)}
+        if request.path == "/chat":
+            if request.method != "POST":
+                raise HTTPError(405, "Use POST")
+            user_session = await self.get_session(self.authenticate(request))
+            message = str(request.json().get("message", ""))
+            if not message.strip():
+                raise HTTPError(400, "Empty message")
+            return 200, {"response": await self.chat(user_session, message)}
+        raise HTTPError(404, "Not found")
+
+    async def _serve_websocket(self, request: Request, reader, writer) -> None:
+        user_session = await self.get_session(self.authenticate(request))
+        ws = await WebSocket.accept(request, reader, writer, self.max_body_bytes)
+        user_session.sockets.add(ws)
+        while user_session.pending:
+            await ws.send_json(user_session.pending.popleft())
+        try:
+            while True:
+                text = await ws.recv()
+                if text is None:
+                    break
+                try:
+                    data = json.loads(text)
+                    message = str(data.get("message", "")) if isinstance(data, dict) else text
+                except ValueError:
+                    message = text
+                if not message.strip():
+                    continue
+                try:
+                    response = await self.chat(user_session, message, ws)
+                except ConnectionError:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Error serving {user_session.user}: {e}")
+                    await ws.send_json({"type": "error", "error": str(e)})
+                    continue
+                await ws.send_json({"type": "done", "response": response})
+        except ConnectionError:
+            pass
+        finally:
+            user_session.sockets.discard(ws)
+            await ws.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, self.max_body_bytes)
+                    if request is None:
+                        break
+                    if request.path == "/ws" and request.is_websocket:
+                        await self._serve_websocket(request, reader, writer)
+                        break
+                    status, payload = await self._route(request)
+                except HTTPError as e:
+                    writer.write(http_response(e.status, {"error": e.message}, keep_alive=False))
+                    await writer.drain()
+                    break
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    self.logger.error(f"Error handling request: {e}")
+                    writer.write(http_response(500, {"error": "Internal server error"}, keep_alive=False))
+                    await writer.drain()
+                    break
+                writer.write(http_response(status, payload, request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.reminder_scheduler.start()
+        if self.tool_watcher is not None:
+            self.tool_watcher.start()
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.logger.success(f"IRIS server listening on http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop reminders, drain pending writes and close every session's stores."""
+        self.reminder_scheduler.stop()
+        if self.tool_watcher is not None:
+            self.tool_watcher.stop()
+        self.logger.success("Flushing pending writes...")
+        self.writer.stop()
+        for user_session in self.sessions.values():
+            user_session.session.close()
+        if self.tool_executor is not None:
+            self.tool_executor.shutdown()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.worker_pool.shutdown()
+        if self.tool_cache is not None:
+            self.tool_cache.close()
+
+def main():
+    server = IRISServer()
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        logger.success("Keyboard interrupt detected. Stopping IRIS server...")
+    finally:
+        server.shutdown()
@@ -0,0 +1,456 @@
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+from core.chatlog import ChatEntry, ChatLog
+from core.reminders.recurrence import parse_recurrence
+from core.reminders.scheduler import ReminderScheduler
+from core.storage.archive import HistoryArchive
+from core.storage.journal import ChatJournal
+from core.tools.tool_flags import side_effects
+from core.utils.error_handler import handle_errors
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_DATA_DIR = "data"
+
+def load_system_prompt(data_dir: str = DEFAULT_DATA_DIR) -> str:
+    """Load the system prompt from all files in the data directory (.id is preferred, .txt as fallback)."""
+    data_dir = Path(data_dir)
+    sysdt_files = sorted(data_dir.glob("*.id"), reverse=True)
+    if sysdt_files:
+        system_prompt = "\n".join(f.read_text(encoding="utf-8") for f in sysdt_files)
+    else:
+        txt_files = sorted(data_dir.glob("*.txt"))
+        system_prompt = "\n".join(f.read_text(encoding="utf-8") for f in txt_files) if txt_files else "Default system prompt."
+    return system_prompt
+
+def dispatch_reminder(key: str, payload: tuple):
+    """
+    on_due callback for a ReminderScheduler shared by several sessions: the payload
+    carries the owning session's handler, which receives the rest of it.
+    """
+    handler, *rest = payload
+    handler(key, tuple(rest))
+
+class IRISSession:
+    """
+    The per-user state of IRIS: chat log, memory, search indexes and reminders, plus the
+    integrated tools that act on them.
+
+    All of a session's files live under `data_dir`. Paths from the config that start with
+    "data/" are re-rooted there, so the terminal user keeps the plain data/ layout while
+    server users get data/users/<name>/. Sessions can share one PersistenceWorker and one
+    ReminderScheduler (built with `dispatch_reminder`); reminder names are then prefixed
+    with the user so sessions never cancel each other's reminders.
+    """
+    # Names of the methods exposed to the model as tools.
+    INTEGRATED_TOOLS = (
+        "add_reminder",
+        "remove_reminder",
+        "get_current_datetime",
+        "store_memory",
+        "write_persistent_memory",
+        "read_persistent_memory",
+        "recall_memory",
+        "read_chat_history",
+        "search_history",
+    )
+
+    def __init__(self, config, user: str, writer, data_dir: str = DEFAULT_DATA_DIR,
+                 reminder_scheduler: ReminderScheduler = None, on_reminder: Callable = None):
+        """
+        Parameters:
+            config: ConfigManager (or dict) with the chatlog, memory and search sections.
+            user (str): Display name of the logged-in user.
+            writer (PersistenceWorker): Started worker used for write-behind persistence.
+            data_dir (str): Directory for this user's files.
+            reminder_scheduler (ReminderScheduler): Optional shared scheduler; when omitted the
+                session runs its own, started by `start()`.
+            on_reminder (Callable): Called with the reminder text when one is due.
+        """
+        self.logger = get_logger()
+        self.config = config
+        self.user = user
+        self.writer = writer
+        self.data_dir = data_dir
+        self.on_reminder = on_reminder
+        self._owns_scheduler = reminder_scheduler is None
+        self.reminder_scheduler = reminder_scheduler or ReminderScheduler(dispatch_reminder)
+        Path(data_dir).mkdir(parents=True, exist_ok=True)
+
+        chatlog_conf = config.get("chatlog", {})
+        archive = HistoryArchive(
+            self._path(chatlog_conf.get("archive_dir", "data/history")),
+            segment_max_turns=chatlog_conf.get("segment_max_turns", 1000),
+        )
+        self.chat_journal = ChatJournal(
+            snapshot_path=self._path("data/chatlog.json"),
+            journal_path=self._path("data/chatlog.jsonl"),
+            compact_every=chatlog_conf.get("compact_every", 500),
+            archive=archive,
+            tail_turns=chatlog_conf.get("tail_turns", 50),
+            writer=self.writer,
+        )
+        self.chatlog = self._load_chatlog() or self.chat_journal.chatlog
+        self._reminder_lock = threading.Lock()
+
+        from core.memory import MemoryManager
+        memory_conf = config.get("memory", {})
+        self.memory_manager = MemoryManager(
+            memory_file=None if data_dir == DEFAULT_DATA_DIR else str(Path(data_dir, "memory.json")),
+            writer=self.writer,
+            backend=memory_conf.get("backend", "json"),
+            db_file=self._path(memory_conf.get("db_file")),
+            max_entries=memory_conf.get("max_entries"),
+            default_ttl=memory_conf.get("default_ttl_seconds"),
+            eviction=memory_conf.get("eviction", "lru"),
+            cold_archive=self._path(memory_conf.get("cold_archive")),
+        )
+        self.vector_index = self._load_vector_index(memory_conf.get("vector_index", {}))
+        self.search_index = self._load_search_index(config.get("search", {}))
+        self.chat_state = self._load_chat_state(config.get("chat_state", {}))
+
+    def _path(self, path: str):
+        """Re-root a configured "data/..." path under this session's data directory."""
+        if not path:
+            return path
+        parts = Path(path).parts
+        if parts and parts[0] == DEFAULT_DATA_DIR:
+            return str(Path(self.data_dir, *parts[1:]))
+        return path
+
+    def tools(self) -> List[Callable]:
+        """Return the integrated tools bound to this session."""
+        return [getattr(self, name) for name in self.INTEGRATED_TOOLS]
+
+    def start(self) -> "IRISSession":
+        """Schedule the stored reminders (and start the scheduler if the session owns it)."""
+        for reminder in list(self.chatlog.reminders):
+            self._schedule_reminder(reminder)
+        if self._owns_scheduler:
+            self.reminder_scheduler.start()
+        return self
+
+    def stop_reminders(self):
+        """Stop delivering this session's reminders; call before stopping the writer."""
+        if self._owns_scheduler:
+            self.reminder_scheduler.stop()
+        else:
+            for reminder in list(self.chatlog.reminders):
+                self.reminder_scheduler.cancel(self._reminder_key(reminder.get("name")))
+
+    def close(self):
+        """Close this session's stores; call after the writer has drained."""
+        self.memory_manager.close()
+        if self.search_index is not None:
+            self.search_index.close()
+
+    @handle_errors(default_return=None)
+    def _load_chatlog(self) -> ChatLog:
+        return self.chat_journal.load()
+
+    def _reminder_key(self, name: str) -> str:
+        return name if self._owns_scheduler else f"{self.user}:{name}"
+
+    @staticmethod
+    def _first_due(due_date: datetime, schedule) -> datetime:
+        if schedule is None:
+            return due_date
+        # Only the next occurrence is ever pending; occurrences missed while offline are skipped.
+        return schedule.next_after(max(datetime.now(), due_date - timedelta(microseconds=1)))
+
+    def _schedule_reminder(self, reminder: dict):
+        try:
+            due_date = datetime.fromisoformat(reminder["due_date"])
+            schedule = parse_recurrence(reminder["recurrence"], due_date) if reminder.get("recurrence") else None
+            due_date = self._first_due(due_date, schedule)
+        except Exception as e:
+            self.logger.error(f"Error scheduling reminder '{reminder.get('name')}': {e}")
+            return None
+        self.reminder_scheduler.schedule(self._reminder_key(reminder.get("name")), due_date,
+                                         (self._on_reminder_due, reminder, schedule))
+        return due_date
+
+    def _on_reminder_due(self, key: str, payload: tuple):
+        reminder, schedule = payload
+        if schedule is not None:
+            message = f"Reminder: {reminder.get('text')} (Recurring: {reminder.get('recurrence')})"
+        else:
+            message = f"Reminder: {reminder.get('text')} (Due: {reminder.get('due_date')})"
+        if self.on_reminder:
+            self.on_reminder(message)
+        with self._reminder_lock:
+            if reminder not in self.chatlog.reminders:
+                return
+            if schedule is not None:
+                self.reminder_scheduler.schedule(key, schedule.next_after(datetime.now()),
+                                                 (self._on_reminder_due, reminder, schedule))
+            else:
+                # One-shot reminders are done once delivered.
+                self.chatlog.reminders.remove(reminder)
+                self._journal_write(self.chat_journal.append_reminder_removed, reminder.get("name"))
+
+    @side_effects
+    def add_reminder(self, reminder_name: str, reminder_text: str, due_date: str = "", recurrence: str = "") -> str:
+        """
+        Add a one-time or recurring reminder.
+
+        Parameters:
+            reminder_name (str): Unique name of the reminder; reusing a name replaces that reminder.
+            reminder_text (str): What to remind the user about.
+            due_date (str): "%Y-%m-%d %H:%M". Required for one-time reminders; for recurring ones it is the
+                optional first occurrence (defaults to now).
+            recurrence (str): Optional repeat rule: "every N minutes|hours|days|weeks", "daily HH:MM",
+                "weekdays HH:MM", "weekends HH:MM", "mon,wed,fri HH:MM" or "cron <min> <hour> <dom> <month> <dow>".
+
+        Returns:
+            str: Confirmation including the next time the reminder fires.
+        """
+        try:
+            if due_date:
+                parsed_date = datetime.strptime(due_date, "%Y-%m-%d %H:%M")
+            elif recurrence:
+                parsed_date = datetime.now().replace(second=0, microsecond=0)
+            else:
+                return "Error parsing date: a due_date is required for one-time reminders."
+        except Exception as e:
+            return f"Error parsing date: {e}"
+        if recurrence:
+            try:
+                # Also rejects rules that never fire, before anything is stored.
+                self._first_due(parsed_date, parse_recurrence(recurrence, parsed_date))
+            except Exception as e:
+                return f"Error parsing recurrence: {e}"
+        new_reminder = {
+            "name": reminder_name,
+            "text": reminder_text,
+            "due_date": parsed_date.isoformat(),
+            "created_at": datetime.now().isoformat()
+        }
+        if recurrence:
+            new_reminder["recurrence"] = recurrence
+        with self._reminder_lock:
+            # Reminder names are the handle used by remove_reminder, so a new one replaces any namesake.
+            self._remove_reminder_locked(reminder_name)
+            self.chatlog.reminders.append(new_reminder)
+            self._journal_write(self.chat_journal.append_reminder_added, new_reminder)
+            next_due = self._schedule_reminder(new_reminder)
+        when = next_due.strftime("%Y-%m-%d %H:%M") if next_due else due_date
+        if recurrence:
+            when = f"{when} (repeats: {recurrence})"
+        self.logger.success(f"Reminder '{reminder_name}' set: {reminder_text} at {when}")
+        return f"Reminder '{reminder_name}' set: {reminder_text} at {when}"
+
+    def _remove_reminder_locked(self, reminder_name: str) -> bool:
+        for r in self.chatlog.reminders:
+            if r.get("name") == reminder_name:
+                self.chatlog.reminders.remove(r)
+                self._journal_write(self.chat_journal.append_reminder_removed, reminder_name)
+                return True
+        return False
+
+    @side_effects
+    @handle_errors(default_return="Error removing reminder")
+    def remove_reminder(self, reminder_name: str) -> str:
+        with self._reminder_lock:
+            found = self._remove_reminder_locked(reminder_name)
+        self.reminder_scheduler.cancel(self._reminder_key(reminder_name))
+        if found:
+            return f"Removed reminder '{reminder_name}'."
+        else:
+            return f"No reminder found with the name '{reminder_name}'."
+
+    def get_current_datetime(self) -> str:
+        return datetime.now().isoformat()
+
+    @side_effects
+    @handle_errors(default_return=None)
+    def store_memory(self, content: str) -> None:
+        self.memory_manager.append(content)
+
+    @side_effects
+    @handle_errors(default_return="Error writing persistent memory")
+    def write_persistent_memory(self, key: str, value: str, ttl_seconds: int = 0) -> str:
+        """
+        Store a value under a key in persistent memory.
+
+        Parameters:
+            key (str): The key to store the value under.
+            value (str): The value to remember.
+            ttl_seconds (int): Optional lifetime in seconds; 0 keeps the configured default.
+
+        Returns:
+            str: Confirmation message.
+        """
+        self.memory_manager.set(key, value, ttl=ttl_seconds or None)
+        return f"Persistent memory written for key: {key}"
+
+    @handle_errors(default_return="Error reading persistent memory")
+    def read_persistent_memory(self, key: str) -> str:
+        return self.memory_manager.get(key)
+
+    def _load_chat_state(self, state_conf: dict):
+        if not state_conf.get("enabled", True):
+            return None
+        from core.storage.chat_state import ChatStateStore
+        return ChatStateStore(
+            self._path(state_conf.get("file", "data/chat_state.json")),
+            max_turns=state_conf.get("restore_turns", 20),
+            writer=self.writer,
+        )
+
+    @handle_errors(default_return=None)
+    def _load_vector_index(self, vector_conf: dict):
+        if not vector_conf.get("enabled", True):
+            return None
+        from core.storage.vector_index import HashingEmbedder, VectorIndex
+        index = VectorIndex(
+            self._path(vector_conf.get("directory", "data/vectors")),
+            embedder=HashingEmbedder(dim=vector_conf.get("dim", 256)),
+        )
+        if len(index) == 0:
+            existing = self.memory_manager.scan("")
+            if existing:
+                self.logger.success(f"Indexing {len(existing)} stored memories for recall...")
+                index.add_many(existing)
+        # Embedding and the file appends ride the persistence worker, like the search index updates.
+        self.memory_manager.add_listener(
+            lambda op, items: self.writer.submit(lambda fsync: index.on_memory_change(op, items))
+        )
+        return index
+
+    @handle_errors(default_return=None)
+    def _load_search_index(self, search_conf: dict):
+        if not search_conf.get("enabled", True):
+            return None
+        from core.storage.search_index import BM25Index
+        index = BM25Index(self._path(search_conf.get("db_file", "data/search.db")))
+        if not index.built:
+            self.logger.success("Building full-text search index...")
+            memories = self.memory_manager.scan("")
+            index.add_documents([(f"memory:{key}", "memory", key, value) for key, value in memories])
+            turns = self.chat_journal.read_history()
+            for start in range(0, len(turns), 500):
+                index.add_documents([self._turn_document(entry) for entry in turns[start:start + 500]])
+            index.mark_built()
+        # Index updates ride the persistence worker so tool calls never wait on them.
+        self.memory_manager.add_listener(
+            lambda op, items: self.writer.submit(lambda fsync: index.on_memory_change(op, items))
+        )
+        return index
+
+    @staticmethod
+    def _turn_document(entry: ChatEntry) -> tuple:
+        return (f"chat:{entry.timestamp}", "chat", entry.timestamp, f"User: {entry.user}\nIRIS: {entry.response}")
+
+    @handle_errors(default_return="Error searching history")
+    def search_history(self, query: str, limit: int = 10, source: str = "") -> str:
+        """
+        Full-text search over past conversation turns and stored memories, ranked by relevance.
+
+        Parameters:
+            query (str): Keywords to search for.
+            limit (int): Maximum number of results.
+            source (str): Optional filter: "chat" for conversation turns or "memory" for stored memories.
+
+        Returns:
+            str: Matching turns and memories, best match first.
+        """
+        if self.search_index is None:
+            return "History search is disabled."
+        self.writer.flush()
+        hits = self.search_index.search(query, max(1, int(limit)), source or None)
+        if not hits:
+            return "No matches found."
+        lines = []
+        for hit in hits:
+            label = f"[{hit['ref']}]" if hit["source"] == "chat" else f"memory '{hit['ref']}'"
+            text = hit["text"] if len(hit["text"]) <= 500 else hit["text"][:500] + "..."
+            lines.append(f"{label} (score {hit['score']:.2f})\n{text}")
+        return "\n\n".join(lines)
+
+    @handle_errors(default_return="Error recalling memory")
+    def recall_memory(self, query: str, k: int = 5) -> str:
+        """
+        Find stored memories related to a query by meaning rather than by exact key.
+
+        Parameters:
+            query (str): What to look for, in plain words.
+            k (int): Maximum number of memories to return.
+
+        Returns:
+            str: The best matching memories with their keys and similarity scores.
+        """
+        if self.vector_index is None:
+            return "Memory recall is disabled."
+        matches = self.vector_index.search(query, k)
+        if not matches:
+            return "No related memories found."
+        return "\n".join(
+            f"{key} (score {score:.2f}): {self.memory_manager.get(key)}" for key, score in matches
+        )
+
+    @handle_errors(default_return="Error reading chat history")
+    def read_chat_history(self, start_date: str = "", end_date: str = "", limit: int = 20) -> str:
+        """
+        Read earlier conversation turns from the chat history archive.
+
+        Parameters:
+            start_date (str): Optional start of the range, "%Y-%m-%d" or "%Y-%m-%d %H:%M".
+            end_date (str): Optional end of the range, same format. A bare date includes the whole day.
+            limit (int): Maximum number of turns to return (newest turns in the range win).
+
+        Returns:
+            str: The matching turns, oldest first.
+        """
+        start = self._parse_history_date(start_date) if start_date else None
+        end = self._parse_history_date(end_date, end_of_day=True) if end_date else None
+        entries = self.chat_journal.read_history(start, end, max(1, int(limit)))
+        if not entries:
+            return "No chat history found for that range."
+        return self._format_history(entries)
+
+    @staticmethod
+    def _parse_history_date(value: str, end_of_day: bool = False) -> datetime:
+        value = value.strip()
+        try:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M")
+        except ValueError:
+            day = datetime.strptime(value, "%Y-%m-%d")
+            return day.replace(hour=23, minute=59, second=59, microsecond=999999) if end_of_day else day
+
+    @staticmethod
+    def _format_history(entries: list) -> str:
+        return "\n\n".join(f"[{entry.timestamp}]\nUser: {entry.user}\nIRIS: {entry.response}" for entry in entries)
+
+    def history_command(self, args: list) -> str:
+        """Answer the /history command: `[count]` or `YYYY-MM-DD [YYYY-MM-DD]`."""
+        try:
+            if not args:
+                return self.read_chat_history(limit=10)
+            if len(args) == 1 and args[0].isdigit():
+                return self.read_chat_history(limit=int(args[0]))
+            start = self._parse_history_date(args[0])
+            end = self._parse_history_date(args[1] if len(args) > 1 else args[0], end_of_day=True)
+            entries = self.chat_journal.read_history(start, end)
+            return self._format_history(entries) if entries else "No chat history found for that range."
+        except ValueError:
+            return "Usage: /history [count] | /history YYYY-MM-DD [YYYY-MM-DD]"
+
+    def _journal_write(self, write, *args):
+        try:
+            write(*args)
+        except Exception as e:
+            self.logger.error(f"Chat log Save Error: {e}")
+
+    def record_turn(self, user_input: str, response: str):
+        now = datetime.now()
+        entry = ChatEntry(timestamp=now.isoformat(), user=user_input, response=response)
+        self.chatlog.chat_history.append(entry)
+        self.chatlog.last_interaction = now
+        self._journal_write(self.chat_journal.append_turn, entry)
+        if self.search_index is not None:
+            document = self._turn_document(entry)
+            self.writer.submit(lambda fsync: self.search_index.add_document(*document))
@@ -0,0 +1,135 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from core.chatlog import ChatEntry
+from core.storage.writer import atomic_write_text
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+class HistoryArchive:
+    """
+    Chat history split into rotated JSONL segments with a small time index.
+
+    `index.json` lists every segment with the timestamps of its first and last
+    turn and its turn count, so the tail and any time range can be read by
+    opening only the segments that overlap it.
+    """
+    def __init__(self, directory: str = "data/history", segment_max_turns: int = 1000):
+        self.directory = Path(directory)
+        self.segment_max_turns = max(1, int(segment_max_turns))
+        self.index_path = self.directory / "index.json"
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        if self.index_path.exists():
+            try:
+                with self.index_path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                data.setdefault("segments", [])
+                data.setdefault("journal_seq", 0)
+                return data
+            except Exception as e:
+                logger.error(f"Error reading history index {self.index_path}: {e}")
+        return {"segments": [], "journal_seq": 0}
+
+    def _save_index(self) -> None:
+        atomic_write_text(self.index_path, json.dumps(self.index))
+
+    @property
+    def journal_seq(self) -> int:
+        """Highest chat journal sequence number already archived."""
+        return self.index["journal_seq"]
+
+    def total_turns(self) -> int:
+        return sum(segment["count"] for segment in self.index["segments"])
+
+    def append(self, entries: list, journal_seq: int = None) -> None:
+        """
+        Append turns to the newest segment, rotating to a new one when it is full.
+
+        Parameters:
+            entries (list): ChatEntry objects in chronological order.
+            journal_seq (int): Journal sequence number of the last entry, recorded in the index.
+        """
+        if not entries:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = self.index["segments"]
+        pos = 0
+        while pos < len(entries):
+            if not segments or segments[-1]["count"] >= self.segment_max_turns:
+                segments.append({
+                    "file": f"segment_{len(segments) + 1:06d}.jsonl",
+                    "start": entries[pos].timestamp,
+                    "end": entries[pos].timestamp,
+                    "count": 0,
+                })
+            segment = segments[-1]
+            batch = entries[pos:pos + self.segment_max_turns - segment["count"]]
+            with (self.directory / segment["file"]).open("a", encoding="utf-8") as f:
+                for entry in batch:
+                    f.write(json.dumps(entry.__dict__, ensure_ascii=False) + "\n")
+            segment["count"] += len(batch)
+            segment["end"] = batch[-1].timestamp
+            pos += len(batch)
+        if journal_seq is not None:
+            self.index["journal_seq"] = max(self.index["journal_seq"], journal_seq)
+        self._save_index()
+
+    def _read_segment(self, segment: dict) -> list:
+        entries = []
+        path = self.directory / segment["file"]
+        if not path.exists():
+            logger.warning(f"History segment missing: {path}")
+            return entries
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(ChatEntry(**json.loads(line)))
+                except Exception:
+                    logger.warning(f"Skipping unreadable line in history segment {path}")
+        return entries
+
+    def tail(self, count: int) -> list:
+        """
+        Return the most recent `count` archived turns, reading only the segments needed.
+        """
+        if count <= 0:
+            return []
+        collected = []
+        for segment in reversed(self.index["segments"]):
+            collected = self._read_segment(segment) + collected
+            if len(collected) >= count:
+                break
+        return collected[-count:]
+
+    def read_range(self, start: datetime = None, end: datetime = None, limit: int = None) -> list:
+        """
+        Return archived turns with start <= timestamp <= end, oldest first.
+
+        Only segments whose indexed time range overlaps the request are opened.
+        When `limit` is given, the newest `limit` matching turns are returned.
+        """
+        matched = []
+        for segment in reversed(self.index["segments"]):
+            seg_start = datetime.fromisoformat(segment["start"])
+            seg_end = datetime.fromisoformat(segment["end"])
+            if end is not None and seg_start > end:
+                continue
+            if start is not None and seg_end < start:
+                break
+            entries = [
+                entry for entry in self._read_segment(segment)
+                if (start is None or datetime.fromisoformat(entry.timestamp) >= start)
+                and (end is None or datetime.fromisoformat(entry.timestamp) <= end)
+            ]
+            matched = entries + matched
+            if limit is not None and len(matched) >= limit:
+                break
+        if limit is not None:
+            matched = matched[-limit:]
+        return matched
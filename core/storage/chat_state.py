@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from google.genai import types
+from core.llms.context_budget import SUMMARY_PREFIX
+from core.storage.writer import atomic_write_text
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+STATE_VERSION = 1
+
+def _is_turn_start(content: types.Content) -> bool:
+    """A turn starts with a user message; user contents carrying function responses continue one."""
+    return content.role == "user" and any(part.function_response is None for part in content.parts or [])
+
+def _is_summary(content: types.Content) -> bool:
+    parts = content.parts or []
+    return content.role == "user" and bool(parts) and (parts[0].text or "").startswith(SUMMARY_PREFIX)
+
+class ChatStateStore:
+    """
+    Saves the model-side conversation (the SDK chat history, including function call
+    and response parts) so a restarted IRIS can continue where it stopped.
+
+    The file holds one compact JSON document: `[role, [part, ...]]` pairs with empty
+    fields and thought text left out. Saves go through the PersistenceWorker as a
+    coalesced snapshot, so only the latest history of a busy session is written.
+    `load()` keeps the last `max_turns` turns, cut at turn boundaries so function
+    calls are never separated from their responses; a leading context-budget summary
+    is kept as well.
+    """
+    def __init__(self, path: str = "data/chat_state.json", max_turns: int = 20, writer=None):
+        """
+        Parameters:
+            path (str): State file, normally next to the chat log.
+            max_turns (int): Turns rehydrated by `load()`; 0 restores nothing.
+            writer (PersistenceWorker): Optional worker for write-behind saves.
+        """
+        self.path = Path(path)
+        self.max_turns = max(0, int(max_turns))
+        self.writer = writer
+
+    @staticmethod
+    def _encode(history: List[types.Content]) -> str:
+        contents = []
+        for content in history:
+            parts = [
+                part.model_dump(mode="json", exclude_none=True)
+                for part in content.parts or [] if not part.thought
+            ]
+            contents.append([content.role, parts])
+        return json.dumps({"version": STATE_VERSION, "saved_at": datetime.now().isoformat(), "history": contents},
+                          ensure_ascii=False, separators=(",", ":"))
+
+    def save(self, history: List[types.Content]) -> None:
+        history = list(history)
+        if self.writer is not None:
+            self.writer.mark_dirty(str(self.path), lambda: (self.path, self._encode(history)))
+        else:
+            atomic_write_text(self.path, self._encode(history))
+
+    def clear(self) -> None:
+        self.save([])
+
+    def trim(self, history: List[types.Content]) -> List[types.Content]:
+        """Return the last `max_turns` turns of `history`, plus a leading summary if there is one."""
+        if not self.max_turns:
+            return []
+        starts = [i for i, content in enumerate(history) if _is_turn_start(content)]
+        if len(starts) <= self.max_turns:
+            return list(history[starts[0]:]) if starts else []
+        recent = list(history[starts[-self.max_turns]:])
+        if history and _is_summary(history[0]):
+            # The summary and its acknowledgement stand for everything older.
+            return list(history[:2]) + recent
+        return recent
+
+    def load(self) -> List[types.Content]:
+        """Read the saved history, trimmed to `max_turns`. Returns [] if there is none or it is unreadable."""
+        if not self.path.exists() or not self.max_turns:
+            return []
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATE_VERSION:
+                logger.warning(f"Ignoring chat state {self.path} with unknown version {data.get('version')}")
+                return []
+            history = [
+                types.Content(role=role, parts=[types.Part.model_validate(part) for part in parts])
+                for role, parts in data.get("history", [])
+            ]
+        except Exception as e:
+            logger.error(f"Error loading chat state {self.path}: {e}")
+            return []
+        return self.trim(history)
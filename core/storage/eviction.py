@@ -0,0 +1,126 @@
+import heapq
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+class EvictionTracker:
+    """
+    Access bookkeeping for a bounded key/value store: per-key expiry times plus
+    LRU order or LFU hit counts, used to pick which keys to drop.
+
+    LRU order is an OrderedDict (O(1) touch and victim). LFU and expiry use
+    lazy min-heaps: superseded heap items are skipped when they surface and the
+    heaps are rebuilt once stale items outnumber live ones.
+    """
+    def __init__(self, policy: str = "lru"):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {EVICTION_POLICIES}")
+        self.policy = policy
+        # key -> {"last_access": float, "hits": int, "expires_at": float | None}
+        self._meta = {}
+        self._lru = OrderedDict()
+        self._lfu_heap = []
+        self._expiry_heap = []
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._meta
+
+    def load(self, state: dict, keys: Iterable[str]) -> None:
+        """
+        Restore bookkeeping saved by `state()` for the keys currently in the store.
+        Keys without saved metadata count as least recently used.
+        """
+        loaded = []
+        for key in keys:
+            meta = state.get(key) or {"last_access": 0.0, "hits": 0, "expires_at": None}
+            loaded.append((meta.get("last_access", 0.0), key, meta))
+        for _, key, meta in sorted(loaded, key=lambda item: item[0]):
+            self._meta[key] = {
+                "last_access": meta.get("last_access", 0.0),
+                "hits": meta.get("hits", 0),
+                "expires_at": meta.get("expires_at"),
+            }
+            self._lru[key] = None
+            self._push(key)
+            if self._meta[key]["expires_at"] is not None:
+                heapq.heappush(self._expiry_heap, (self._meta[key]["expires_at"], key))
+
+    def state(self) -> dict:
+        return {key: dict(meta) for key, meta in self._meta.items()}
+
+    def meta(self, key: str) -> Optional[dict]:
+        """A copy of `key`'s bookkeeping, or None if it is not tracked."""
+        meta = self._meta.get(key)
+        return dict(meta) if meta is not None else None
+
+    def _push(self, key: str) -> None:
+        if self.policy == "lfu":
+            meta = self._meta[key]
+            heapq.heappush(self._lfu_heap, (meta["hits"], meta["last_access"], key))
+            if len(self._lfu_heap) > 4 * len(self._meta) + 64:
+                self._lfu_heap = [(m["hits"], m["last_access"], k) for k, m in self._meta.items()]
+                heapq.heapify(self._lfu_heap)
+
+    def record_set(self, key: str, ttl: Optional[float] = None, now: float = None) -> None:
+        now = time.time() if now is None else now
+        meta = self._meta.setdefault(key, {"last_access": now, "hits": 0, "expires_at": None})
+        meta["expires_at"] = now + ttl if ttl else None
+        if meta["expires_at"] is not None:
+            heapq.heappush(self._expiry_heap, (meta["expires_at"], key))
+            if len(self._expiry_heap) > 4 * len(self._meta) + 64:
+                self._expiry_heap = [(m["expires_at"], k) for k, m in self._meta.items() if m["expires_at"] is not None]
+                heapq.heapify(self._expiry_heap)
+        self.touch(key, now)
+
+    def touch(self, key: str, now: float = None) -> None:
+        meta = self._meta.get(key)
+        if meta is None:
+            return
+        meta["last_access"] = time.time() if now is None else now
+        meta["hits"] += 1
+        self._lru[key] = None
+        self._lru.move_to_end(key)
+        self._push(key)
+
+    def forget(self, key: str) -> None:
+        self._meta.pop(key, None)
+        self._lru.pop(key, None)
+
+    def is_expired(self, key: str, now: float = None) -> bool:
+        meta = self._meta.get(key)
+        if meta is None or meta["expires_at"] is None:
+            return False
+        return meta["expires_at"] <= (time.time() if now is None else now)
+
+    def pop_expired(self, now: float = None) -> List[str]:
+        """Return every key whose TTL has passed, forgetting them."""
+        now = time.time() if now is None else now
+        expired = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            meta = self._meta.get(key)
+            if meta is not None and meta["expires_at"] == expires_at:
+                expired.append(key)
+                self.forget(key)
+        return expired
+
+    def pop_victim(self) -> Optional[str]:
+        """Return and forget the key the policy would evict next."""
+        if self.policy == "lru":
+            if not self._lru:
+                return None
+            key, _ = self._lru.popitem(last=False)
+            self._meta.pop(key, None)
+            return key
+        while self._lfu_heap:
+            hits, last_access, key = heapq.heappop(self._lfu_heap)
+            meta = self._meta.get(key)
+            if meta is not None and meta["hits"] == hits and meta["last_access"] == last_access:
+                self.forget(key)
+                return key
+        return None
@@ -0,0 +1,186 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from core.chatlog import ChatEntry, ChatLog
+from core.storage.archive import HistoryArchive
+from core.storage.writer import atomic_write_text, append_lines
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+class ChatJournal:
+    """
+    Append-only, line-delimited journal for chat turns and reminder events.
+
+    Every change is written as one small JSON line to `journal_path`. After
+    `compact_every` records the journaled turns are moved into the segmented
+    HistoryArchive, the reminders are written to `snapshot_path` and the journal
+    is truncated. Each record carries a sequence number; the snapshot and the
+    archive index remember the last one they contain, so a crash part-way
+    through a compaction never replays a record twice.
+
+    Only the most recent `tail_turns` turns are kept in `chatlog.chat_history`;
+    older turns are read on demand from the archive.
+
+    When a PersistenceWorker is given, appends and compactions are queued on it
+    in order and the caller never waits on the disk.
+    """
+    def __init__(self, snapshot_path: str = "data/chatlog.json", journal_path: str = "data/chatlog.jsonl",
+                 compact_every: int = 500, archive: HistoryArchive = None, tail_turns: int = 50, writer=None):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path)
+        self.compact_every = max(1, int(compact_every))
+        self.archive = archive if archive is not None else HistoryArchive(self.snapshot_path.parent / "history")
+        self.tail_turns = max(0, int(tail_turns))
+        self.writer = writer
+        self.chatlog = ChatLog()
+        self._seq = 0
+        self._pending = 0
+        # (seq, ChatEntry) pairs journaled since the last compaction, not yet in the archive.
+        self._unarchived = []
+
+    def load(self) -> ChatLog:
+        """
+        Rebuild the ChatLog from the last snapshot, the archive tail and the journal records written after them.
+        """
+        chatlog = ChatLog()
+        legacy_history = []
+        if self.snapshot_path.exists():
+            with self.snapshot_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Snapshots written before the archive existed carry the full history inline.
+            legacy_history = [ChatEntry(**entry) for entry in data.get("chat_history", [])]
+            chatlog.reminders = data.get("reminders", [])
+            if data.get("last_interaction"):
+                chatlog.last_interaction = datetime.fromisoformat(data["last_interaction"])
+            self._seq = data.get("journal_seq", 0)
+
+        snapshot_seq = self._seq
+        if legacy_history and self.archive.total_turns() == 0:
+            logger.success(f"Migrating {len(legacy_history)} chat turns into the history archive...")
+            self.archive.append(legacy_history, journal_seq=snapshot_seq)
+        archived_seq = max(self.archive.journal_seq, snapshot_seq)
+        chatlog.chat_history = self.archive.tail(self.tail_turns)
+        self._seq = max(self._seq, self.archive.journal_seq)
+
+        if self.journal_path.exists():
+            with self.journal_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted append; everything before it is intact.
+                        logger.warning(f"Skipping unreadable chat journal line in {self.journal_path}")
+                        continue
+                    seq = record.get("seq", 0)
+                    self._seq = max(self._seq, seq)
+                    if record.get("op") == "turn":
+                        if seq <= archived_seq:
+                            continue
+                    elif seq <= snapshot_seq:
+                        continue
+                    entry = self._apply(chatlog, record)
+                    if entry is not None:
+                        self._unarchived.append((seq, entry))
+                    self._pending += 1
+
+        self.chatlog = chatlog
+        if legacy_history:
+            self.compact()
+        return chatlog
+
+    def _apply(self, chatlog: ChatLog, record: dict):
+        op = record.get("op")
+        if op == "turn":
+            entry = ChatEntry(timestamp=record["timestamp"], user=record["user"], response=record["response"])
+            chatlog.chat_history.append(entry)
+            chatlog.last_interaction = datetime.fromisoformat(entry.timestamp)
+            return entry
+        elif op == "reminder_add":
+            chatlog.reminders.append(record["reminder"])
+        elif op == "reminder_remove":
+            for r in chatlog.reminders:
+                if r.get("name") == record.get("name"):
+                    chatlog.reminders.remove(r)
+                    break
+        else:
+            logger.warning(f"Unknown chat journal operation: {op}")
+        return None
+
+    def read_history(self, start: datetime = None, end: datetime = None, limit: int = None) -> list:
+        """
+        Return turns with start <= timestamp <= end from the archive and the journal, oldest first.
+        """
+        if self.writer is not None:
+            # Turns handed to a queued compaction are only readable once it reaches the archive.
+            self.writer.flush()
+        recent = [
+            entry for _, entry in self._unarchived
+            if (start is None or datetime.fromisoformat(entry.timestamp) >= start)
+            and (end is None or datetime.fromisoformat(entry.timestamp) <= end)
+        ]
+        if limit is not None:
+            if len(recent) >= limit:
+                return recent[-limit:]
+            return self.archive.read_range(start, end, limit - len(recent)) + recent
+        return self.archive.read_range(start, end) + recent
+
+    def append_turn(self, entry: ChatEntry) -> None:
+        seq = self._append({"op": "turn", **entry.__dict__})
+        self._unarchived.append((seq, entry))
+        self._maybe_compact()
+
+    def append_reminder_added(self, reminder: dict) -> None:
+        self._append({"op": "reminder_add", "reminder": reminder})
+        self._maybe_compact()
+
+    def append_reminder_removed(self, name: str) -> None:
+        self._append({"op": "reminder_remove", "name": name})
+        self._maybe_compact()
+
+    def _append(self, record: dict) -> int:
+        self._seq += 1
+        record["seq"] = self._seq
+        line = json.dumps(record, ensure_ascii=False)
+        if self.writer is not None:
+            self.writer.append(self.journal_path, line)
+        else:
+            append_lines(self.journal_path, [line])
+        self._pending += 1
+        return self._seq
+
+    def _maybe_compact(self) -> None:
+        if self._pending >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Move journaled turns into the archive, snapshot the reminders and truncate the journal.
+        """
+        entries = [entry for _, entry in self._unarchived]
+        archive_seq = self._unarchived[-1][0] if self._unarchived else None
+        self._unarchived = []
+        chatlog = self.chatlog
+        chatlog_dict = {
+            "reminders": chatlog.reminders,
+            "last_interaction": chatlog.last_interaction.isoformat() if chatlog.last_interaction else None,
+            "journal_seq": self._seq,
+        }
+        snapshot_text = json.dumps(chatlog_dict)
+        self._pending = 0
+        if len(chatlog.chat_history) > self.tail_turns:
+            del chatlog.chat_history[:len(chatlog.chat_history) - self.tail_turns]
+
+        def write(fsync: bool = False):
+            self.archive.append(entries, journal_seq=archive_seq)
+            atomic_write_text(self.snapshot_path, snapshot_text, fsync=fsync)
+            self.journal_path.write_text("", encoding="utf-8")
+            logger.debug(f"Chat journal compacted into {self.snapshot_path}")
+
+        if self.writer is not None:
+            self.writer.submit(write)
+        else:
+            write()
@@ -0,0 +1,279 @@
+import os
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from core.storage.writer import atomic_write_text, append_lines
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+class MemoryBackend(ABC):
+    """Key/value storage used by MemoryManager."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        pass
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, str]) -> None:
+        """Write several keys as one batch."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def scan_prefix(self, prefix: str, limit: int = None) -> List[Tuple[str, str]]:
+        """Return (key, value) pairs whose key starts with `prefix`, in key order."""
+        pass
+
+    @abstractmethod
+    def keys(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def load_meta(self) -> Dict[str, dict]:
+        """Return the saved expiry and access bookkeeping ({"expires_at", "last_access", "hits"}) by key."""
+        return {}
+
+    def save_meta(self, updates: Dict[str, Optional[dict]]) -> None:
+        """Persist bookkeeping for the given keys; None means the key is gone. Backends may ignore it."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+class JSONMemoryBackend(MemoryBackend):
+    """
+    The whole store lives in one dict that is rewritten to a JSON file on change.
+    Simple and dependency-free; fine for small installs.
+
+    Access bookkeeping is appended to a journal next to it (memory.meta.jsonl), which is
+    compacted when it is loaded, so reads never rewrite a file.
+    """
+    def __init__(self, memory_file: str, writer=None):
+        self.memory_file = memory_file
+        self.meta_journal = os.path.join(os.path.dirname(memory_file), "memory.meta.jsonl")
+        # Optional PersistenceWorker; without one every change is written synchronously.
+        self.writer = writer
+        self._lock = threading.Lock()
+        self.memory = self._load()
+
+    def _load(self) -> dict:
+        if os.path.exists(self.memory_file):
+            try:
+                with open(self.memory_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+            except Exception as e:
+                logger.error(f"Error loading memory file {self.memory_file}: {e}")
+        return {}
+
+    def _render(self) -> tuple:
+        with self._lock:
+            return self.memory_file, json.dumps(self.memory, indent=2)
+
+    def _save(self) -> None:
+        if self.writer is not None:
+            self.writer.mark_dirty(self.memory_file, self._render)
+        else:
+            path, text = self._render()
+            atomic_write_text(path, text)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.memory.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self.memory[key] = value
+        self._save()
+
+    def set_many(self, items: Dict[str, str]) -> None:
+        with self._lock:
+            self.memory.update(items)
+        self._save()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            found = self.memory.pop(key, None) is not None
+        if found:
+            self._save()
+        return found
+
+    def scan_prefix(self, prefix: str, limit: int = None) -> List[Tuple[str, str]]:
+        with self._lock:
+            matches = sorted((k, v) for k, v in self.memory.items() if k.startswith(prefix))
+        return matches[:limit] if limit is not None else matches
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self.memory)
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def load_meta(self) -> Dict[str, dict]:
+        state = {}
+        lines = 0
+        if os.path.exists(self.meta_journal):
+            try:
+                with open(self.meta_journal, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # A torn last line from a crash.
+                        lines += 1
+                        if record.get("meta") is None:
+                            state.pop(record.get("key"), None)
+                        else:
+                            state[record["key"]] = record["meta"]
+            except Exception as e:
+                logger.error(f"Error loading memory metadata {self.meta_journal}: {e}")
+        if lines > 2 * len(state) + 100:
+            atomic_write_text(self.meta_journal, "".join(
+                json.dumps({"key": key, "meta": meta}) + "\n" for key, meta in state.items()
+            ))
+        return state
+
+    def save_meta(self, updates: Dict[str, Optional[dict]]) -> None:
+        append_lines(self.meta_journal, [json.dumps({"key": key, "meta": meta}) for key, meta in updates.items()])
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """
+    Embedded SQLite store in WAL mode. Keys are the primary key of a WITHOUT ROWID
+    table, so get/set are O(log n) B-tree operations and prefix scans are range scans.
+    Expiry and access bookkeeping are columns of the same rows.
+
+    On first use an existing JSON memory file is imported once.
+    """
+    def __init__(self, db_file: str, import_json_file: str = None):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection shared by the agent and tool threads, serialized by the lock.
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(memory)")}
+        for column, definition in (("expires_at", "REAL"), ("last_access", "REAL"), ("hits", "INTEGER")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE memory ADD COLUMN {column} {definition}")
+        if import_json_file:
+            self._import_json(import_json_file)
+
+    def _import_json(self, json_file: str) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'json_imported'").fetchone()
+        if row is not None or not os.path.exists(json_file):
+            return
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading {json_file} for import: {e}")
+            return
+        if not isinstance(data, dict):
+            data = {}
+        self.set_many({str(k): v if isinstance(v, str) else json.dumps(v) for k, v in data.items()},
+                      meta={"json_imported": json_file})
+        logger.success(f"Imported {len(data)} memory entries from {json_file} into {self.db_file}")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM memory WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO memory (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, value, datetime.now().isoformat()),
+            )
+
+    def set_many(self, items: Dict[str, str], meta: Dict[str, str] = None) -> None:
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO memory (key, value, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    [(k, v, now) for k, v in items.items()],
+                )
+                for name, value in (meta or {}).items():
+                    self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM memory WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def scan_prefix(self, prefix: str, limit: int = None) -> List[Tuple[str, str]]:
+        query = "SELECT key, value FROM memory WHERE key >= ? AND key < ? ORDER BY key"
+        # Every string starting with `prefix` sorts below prefix + U+10FFFF.
+        params = [prefix, prefix + "\U0010ffff"]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT key FROM memory")]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def load_meta(self) -> Dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, expires_at, last_access, hits FROM memory WHERE last_access IS NOT NULL"
+            ).fetchall()
+        return {key: {"expires_at": expires_at, "last_access": last_access, "hits": hits or 0}
+                for key, expires_at, last_access, hits in rows}
+
+    def save_meta(self, updates: Dict[str, Optional[dict]]) -> None:
+        # Deleted keys have already lost their row.
+        rows = [(m["expires_at"], m["last_access"], m["hits"], key) for key, m in updates.items() if m is not None]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE memory SET expires_at = ?, last_access = ?, hits = ? WHERE key = ?", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
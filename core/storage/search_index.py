@@ -0,0 +1,187 @@
+import os
+import re
+import math
+import sqlite3
+import threading
+from collections import Counter
+from typing import List, Tuple
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i if in is it its me my of on or so that the
+this to was we were what when where which who will with you your
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with stopwords and single characters removed."""
+    return [t for t in re.findall(r"\w+", text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+class BM25Index:
+    """
+    Incrementally maintained inverted index with BM25 ranking, stored in SQLite.
+
+    Each posting row carries the term frequency and the document length, so a query
+    only reads the posting lists of its own terms plus two collection counters and
+    never loads the corpus. Re-adding a doc_id replaces the previous version.
+    """
+    def __init__(self, db_file: str = "data/search.db", k1: float = 1.2, b: float = 0.75):
+        self.db_file = db_file
+        self.k1 = k1
+        self.b = b
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id TEXT PRIMARY KEY, source TEXT NOT NULL, ref TEXT, length INTEGER NOT NULL, text TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL, doc_len INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO stats (name, value) VALUES ('doc_count', 0), ('total_length', 0), ('built', 0);
+        """)
+
+    def _stat(self, name: str) -> int:
+        return self._conn.execute("SELECT value FROM stats WHERE name = ?", (name,)).fetchone()[0]
+
+    def _add_stat(self, name: str, delta: int) -> None:
+        self._conn.execute("UPDATE stats SET value = value + ? WHERE name = ?", (delta, name))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._stat("doc_count")
+
+    @property
+    def built(self) -> bool:
+        with self._lock:
+            return bool(self._stat("built"))
+
+    def mark_built(self) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE stats SET value = 1 WHERE name = 'built'")
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        row = self._conn.execute("SELECT length, text FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return False
+        length, text = row
+        for term in set(tokenize(text)):
+            self._conn.execute("DELETE FROM postings WHERE term = ? AND doc_id = ?", (term, doc_id))
+            self._conn.execute("UPDATE terms SET df = df - 1 WHERE term = ?", (term,))
+        self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+        self._add_stat("doc_count", -1)
+        self._add_stat("total_length", -length)
+        return True
+
+    def add_documents(self, documents: List[Tuple[str, str, str, str]]) -> None:
+        """
+        Index (doc_id, source, ref, text) tuples in one transaction.
+        """
+        if not documents:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for doc_id, source, ref, text in documents:
+                    self._remove_locked(doc_id)
+                    counts = Counter(tokenize(text))
+                    length = sum(counts.values())
+                    self._conn.execute(
+                        "INSERT INTO docs (doc_id, source, ref, length, text) VALUES (?, ?, ?, ?, ?)",
+                        (doc_id, source, ref, length, text),
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO postings (term, doc_id, tf, doc_len) VALUES (?, ?, ?, ?)",
+                        [(term, doc_id, tf, length) for term, tf in counts.items()],
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                        [(term,) for term in counts],
+                    )
+                    self._add_stat("doc_count", 1)
+                    self._add_stat("total_length", length)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def add_document(self, doc_id: str, source: str, ref: str, text: str) -> None:
+        self.add_documents([(doc_id, source, ref, text)])
+
+    def remove_document(self, doc_id: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                found = self._remove_locked(doc_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return found
+
+    def search(self, query: str, limit: int = 10, source: str = None) -> List[dict]:
+        """
+        Return up to `limit` hits as dicts with doc_id, source, ref, score and text, best first.
+
+        Document ids are "<source>:<id>", so the source filter is a key range on the postings.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            doc_count = self._stat("doc_count")
+            if doc_count == 0:
+                return []
+            avg_len = self._stat("total_length") / doc_count or 1.0
+            weights = []
+            for term in terms:
+                row = self._conn.execute("SELECT df FROM terms WHERE term = ?", (term,)).fetchone()
+                if row and row[0] > 0:
+                    weights.append((term, math.log(1 + (doc_count - row[0] + 0.5) / (row[0] + 0.5))))
+            if not weights:
+                return []
+            # Scoring and top-k selection run inside SQLite over the query terms' posting lists only.
+            values = ", ".join("(?, ?)" for _ in weights)
+            params = [value for pair in weights for value in pair]
+            params += [self.k1 + 1, self.k1, 1 - self.b, self.b / avg_len]
+            source_clause = ""
+            if source:
+                source_clause = "WHERE p.doc_id >= ? AND p.doc_id < ?"
+                params += [f"{source}:", f"{source};"]
+            params.append(int(limit))
+            rows = self._conn.execute(f"""
+                WITH q(term, idf) AS (VALUES {values}),
+                     w(k1p1, k1, one_minus_b, b_over_avg) AS (SELECT ?, ?, ?, ?)
+                SELECT p.doc_id,
+                       SUM(q.idf * p.tf * w.k1p1 / (p.tf + w.k1 * (w.one_minus_b + w.b_over_avg * p.doc_len))) AS score
+                FROM q JOIN postings p ON p.term = q.term, w
+                {source_clause}
+                GROUP BY p.doc_id
+                ORDER BY score DESC
+                LIMIT ?
+            """, params).fetchall()
+            hits = []
+            for doc_id, score in rows:
+                row = self._conn.execute("SELECT source, ref, text FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+                if row is not None:
+                    hits.append({"doc_id": doc_id, "source": row[0], "ref": row[1], "score": score, "text": row[2]})
+            return hits
+
+    def on_memory_change(self, op: str, items: dict) -> None:
+        """MemoryManager listener keeping memory documents in step with the store."""
+        if op == "set":
+            self.add_documents([(f"memory:{key}", "memory", key, value) for key, value in items.items()])
+        elif op == "delete":
+            for key in items:
+                self.remove_document(f"memory:{key}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,36 @@
+import json
+from core.storage.vector_index import COMPACT_MIN_DEAD_ROWS, HashingEmbedder, VectorIndex
+
+def open_index(tmp_path):
+    return VectorIndex(str(tmp_path / "vectors"), embedder=HashingEmbedder(dim=32))
+
+def file_rows(index) -> int:
+    return index.vectors_path.stat().st_size // (4 * index.dim)
+
+def test_overwrites_and_deletes_are_reclaimed(tmp_path):
+    index = open_index(tmp_path)
+    index.add_many([(f"k{i}", f"note number {i}") for i in range(10)])
+    for round_ in range(3 * COMPACT_MIN_DEAD_ROWS):
+        index.add(f"k{round_ % 10}", f"rewritten note {round_}")
+    index.remove("k9")
+    assert len(index) == 9
+    assert file_rows(index) <= 2 * max(len(index), COMPACT_MIN_DEAD_ROWS) + 1
+    assert len(index.keys_path.read_text().splitlines()) <= file_rows(index) + 1
+    last = 3 * COMPACT_MIN_DEAD_ROWS - 1
+    assert index.search(f"rewritten note {last}", k=1)[0][0] == f"k{last % 10}"
+
+def test_compacted_index_reloads_and_old_files_are_removed(tmp_path):
+    index = open_index(tmp_path)
+    index.add_many([(f"k{i}", f"text {i}") for i in range(COMPACT_MIN_DEAD_ROWS + 5)])
+    for i in range(COMPACT_MIN_DEAD_ROWS + 1):
+        index.remove(f"k{i}")
+    assert index.generation == 1
+    expected = index.search("text 66", k=3)
+
+    reopened = open_index(tmp_path)
+    assert reopened.generation == 1
+    assert len(reopened) == 4
+    assert reopened.search("text 66", k=3) == expected
+    files = sorted(p.name for p in (tmp_path / "vectors").iterdir())
+    assert files == ["keys.1.jsonl", "meta.json", "vectors.1.f32"]
+    assert json.loads((tmp_path / "vectors" / "meta.json").read_text()) == {"dim": 32, "generation": 1}
@@ -0,0 +1,66 @@
+import threading
+from core.storage.writer import PersistenceWorker
+
+def test_repeated_marks_are_coalesced_into_one_write(tmp_path):
+    worker = PersistenceWorker(flush_interval=0.2, fsync="never").start()
+    target = tmp_path / "state.json"
+    produced = []
+
+    def producer(version):
+        def produce():
+            produced.append(version)
+            return target, f"version {version}"
+        return produce
+
+    for version in range(100):
+        worker.mark_dirty("state", producer(version))
+    assert worker.flush(5)
+    assert produced == [99]
+    assert target.read_text() == "version 99"
+    worker.stop()
+
+def test_appends_and_submitted_calls_run_in_order(tmp_path):
+    worker = PersistenceWorker(flush_interval=0.05, fsync="never").start()
+    log = tmp_path / "log.jsonl"
+    seen = []
+    worker.append(log, "one")
+    worker.append(log, "two")
+    worker.submit(lambda fsync: seen.append(log.read_text().splitlines()))
+    worker.append(log, "three")
+    assert worker.flush(5)
+    assert seen == [["one", "two"]]
+    assert log.read_text().splitlines() == ["one", "two", "three"]
+    worker.stop()
+
+def test_concurrent_writers_lose_nothing_and_stop_drains(tmp_path):
+    worker = PersistenceWorker(flush_interval=1.0, fsync="shutdown").start()
+    log = tmp_path / "log.jsonl"
+
+    def write(thread_id):
+        for i in range(200):
+            worker.append(log, f"{thread_id}:{i}")
+
+    threads = [threading.Thread(target=write, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    worker.stop()
+    lines = log.read_text().splitlines()
+    assert len(lines) == 800
+    for t in range(4):
+        assert [line for line in lines if line.startswith(f"{t}:")] == [f"{t}:{i}" for i in range(200)]
+
+def test_failed_write_does_not_stop_the_worker(tmp_path):
+    worker = PersistenceWorker(flush_interval=0, fsync="never").start()
+    worker.mark_dirty("broken", lambda: 1 / 0)
+    worker.append(tmp_path / "log.jsonl", "still written")
+    assert worker.flush(5)
+    assert (tmp_path / "log.jsonl").read_text() == "still written\n"
+    worker.stop()
+
+def test_flush_without_a_thread_writes_inline(tmp_path):
+    worker = PersistenceWorker(fsync="never")
+    worker.mark_dirty("state", lambda: (tmp_path / "state.txt", "inline"))
+    assert worker.flush()
+    assert (tmp_path / "state.txt").read_text() == "inline"
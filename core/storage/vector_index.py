@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import zlib
+import threading
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+from core.storage.writer import atomic_write_text
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+# Rows scored per block, so a search never materializes more than this many scores from the memmap at once.
+SEARCH_BLOCK_ROWS = 65536
+
+# Retired rows are reclaimed once they outnumber the live ones (and there are at least this many).
+COMPACT_MIN_DEAD_ROWS = 64
+
+class HashingEmbedder:
+    """
+    Offline text embedder: word unigrams plus character n-grams hashed into a
+    fixed-size signed vector (the "hashing trick"), then L2-normalized.
+    Needs no model download and no network; crc32 keeps hashes stable across runs.
+    """
+    def __init__(self, dim: int = 256, ngram_min: int = 3, ngram_max: int = 5):
+        self.dim = int(dim)
+        self.ngram_min = ngram_min
+        self.ngram_max = ngram_max
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = list(words)
+        padded = f" {' '.join(words)} "
+        for n in range(self.ngram_min, self.ngram_max + 1):
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        features = self._features(text)
+        if not features:
+            return vec
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint64, count=len(features))
+        signs = np.where(hashes & np.uint64(1 << 31), 1.0, -1.0).astype(np.float32)
+        np.add.at(vec, (hashes % np.uint64(self.dim)).astype(np.int64), signs)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+class VectorIndex:
+    """
+    Append-only embedding matrix on disk with top-k cosine search.
+
+    `vectors.f32` holds one float32 row per added text and is searched through
+    np.memmap in blocks, so the matrix is never loaded into Python objects.
+    `keys.jsonl` records which memory key each row belongs to; rewriting a key
+    appends a new row and retires the old one. Once retired rows outnumber live
+    ones, the live rows are copied to a new generation of both files and
+    `meta.json`, which names the current generation, is switched over.
+    """
+    def __init__(self, directory: str = "data/vectors", embedder: HashingEmbedder = None):
+        self.directory = Path(directory)
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self.meta_path = self.directory / "meta.json"
+        self.generation = 0
+        self.vectors_path, self.keys_path = self._paths(0)
+        self._lock = threading.Lock()
+        self._row_keys = []
+        self._row_of = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._matrix = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _paths(self, generation: int) -> Tuple[Path, Path]:
+        suffix = f".{generation}" if generation else ""
+        return self.directory / f"vectors{suffix}.f32", self.directory / f"keys{suffix}.jsonl"
+
+    def _write_meta(self) -> None:
+        atomic_write_text(self.meta_path, json.dumps({"dim": self.dim, "generation": self.generation}))
+
+    def _load(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {}
+        if self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+        if meta.get("dim") != self.dim:
+            # Embedding size changed (or first run): start a fresh index.
+            for path in [*self.directory.glob("vectors*.f32"), *self.directory.glob("keys*.jsonl")]:
+                path.unlink()
+            self._write_meta()
+            return
+        self.generation = meta.get("generation", 0)
+        self.vectors_path, self.keys_path = self._paths(self.generation)
+        for path in [*self.directory.glob("vectors*.f32"), *self.directory.glob("keys*.jsonl")]:
+            if path not in (self.vectors_path, self.keys_path):
+                # Left by a compaction that was interrupted before or after switching generations.
+                path.unlink()
+
+        row_keys, deleted_after = [], {}
+        if self.keys_path.exists():
+            with self.keys_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("op") == "add":
+                        row_keys.append(record["key"])
+                    elif record.get("op") == "del":
+                        deleted_after[record["key"]] = len(row_keys)
+
+        rows_on_disk = self.vectors_path.stat().st_size // (4 * self.dim) if self.vectors_path.exists() else 0
+        if rows_on_disk != len(row_keys):
+            # An add was interrupted between the two files; keep the rows both agree on.
+            logger.warning("Vector index files disagree; truncating to the common prefix.")
+            count = min(rows_on_disk, len(row_keys))
+            row_keys = row_keys[:count]
+            with self.vectors_path.open("ab") as f:
+                f.truncate(count * 4 * self.dim)
+            self.keys_path.write_text(
+                "".join(json.dumps({"op": "add", "key": k}) + "\n" for k in row_keys), encoding="utf-8"
+            )
+
+        self._row_keys = row_keys
+        self._alive = np.zeros(len(row_keys), dtype=bool)
+        for row, key in enumerate(row_keys):
+            self._row_of[key] = row
+        for key, rows_before in deleted_after.items():
+            row = self._row_of.get(key)
+            if row is not None and row < rows_before:
+                del self._row_of[key]
+        self._alive[list(self._row_of.values())] = True
+
+    def add(self, key: str, text: str) -> None:
+        self.add_many([(key, text)])
+
+    def add_many(self, items: List[Tuple[str, str]]) -> None:
+        if not items:
+            return
+        vectors = np.stack([self.embedder.embed(text) for _, text in items]).astype(np.float32)
+        with self._lock:
+            with self.vectors_path.open("ab") as f:
+                f.write(vectors.tobytes())
+            with self.keys_path.open("a", encoding="utf-8") as f:
+                f.write("".join(json.dumps({"op": "add", "key": key}) + "\n" for key, _ in items))
+            start = len(self._row_keys)
+            alive = np.ones(len(items), dtype=bool)
+            for offset, (key, _) in enumerate(items):
+                old = self._row_of.get(key)
+                if old is not None:
+                    if old < start:
+                        self._alive[old] = False
+                    else:
+                        alive[old - start] = False
+                self._row_of[key] = start + offset
+                self._row_keys.append(key)
+            self._alive = np.concatenate([self._alive, alive])
+            self._matrix = None
+            self._maybe_compact()
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            row = self._row_of.pop(key, None)
+            if row is None:
+                return False
+            self._alive[row] = False
+            with self.keys_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "del", "key": key}) + "\n")
+            self._maybe_compact()
+            return True
+
+    def _maybe_compact(self) -> None:
+        """Call with the lock held."""
+        dead = len(self._row_keys) - len(self._row_of)
+        if dead > len(self._row_of) and dead >= COMPACT_MIN_DEAD_ROWS:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Copy the live rows to the next generation of files and switch to it. Call with the
+        lock held. A crash before meta.json is replaced leaves the current files in use.
+        """
+        rows = len(self._row_keys)
+        live = np.flatnonzero(self._alive[:rows])
+        generation = self.generation + 1
+        vectors_path, keys_path = self._paths(generation)
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)) if rows else None
+        with vectors_path.open("wb") as f:
+            for start in range(0, len(live), SEARCH_BLOCK_ROWS):
+                f.write(np.ascontiguousarray(matrix[live[start:start + SEARCH_BLOCK_ROWS]]).tobytes())
+        row_keys = [self._row_keys[row] for row in live]
+        keys_path.write_text("".join(json.dumps({"op": "add", "key": key}) + "\n" for key in row_keys),
+                             encoding="utf-8")
+        old_paths = (self.vectors_path, self.keys_path)
+        self.generation = generation
+        self._write_meta()
+        self.vectors_path, self.keys_path = vectors_path, keys_path
+        self._row_keys = row_keys
+        self._row_of = {key: row for row, key in enumerate(row_keys)}
+        self._alive = np.ones(len(row_keys), dtype=bool)
+        self._matrix = None
+        del matrix
+        for path in old_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Still mapped by a search in progress on some platforms; harmless to leave.
+        logger.debug(f"Compacted vector index from {rows} to {len(row_keys)} rows.")
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Return up to `k` (key, cosine similarity) pairs, best first.
+        """
+        q = self.embedder.embed(query)
+        with self._lock:
+            rows = len(self._row_keys)
+            if rows == 0 or not self._row_of or not q.any():
+                return []
+            if self._matrix is None or self._matrix.shape[0] != rows:
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            matrix, alive, row_keys = self._matrix, self._alive, self._row_keys
+        k = max(1, min(int(k), len(self._row_of)))
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            block = matrix[start:start + SEARCH_BLOCK_ROWS] @ q
+            block[~alive[start:start + SEARCH_BLOCK_ROWS]] = -np.inf
+            take = min(k, block.shape[0])
+            top = np.argpartition(-block, take - 1)[:take]
+            best_scores = np.concatenate([best_scores, block[top]])
+            best_rows = np.concatenate([best_rows, top + start])
+            if best_scores.shape[0] > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_scores, best_rows = best_scores[keep], best_rows[keep]
+        order = np.argsort(-best_scores)
+        return [
+            (row_keys[int(best_rows[i])], float(best_scores[i]))
+            for i in order if np.isfinite(best_scores[i])
+        ]
+
+    def on_memory_change(self, op: str, items: dict) -> None:
+        """MemoryManager listener keeping the index in step with the store."""
+        if op == "set":
+            self.add_many(list(items.items()))
+        elif op == "delete":
+            for key in items:
+                self.remove(key)
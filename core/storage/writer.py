@@ -0,0 +1,192 @@
+import os
+import atexit
+import threading
+from collections import deque
+from pathlib import Path
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+FSYNC_POLICIES = ("always", "shutdown", "never")
+
+def _fsync_dir(path: Path) -> None:
+    # Make the rename itself durable; not supported on every platform (e.g. Windows).
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_text(path, text: str, fsync: bool = False) -> None:
+    """
+    Replace `path` with `text` by writing a temporary file and renaming it over the original.
+    Readers see either the old or the new content, never a partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        f.write(text)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if fsync:
+        _fsync_dir(path.parent)
+
+def append_lines(path, lines: list, fsync: bool = False) -> None:
+    """Append already-serialized lines to `path` with a single open."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+class PersistenceWorker:
+    """
+    Single background thread that performs all disk writes for the chat log and memory.
+
+    Callers never touch the disk:
+      - `mark_dirty(key, producer)` records that a whole-file snapshot is stale. Repeated
+        marks for the same key before the next flush are coalesced into one write, and
+        `producer()` is only called on the worker thread, returning `(path, text)`.
+      - `append(path, line)` queues a line for an append-only file.
+      - `submit(fn)` queues an arbitrary write that must run after the appends before it;
+        it is called on the worker thread as `fn(fsync)`.
+
+    Queued work is written every `flush_interval` seconds. `fsync` is one of
+    "always" (fsync every written file), "shutdown" (fsync only while draining in
+    `stop()`) or "never" (leave it to the OS).
+    """
+    def __init__(self, flush_interval: float = 0.5, fsync: str = "always"):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}', expected one of {FSYNC_POLICIES}")
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._dirty = {}
+        self._tasks = deque()
+        self._busy = False
+        self._flush_requested = False
+        self._stopping = False
+        self._thread = None
+
+    def start(self) -> "PersistenceWorker":
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="iris-persistence", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+        return self
+
+    def mark_dirty(self, key: str, producer) -> None:
+        with self._cond:
+            self._dirty[key] = producer
+            self._cond.notify_all()
+
+    def append(self, path, line: str) -> None:
+        with self._cond:
+            self._tasks.append(("append", Path(path), line))
+            self._cond.notify_all()
+
+    def submit(self, fn) -> None:
+        with self._cond:
+            self._tasks.append(("call", fn, None))
+            self._cond.notify_all()
+
+    def _has_pending(self) -> bool:
+        return bool(self._dirty or self._tasks)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Block until everything queued so far has been written. Returns False on timeout.
+        """
+        with self._cond:
+            if self._thread is None:
+                self._write_pending(self._take_pending())
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._has_pending() and not self._busy, timeout)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Drain all queued writes and stop the worker thread.
+        """
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        with self._cond:
+            self._thread = None
+            # Anything queued after the thread finished its last pass is written here.
+            leftover = self._take_pending()
+        self._write_pending(leftover, final=True)
+
+    def _take_pending(self):
+        tasks = list(self._tasks)
+        self._tasks.clear()
+        dirty = self._dirty
+        self._dirty = {}
+        return tasks, dirty
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._has_pending() or self._stopping)
+                if not self._stopping and not self._flush_requested and self.flush_interval:
+                    # Write-behind window: let further changes coalesce before touching the disk.
+                    self._cond.wait_for(lambda: self._stopping or self._flush_requested, self.flush_interval)
+                pending = self._take_pending()
+                self._flush_requested = False
+                self._busy = True
+                stopping = self._stopping
+            try:
+                self._write_pending(pending, final=stopping)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+            if stopping:
+                return
+
+    def _write_pending(self, pending, final: bool = False) -> None:
+        tasks, dirty = pending
+        do_fsync = self.fsync == "always" or (final and self.fsync == "shutdown")
+        run_path, run_lines = None, []
+        for kind, target, line in tasks:
+            if kind == "append" and target == run_path:
+                run_lines.append(line)
+                continue
+            if run_lines:
+                self._safe(append_lines, run_path, run_lines, do_fsync)
+            run_path, run_lines = None, []
+            if kind == "append":
+                run_path, run_lines = target, [line]
+            else:
+                self._safe(target, do_fsync)
+        if run_lines:
+            self._safe(append_lines, run_path, run_lines, do_fsync)
+        for key, producer in dirty.items():
+            try:
+                path, text = producer()
+                atomic_write_text(path, text, fsync=do_fsync)
+            except Exception as e:
+                logger.error(f"Persistence write failed for {key}: {e}", exc_info=True)
+
+    def _safe(self, fn, *args) -> None:
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.error(f"Persistence write failed: {e}", exc_info=True)
@@ -0,0 +1,76 @@
+import json
+import time
+import pytest
+from core.memory import MemoryManager
+import core.storage.writer as writer_module
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request):
+    return request.param
+
+def open_memory(tmp_path, backend, **kwargs):
+    return MemoryManager(memory_file=str(tmp_path / "memory.json"), backend=backend, **kwargs)
+
+def test_get_does_not_rewrite_files(tmp_path, backend, monkeypatch):
+    memory = open_memory(tmp_path, backend)
+    for i in range(50):
+        memory.set(f"k{i}", f"v{i}")
+    rewrites = []
+    monkeypatch.setattr(writer_module, "atomic_write_text", lambda *a, **k: rewrites.append(a[0]))
+    monkeypatch.setattr("core.storage.memory_backends.atomic_write_text", lambda *a, **k: rewrites.append(a[0]))
+    assert memory.get("k7") == "v7"
+    assert rewrites == []
+    memory.close()
+
+def test_access_order_and_expiry_survive_restart(tmp_path, backend):
+    memory = open_memory(tmp_path, backend, max_entries=3)
+    memory.set("a", "1")
+    memory.set("b", "2")
+    memory.set("c", "3", ttl=0.2)
+    memory.get("a")  # b is now least recently used
+    memory.close()
+
+    time.sleep(0.3)
+    memory = open_memory(tmp_path, backend, max_entries=3)
+    assert memory.get("c") == ""  # expired while closed
+    memory.set("d", "4")
+    memory.set("e", "5")
+    assert memory.get("b") == ""  # evicted first
+    assert memory.get("a") == "1"
+    memory.close()
+
+def test_json_meta_journal_is_compacted_on_load(tmp_path):
+    memory = open_memory(tmp_path, "json")
+    memory.set("a", "1")
+    for _ in range(300):
+        memory.get("a")
+    memory.close()
+    journal = tmp_path / "memory.meta.jsonl"
+    assert len(journal.read_text().splitlines()) > 300
+    memory = open_memory(tmp_path, "json")
+    assert len(journal.read_text().splitlines()) == 1
+    assert memory.tracker.meta("a")["hits"] == 301
+    memory.close()
+
+def test_writes_are_batched_through_the_writer(tmp_path):
+    worker = writer_module.PersistenceWorker(flush_interval=0.05, fsync="never").start()
+    memory = MemoryManager(memory_file=str(tmp_path / "memory.json"), backend="sqlite", writer=worker)
+    memory.set("a", "1")
+    for _ in range(20):
+        memory.get("a")
+    worker.flush()
+    assert memory.backend.load_meta()["a"]["hits"] == 21
+    worker.stop()
+    memory.close()
+
+def test_misses_write_no_metadata(tmp_path, backend, monkeypatch):
+    memory = open_memory(tmp_path, backend)
+    memory.set("a", "1")
+    saved = []
+    monkeypatch.setattr(memory.backend, "save_meta", lambda updates: saved.append(updates))
+    assert memory.get("missing") == ""
+    assert not memory.delete("missing")
+    assert saved == []
+    memory.get("a")
+    assert list(saved[0]) == ["a"]
+    memory.close()
@@ -0,0 +1,28 @@
+import asyncio
+from core.config.config_manager import ConfigManager
+from core.server import IRISServer
+
+def test_sessions_share_one_tool_executor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setattr("core.tools.tool_manager.ToolContext", lambda **kwargs: None)
+    config = ConfigManager(str(tmp_path / "config.json"))
+    config.config.update(provider="replay", users=["ann", "bob"])
+    server = IRISServer(config)
+
+    async def run():
+        server._loop = asyncio.get_running_loop()
+        ann = await server.get_session("ann")
+        bob = await server.get_session("bob")
+        return ann, bob, await server.chat(ann, "hello")
+
+    try:
+        ann, bob, reply = asyncio.run(run())
+        assert reply == "You said: hello"
+        executors = [ann.agent.tool_executor, bob.agent.tool_executor]
+        assert all(executor.pool is server.tool_executor.pool for executor in executors)
+        # Same tool names, but each bound to its own user's session.
+        assert executors[0].tools.keys() == executors[1].tools.keys()
+        assert executors[0].tools["store_memory"] is not executors[1].tools["store_memory"]
+    finally:
+        server.shutdown()
@@ -0,0 +1,34 @@
+from core.session import IRISSession
+from core.storage.writer import PersistenceWorker
+
+NEVER = "cron 0 0 31 2 *"
+
+def open_session(tmp_path, writer):
+    return IRISSession({}, "Ann", writer, data_dir=str(tmp_path))
+
+def test_reminder_that_never_fires_is_rejected_before_it_is_stored(tmp_path):
+    writer = PersistenceWorker(fsync="never").start()
+    session = open_session(tmp_path, writer).start()
+    reply = session.add_reminder("leap", "never", recurrence=NEVER)
+    assert reply.startswith("Error parsing recurrence")
+    assert session.chatlog.reminders == []
+    session.stop_reminders()
+    session.close()
+    writer.stop()
+
+def test_bad_stored_reminder_is_skipped_at_start(tmp_path):
+    writer = PersistenceWorker(fsync="never").start()
+    session = open_session(tmp_path, writer)
+    bad = {"name": "leap", "text": "never", "due_date": "2026-01-01T00:00:00", "recurrence": NEVER}
+    session.chatlog.reminders.append(bad)
+    session.chat_journal.append_reminder_added(bad)
+    session.close()
+    writer.flush()
+
+    session = open_session(tmp_path, writer).start()
+    assert session.add_reminder("daily", "stretch", recurrence="daily 09:00").startswith("Reminder 'daily' set")
+    assert [r["name"] for r in session.chatlog.reminders] == ["leap", "daily"]
+    assert len(session.reminder_scheduler) == 1
+    session.stop_reminders()
+    session.close()
+    writer.stop()
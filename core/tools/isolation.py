@@ -0,0 +1,324 @@
+import os
+import sys
+import time
+import signal
+import functools
+import threading
+import importlib.util
+import multiprocessing
+from dataclasses import dataclass, fields, replace
+from typing import Callable, Optional
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+ISOLATED_ATTR = "__iris_isolated__"
+
+# Set in worker processes, where isolated functions simply run inline.
+_IN_WORKER = False
+
+# Process groups of commands started in their own session by the call in progress (worker side).
+_child_groups = set()
+
+class ToolProcessError(RuntimeError):
+    """An isolated call failed: the function raised, or its worker died or hit a limit."""
+
+class ToolTimeoutError(ToolProcessError):
+    pass
+
+class ToolCancelledError(ToolProcessError):
+    pass
+
+@dataclass(frozen=True)
+class ProcessLimits:
+    """
+    Limits for one isolated call. None means unlimited.
+
+    timeout_seconds: wall-clock time before the worker is killed.
+    cpu_seconds: CPU time (RLIMIT_CPU); the worker is killed when it is used up.
+    memory_mb: address space (RLIMIT_AS); allocations beyond it raise MemoryError.
+    max_output_chars: string results, and strings in tuple or list results, are truncated to this length.
+    """
+    timeout_seconds: Optional[float] = 60.0
+    cpu_seconds: Optional[int] = None
+    memory_mb: Optional[int] = None
+    max_output_chars: Optional[int] = None
+
+def _apply_limits(limits: ProcessLimits) -> None:
+    """Set this worker's rlimits for the next call (soft limits only, so they can be raised again)."""
+    try:
+        import resource
+    except ImportError:
+        return  # No rlimits on this platform; the wall-clock timeout still applies.
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = limits.memory_mb * 1024 * 1024 if limits.memory_mb else hard
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = hard
+    if limits.cpu_seconds:
+        # RLIMIT_CPU counts the whole life of the process, so the budget starts from what is used so far.
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(usage.ru_utime + usage.ru_stime) + 1 + int(limits.cpu_seconds)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _cap_output(result, max_output_chars: Optional[int]):
+    if isinstance(result, (tuple, list)):
+        return type(result)(_cap_output(item, max_output_chars) for item in result)
+    if max_output_chars and isinstance(result, str) and len(result) > max_output_chars:
+        return result[:max_output_chars] + f"\n[output truncated at {max_output_chars} characters]"
+    return result
+
+def kill_process_group(pgid: int) -> None:
+    """SIGKILL every process in group `pgid`, if it still exists."""
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def track_process_group(pgid: int) -> None:
+    """
+    Have the worker kill process group `pgid` when the worker itself is killed. For commands
+    started with start_new_session=True, which leave the worker's own process group.
+    """
+    _child_groups.add(pgid)
+
+def untrack_process_group(pgid: int) -> None:
+    _child_groups.discard(pgid)
+
+def _on_terminate(signum, frame) -> None:
+    for pgid in list(_child_groups):
+        kill_process_group(pgid)
+    os._exit(128 + signum)
+
+def _find_function(module_name: str, module_file: str, qualname: str, modules: dict) -> Callable:
+    """Locate an isolated function in the worker, importing its module by name or, for tool modules, by file."""
+    module = sys.modules.get(module_name)
+    if module is None or getattr(module, "__file__", None) != module_file:
+        # Keyed by modification time too, so hot-reloaded tool modules are picked up.
+        key = (module_file, os.stat(module_file).st_mtime_ns)
+        module = modules.get(key)
+    if module is None:
+        spec = None
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            pass
+        if spec is not None and spec.origin == module_file:
+            module = importlib.import_module(module_name)
+        else:
+            # Tool modules are loaded from tools/ by path and are not importable by name.
+            spec = importlib.util.spec_from_file_location(f"_iris_isolated_{len(modules)}", module_file)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        modules[key] = module
+    func = module
+    for part in qualname.split("."):
+        func = getattr(func, part)
+    return getattr(func, ISOLATED_ATTR, (func, None))[0]
+
+def _worker_main(conn) -> None:
+    """Worker process loop: receive a call, apply its limits, run it and send back the result."""
+    global _IN_WORKER
+    _IN_WORKER = True
+    if hasattr(os, "setsid"):
+        # Own process group, so commands the call starts are killed along with the worker.
+        os.setsid()
+        # Commands started in a session of their own are killed from SIGTERM instead.
+        signal.signal(signal.SIGTERM, _on_terminate)
+    modules = {}
+    while True:
+        try:
+            module_name, module_file, qualname, args, kwargs, limits = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            _apply_limits(limits)
+            func = _find_function(module_name, module_file, qualname, modules)
+            reply = (True, _cap_output(func(*args, **kwargs), limits.max_output_chars))
+        except BaseException as e:
+            reply = (False, str(e) or type(e).__name__)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send((False, f"Result could not be returned: {e}"))
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name="iris-tool-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.cancelled = False
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        if hasattr(os, "killpg"):
+            if self.process.is_alive():
+                # Lets the worker kill the process groups it tracks before it goes.
+                self.process.terminate()
+                self.process.join(0.5)
+            kill_process_group(self.process.pid)
+        self.process.kill()
+        self.process.join(1.0)
+        self.conn.close()
+
+    def exit_reason(self) -> str:
+        self.process.join(1.0)
+        code = self.process.exitcode
+        if code is not None and code < 0:
+            if code == -getattr(signal, "SIGXCPU", 0):
+                return "exceeded its CPU time limit"
+            return f"was killed by signal {-code}"
+        return f"exited with code {code}"
+
+class WorkerPool:
+    """
+    Runs functions marked with @isolated in separate worker processes.
+
+    Workers are started on first use with the "spawn" method (safe with the threads IRIS
+    runs) and reused between calls. Each call gets wall-clock, CPU and memory limits and
+    an output cap; a worker that times out, is cancelled or crashes is killed together
+    with any commands it started, and replaced on the next call. A runaway call
+    therefore costs one worker process, never the assistant.
+    """
+    def __init__(self, enabled: bool = True, max_workers: int = 2, tool_limits: dict = None):
+        self.configure(enabled, max_workers, tool_limits)
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = []
+        # Calls in progress, by the thread waiting for them, so they can be cancelled from outside.
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool = True, max_workers: int = 2, tool_limits: dict = None) -> "WorkerPool":
+        """
+        Parameters:
+            enabled (bool): Run isolated functions in workers; when False they run in-process.
+            max_workers (int): Calls that may run at once; further calls wait for a free worker.
+            tool_limits (dict): ProcessLimits overrides by function name, e.g. {"read_pdf_text": {"timeout_seconds": 300}}.
+        """
+        self.enabled = enabled
+        self.max_workers = max(1, max_workers)
+        self.tool_limits = tool_limits or {}
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        return self
+
+    def limits_for(self, name: str, limits: ProcessLimits) -> ProcessLimits:
+        overrides = self.tool_limits.get(name) or {}
+        known = {f.name for f in fields(ProcessLimits)}
+        return replace(limits, **{key: value for key, value in overrides.items() if key in known})
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive():
+                    return worker
+        return _Worker(self._context)
+
+    def run(self, func: Callable, args: tuple, kwargs: dict, limits: ProcessLimits):
+        """Call `func(*args, **kwargs)` in a worker within `limits` and return its result."""
+        name = func.__name__
+        limits = self.limits_for(name, limits)
+        message = (func.__module__, func.__code__.co_filename, func.__qualname__, args, kwargs, limits)
+        start = time.monotonic()
+        slots = self._slots
+        # The wall-clock limit covers the wait for a free worker too.
+        if not slots.acquire(timeout=limits.timeout_seconds):
+            raise ToolTimeoutError(f"{name} did not get a worker within {limits.timeout_seconds} seconds")
+        try:
+            timeout = None
+            if limits.timeout_seconds is not None:
+                timeout = max(0.0, limits.timeout_seconds - (time.monotonic() - start))
+            worker = self._checkout()
+            ident = threading.get_ident()
+            with self._lock:
+                self._active[ident] = worker
+            reusable = False
+            try:
+                worker.conn.send(message)
+                if not worker.conn.poll(timeout):
+                    raise ToolTimeoutError(f"{name} did not finish within {limits.timeout_seconds} seconds")
+                ok, value = worker.conn.recv()
+                reusable = True
+            except (EOFError, OSError):
+                if worker.cancelled:
+                    raise ToolCancelledError(f"{name} was cancelled")
+                raise ToolProcessError(f"{name} failed: its worker process {worker.exit_reason()}")
+            finally:
+                with self._lock:
+                    self._active.pop(ident, None)
+                    reusable = reusable and worker.alive()
+                    if reusable:
+                        self._idle.append(worker)
+                if not reusable:
+                    # Killing waits for the process; other callers must not queue behind it.
+                    worker.kill()
+        finally:
+            slots.release()
+        if not ok:
+            raise ToolProcessError(value)
+        return value
+
+    def cancel_thread(self, ident: int) -> bool:
+        """Kill the worker serving the isolated call that thread `ident` is waiting on, if any."""
+        with self._lock:
+            worker = self._active.get(ident)
+        if worker is None:
+            return False
+        worker.cancelled = True
+        worker.kill()
+        return True
+
+    def shutdown(self) -> None:
+        """Kill every worker, cancelling calls in progress."""
+        with self._lock:
+            workers = self._idle + list(self._active.values())
+            self._idle = []
+        for worker in workers:
+            worker.cancelled = True
+            worker.kill()
+
+_worker_pool = WorkerPool()
+
+def get_worker_pool() -> WorkerPool:
+    return _worker_pool
+
+def isolated(timeout_seconds: Optional[float] = 60.0, cpu_seconds: Optional[int] = None,
+             memory_mb: Optional[int] = None, max_output_chars: Optional[int] = None) -> Callable:
+    """
+    Run a function in the worker process pool instead of the calling thread.
+
+    The function must be defined at module level (tool modules included) and its
+    arguments and result must be picklable; closures such as the callables returned
+    by ToolInterface.register() should call an isolated helper instead. Errors come
+    back as ToolProcessError carrying the original message; a call that runs past
+    its limits raises ToolTimeoutError or ToolProcessError.
+    """
+    limits = ProcessLimits(timeout_seconds, cpu_seconds, memory_mb, max_output_chars)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            pool = get_worker_pool()
+            if _IN_WORKER or not pool.enabled:
+                return func(*args, **kwargs)
+            return pool.run(func, args, kwargs, limits)
+
+        setattr(wrapper, ISOLATED_ATTR, (func, limits))
+        return wrapper
+
+    return decorator
+
+def load_worker_pool(isolation_conf: dict) -> WorkerPool:
+    """Configure the shared WorkerPool from the tool_isolation config section."""
+    return get_worker_pool().configure(
+        enabled=isolation_conf.get("enabled", True),
+        max_workers=isolation_conf.get("max_workers", 2),
+        tool_limits=isolation_conf.get("tool_limits", {}),
+    )
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.tools.tool_flags import has_side_effects
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+CACHE_POLICY_ATTR = "__iris_cache_policy__"
+
+def normalize_text(value: str) -> str:
+    """Key normalizer for free-text arguments: case-folded, with surrounding and repeated whitespace removed."""
+    return " ".join(value.split()).casefold() if isinstance(value, str) else value
+
+def is_cacheable_result(result) -> bool:
+    """Default test for results worth keeping: not empty, not None and not an "Error..." message."""
+    if result is None or result == "":
+        return False
+    return not (isinstance(result, str) and result.startswith("Error"))
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How one tool's results are cached.
+
+    ttl_seconds: seconds a result stays valid; None keeps it forever.
+    key: called with the tool's arguments (by name, defaults applied); its JSON-serializable
+        return value identifies the call. By default string arguments go through normalize_text.
+    cache_if: called with a result; only results for which it returns True are stored.
+    """
+    ttl_seconds: Optional[float] = None
+    key: Optional[Callable[..., Any]] = None
+    cache_if: Callable[[Any], bool] = is_cacheable_result
+
+def cache_result(ttl_seconds: Optional[float] = None, key: Callable[..., Any] = None,
+                 cache_if: Callable[[Any], bool] = is_cacheable_result) -> Callable:
+    """
+    Declare that a tool's results may be reused for identical calls, e.g.
+    `@cache_result(ttl_seconds=600)` on a weather lookup or `@cache_result()` (forever) on
+    a transcript fetch. Like @side_effects this only marks the function; ToolManager wraps
+    marked tools with the shared ToolResultCache when it loads them. Usable on methods.
+    """
+    policy = CachePolicy(ttl_seconds, key, cache_if)
+
+    def decorator(func: Callable) -> Callable:
+        setattr(func, CACHE_POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+def cache_policy(func: Callable) -> Optional[CachePolicy]:
+    return getattr(func, CACHE_POLICY_ATTR, None)
+
+class ToolResultCache:
+    """
+    Results of cacheable tools, keyed by tool name and normalized arguments.
+
+    Lookups go to an in-memory LRU of `memory_entries` first, then to an SQLite table
+    that survives restarts and holds at most `max_entries` (least recently used are
+    dropped). Results that are not JSON-serializable stay in memory only. Tools marked
+    with @side_effects are never cached.
+    """
+    def __init__(self, db_file: str = "data/tool_cache.db", memory_entries: int = 256,
+                 max_entries: int = 5000, tool_ttls: Dict[str, float] = None):
+        """
+        Parameters:
+            db_file (str): SQLite file of the on-disk store.
+            memory_entries (int): Size of the in-memory LRU.
+            max_entries (int): Rows kept on disk.
+            tool_ttls (dict): TTL overrides by tool name; 0 disables caching for that tool.
+        """
+        self.db_file = db_file
+        self.memory_entries = max(0, memory_entries)
+        self.max_entries = max_entries
+        self.tool_ttls = tool_ttls or {}
+        self.hits = 0
+        self.misses = 0
+        # key -> (tool name, result, expires_at or None), most recently used last.
+        self._memory = OrderedDict()
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, tool TEXT NOT NULL, result TEXT NOT NULL,
+                expires_at REAL, last_access REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+        """)
+
+    def ttl_for(self, name: str, policy: CachePolicy) -> Optional[float]:
+        return self.tool_ttls.get(name, policy.ttl_seconds)
+
+    def make_key(self, name: str, policy: CachePolicy, signature: inspect.Signature, args: tuple, kwargs: dict,
+                 version: str = "") -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        if policy.key is not None:
+            identity = policy.key(**arguments)
+        else:
+            identity = {k: normalize_text(v) for k, v in arguments.items()}
+        payload = json.dumps({"tool": name, "version": version, "key": identity}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, name: str, result, expires_at: Optional[float]) -> None:
+        if not self.memory_entries:
+            return
+        self._memory[key] = (name, result, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, result) for a live entry, else (False, None)."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[2] is None or entry[2] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._memory[key]
+            row = self._conn.execute("SELECT tool, result, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            if row[2] is not None and row[2] <= now:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+                return False, None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            result = json.loads(row[1])
+            self._remember(key, row[0], result, row[2])
+            self.hits += 1
+            return True, result
+
+    def put(self, key: str, name: str, result, ttl_seconds: Optional[float]) -> None:
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        try:
+            encoded = json.dumps(result)
+        except (TypeError, ValueError):
+            encoded = None
+        with self._lock:
+            self._remember(key, name, result, expires_at)
+            if encoded is None:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, tool, result, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, name, encoded, expires_at, now),
+                )
+                self._conn.execute("DELETE FROM results WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+                if self.max_entries is not None:
+                    count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                    if count > self.max_entries:
+                        self._conn.execute(
+                            "DELETE FROM results WHERE key IN "
+                            "(SELECT key FROM results ORDER BY last_access LIMIT ?)",
+                            (count - self.max_entries,),
+                        )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def wrap(self, func: Callable, version: str = "") -> Callable:
+        """
+        Return `func` reading and filling the cache according to its @cache_result policy,
+        or `func` itself if it has none (or has side effects). The wrapper keeps the name,
+        docstring, signature and flags of `func`; coroutine tools stay coroutines.
+
+        `version` is part of every key, so results cached by one version of a tool (e.g. the
+        content hash of its module) are never returned by another.
+        """
+        policy = cache_policy(func)
+        if policy is None:
+            return func
+        name = func.__name__
+        if has_side_effects(func):
+            logger.warning(f"Tool {name} has side effects; ignoring its cache policy.")
+            return func
+        signature = inspect.signature(func)
+
+        def lookup(args, kwargs):
+            ttl = self.ttl_for(name, policy)
+            if ttl == 0:
+                return None, False, None
+            try:
+                key = self.make_key(name, policy, signature, args, kwargs, version)
+            except Exception as e:
+                logger.debug(f"Not caching call to {name}: {e}")
+                return None, False, None
+            hit, result = self.get(key)
+            if hit:
+                logger.debug(f"Tool cache hit for {name}")
+            return key, hit, result
+
+        def store(key, result):
+            if key is not None and policy.cache_if(result):
+                try:
+                    self.put(key, name, result, self.ttl_for(name, policy))
+                except Exception as e:
+                    logger.error(f"Error caching result of {name}: {e}")
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key, hit, result = lookup(args, kwargs)
+                if hit:
+                    return result
+                result = await func(*args, **kwargs)
+                store(key, result)
+                return result
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key, hit, result = lookup(args, kwargs)
+                if hit:
+                    return result
+                result = func(*args, **kwargs)
+                store(key, result)
+                return result
+        wrapper.__signature__ = signature
+        return wrapper
+
+    def wrap_all(self, tools: List[Callable], version: str = "") -> List[Callable]:
+        return [self.wrap(tool, version) for tool in tools]
+
+    def clear(self, name: str = None) -> None:
+        """Drop every entry, or only those of tool `name`."""
+        with self._lock:
+            if name is None:
+                self._memory.clear()
+                self._conn.execute("DELETE FROM results")
+                return
+            self._conn.execute("DELETE FROM results WHERE tool = ?", (name,))
+            for key in [key for key, entry in self._memory.items() if entry[0] == name]:
+                del self._memory[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def load_tool_cache(cache_conf: dict):
+    """Build the ToolResultCache described by the tool_cache config section, or None when disabled."""
+    if not cache_conf.get("enabled", True):
+        return None
+    return ToolResultCache(
+        db_file=cache_conf.get("db_file", "data/tool_cache.db"),
+        memory_entries=cache_conf.get("memory_entries", 256),
+        max_entries=cache_conf.get("max_entries", 5000),
+        tool_ttls=cache_conf.get("tool_ttls", {}),
+    )
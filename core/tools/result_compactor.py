@@ -0,0 +1,236 @@
+import re
+import math
+import inspect
+import functools
+from collections import Counter
+from typing import Callable, Dict, List
+from core.storage.search_index import tokenize
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+# Lines such as "--- Content from: https://... ---" or "=== Results for 'x' ===" that
+# delimit the sources inside one tool result. They are always kept.
+HEADER_RE = re.compile(r"^[ \t]*(-{3}|={3}).*(-{3}|={3})[ \t]*$|^Research (Data|results for).*$", re.MULTILINE)
+
+BOILERPLATE_RE = re.compile(
+    r"cookie|accept all|sign ?in|log ?in|sign up|subscribe|newsletter|all rights reserved|privacy policy|"
+    r"terms of (use|service)|skip to (main )?content|enable javascript|advertisement|share (this|on)|"
+    r"follow us|back to top|copyright|©",
+    re.IGNORECASE,
+)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+
+class ResultCompactor:
+    """
+    Shrinks long text results (or the long text fields of dict results) of the tools that
+    opt in (those with a budget in `tool_budgets`, such as web search, research, PDFs and
+    transcripts) before they reach the model. Results within their budget, and results of other tools, are returned
+    unchanged.
+
+    An oversized result is split into sources (at header lines) and passages (paragraphs, or groups
+    of sentences for pages flattened to one line). Short boilerplate passages (cookie
+    banners, sign-in prompts, copyright lines) and duplicate passages are dropped. If the
+    rest is still over the tool's token budget, passages are ranked by BM25 relevance to
+    the call's string arguments (the query) and the best are kept, in their original
+    order and on their own lines, with "[...]" marking cuts. Results without a usable
+    query keep their opening passages.
+    """
+    def __init__(self, tool_budgets: Dict[str, int] = None, min_chars: int = 1500, passage_chars: int = 400):
+        """
+        Parameters:
+            tool_budgets (dict): Token budgets by tool function name. Only these tools are compacted;
+                0 or None disables compaction for a tool.
+            min_chars (int): Results shorter than this are passed through untouched.
+            passage_chars (int): Target passage size when a paragraph has to be split into sentences.
+        """
+        self.tool_budgets = tool_budgets or {}
+        self.min_chars = min_chars
+        self.passage_chars = passage_chars
+
+    def budget_for(self, tool_name: str):
+        return self.tool_budgets.get(tool_name)
+
+    def _passages(self, block: str) -> List[str]:
+        passages = []
+        for paragraph in re.split(r"\n\s*\n|\n", block):
+            paragraph = re.sub(r"\s+", " ", paragraph).strip()
+            if not paragraph:
+                continue
+            if len(paragraph) <= self.passage_chars:
+                passages.append(paragraph)
+                continue
+            current = ""
+            for sentence in self._sentences(paragraph):
+                if self._is_boilerplate(sentence):
+                    continue
+                if current and len(current) + len(sentence) > self.passage_chars:
+                    passages.append(current)
+                    current = sentence
+                else:
+                    current = f"{current} {sentence}".strip()
+            if current:
+                passages.append(current)
+        return passages
+
+    def _sentences(self, paragraph: str) -> List[str]:
+        """Split at sentence ends; unpunctuated runs (e.g. transcripts) are cut at word boundaries."""
+        for sentence in SENTENCE_RE.split(paragraph):
+            while len(sentence) > self.passage_chars:
+                cut = sentence.rfind(" ", 0, self.passage_chars)
+                if cut <= 0:
+                    cut = self.passage_chars
+                yield sentence[:cut]
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                yield sentence
+
+    def _segments(self, text: str) -> List[tuple]:
+        """Return [(header or None, [passages])] in document order."""
+        segments = []
+        position = 0
+        header = None
+        for match in HEADER_RE.finditer(text):
+            segments.append((header, self._passages(text[position:match.start()])))
+            header = text[match.start():match.end()].strip()
+            position = match.end()
+        segments.append((header, self._passages(text[position:])))
+        return [(h, p) for h, p in segments if h or p]
+
+    @staticmethod
+    def _is_boilerplate(passage: str) -> bool:
+        return len(passage) < 200 and BOILERPLATE_RE.search(passage) is not None
+
+    def _clean(self, segments: List[tuple]) -> List[tuple]:
+        seen = set()
+        cleaned = []
+        for header, passages in segments:
+            kept = []
+            for passage in passages:
+                key = re.sub(r"\W+", " ", passage.lower()).strip()
+                if not key or key in seen or self._is_boilerplate(passage):
+                    continue
+                seen.add(key)
+                kept.append(passage)
+            cleaned.append((header, kept))
+        return cleaned
+
+    def _scores(self, passages: List[str], query_terms: List[str]) -> List[float]:
+        docs = [Counter(tokenize(p)) for p in passages]
+        avg_len = sum(sum(d.values()) for d in docs) / max(1, len(docs)) or 1.0
+        idf = {}
+        for term in set(query_terms):
+            df = sum(1 for d in docs if term in d)
+            if df:
+                idf[term] = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        scores = []
+        for doc in docs:
+            length = sum(doc.values())
+            score = 0.0
+            for term, weight in idf.items():
+                tf = doc.get(term, 0)
+                if tf:
+                    score += weight * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * length / avg_len))
+            scores.append(score)
+        return scores
+
+    @staticmethod
+    def _render(segments: List[tuple], keep) -> str:
+        out = []
+        index = 0
+        for header, passages in segments:
+            if header:
+                out.append(header)
+            pieces = []
+            gap = False
+            for passage in passages:
+                if keep(index):
+                    if gap and pieces:
+                        pieces.append("[...]")
+                    pieces.append(passage)
+                    gap = False
+                else:
+                    gap = True
+                index += 1
+            if gap:
+                pieces.append("[...]")
+            if pieces:
+                out.append("\n".join(pieces))
+        return "\n".join(out)
+
+    def compact(self, tool_name: str, query: str, result):
+        """
+        Return `result` compacted for `tool_name`. For dict results each string value is compacted
+        on its own. Other non-string results, results of tools without a budget and results within
+        the budget are returned unchanged.
+
+        Parameters:
+            tool_name (str): The tool's function name, used to pick its budget.
+            query (str): Text the result should stay relevant to (usually the call's arguments).
+            result: The tool's return value.
+        """
+        budget = self.budget_for(tool_name)
+        if isinstance(result, dict) and budget:
+            return {k: self.compact(tool_name, query, v) if isinstance(v, str) else v for k, v in result.items()}
+        if not isinstance(result, str) or not budget or len(result) < self.min_chars:
+            return result
+        max_chars = budget * 4
+        if len(result) <= max_chars:
+            return result
+        segments = self._clean(self._segments(result))
+        passages = [p for _, ps in segments for p in ps]
+        header_chars = sum(len(h) + 1 for h, _ in segments if h)
+        if sum(len(p) + 1 for p in passages) + header_chars <= max_chars:
+            compacted = self._render(segments, lambda i: True)
+        else:
+            query_terms = tokenize(query or "")
+            scores = self._scores(passages, query_terms) if query_terms else [0.0] * len(passages)
+            if not any(scores):
+                # Nothing to rank by: keep the opening passages.
+                scores = [-i for i in range(len(passages))]
+            chosen = set()
+            used = header_chars
+            for i in sorted(range(len(passages)), key=lambda i: (-scores[i], i)):
+                if used + len(passages[i]) + 7 > max_chars:
+                    continue
+                chosen.add(i)
+                used += len(passages[i]) + 7
+            compacted = self._render(segments, chosen.__contains__)
+        if len(compacted) < len(result):
+            logger.debug(f"Compacted {tool_name} result from {len(result)} to {len(compacted)} characters")
+        return compacted
+
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Return `func` with its results compacted. The wrapper keeps the name, docstring,
+        signature and flags (such as @side_effects) of `func`; coroutine tools stay coroutines.
+        """
+        signature = inspect.signature(func)
+
+        def query_of(args, kwargs) -> str:
+            try:
+                bound = signature.bind_partial(*args, **kwargs)
+            except TypeError:
+                return ""
+            values = []
+            for value in bound.arguments.values():
+                if isinstance(value, str):
+                    values.append(value)
+                elif isinstance(value, (list, tuple)):
+                    values.extend(v for v in value if isinstance(v, str))
+            return " ".join(values)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return self.compact(func.__name__, query_of(args, kwargs), await func(*args, **kwargs))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.compact(func.__name__, query_of(args, kwargs), func(*args, **kwargs))
+        wrapper.__signature__ = signature
+        return wrapper
+
+    def wrap_all(self, tools: List[Callable]) -> List[Callable]:
+        """Wrap the tools that have a budget; the others are returned as they are."""
+        return [self.wrap(tool) if self.budget_for(getattr(tool, "__name__", "")) else tool for tool in tools]
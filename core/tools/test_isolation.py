@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+import pytest
+from core.tools.isolation import ISOLATED_ATTR, ProcessLimits, ToolCancelledError, ToolTimeoutError, WorkerPool
+from tools.cli_command import MAX_OUTPUT_CHARS, run_shell_command
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX only")
+
+shell_command = getattr(run_shell_command, ISOLATED_ATTR)[0]
+
+def nap(seconds: float) -> str:
+    time.sleep(seconds)
+    return "rested"
+
+def process_gone(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] in ("Z", "X")
+    except FileNotFoundError:
+        return True
+
+def wait_gone(pid: int, seconds: float = 5.0) -> bool:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if process_gone(pid):
+            return True
+        time.sleep(0.05)
+    return False
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+def test_truncation_kills_the_whole_pipeline(pool):
+    output = pool.run(shell_command, ("sleep 60 & echo $!; yes",), {}, ProcessLimits(timeout_seconds=30))
+    assert len(output) > MAX_OUTPUT_CHARS
+    assert wait_gone(int(output.splitlines()[0]))
+
+def test_timeout_kills_commands_in_their_own_session(pool, tmp_path):
+    pid_file = tmp_path / "pid"
+    with pytest.raises(ToolTimeoutError):
+        pool.run(shell_command, (f"sleep 60 & echo $! > {pid_file}; wait",), {}, ProcessLimits(timeout_seconds=2))
+    assert wait_gone(int(pid_file.read_text()))
+
+def test_cancel_thread_kills_the_worker(pool):
+    errors = []
+
+    def call():
+        try:
+            pool.run(nap, (60,), {}, ProcessLimits(timeout_seconds=120))
+        except ToolCancelledError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not pool.cancel_thread(thread.ident):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    thread.join(10)
+    assert not thread.is_alive() and len(errors) == 1
+
+def test_queued_call_times_out_waiting_for_a_worker(pool):
+    busy = threading.Thread(target=pool.run, args=(nap, (3,), {}, ProcessLimits(timeout_seconds=30)))
+    busy.start()
+    time.sleep(0.2)
+    start = time.monotonic()
+    with pytest.raises(ToolTimeoutError, match="did not get a worker"):
+        pool.run(nap, (0,), {}, ProcessLimits(timeout_seconds=0.5))
+    assert time.monotonic() - start < 2
+    busy.join(30)
+    assert pool.run(nap, (0,), {}, ProcessLimits(timeout_seconds=30)) == "rested"
+
+def test_failed_command_keeps_its_output_and_exit_code(pool):
+    output = pool.run(shell_command, ("echo partial; echo oops >&2; exit 3",), {}, ProcessLimits(timeout_seconds=30))
+    assert output.startswith("partial\noops\n")
+    assert output.endswith("[command exited with code 3]")
@@ -0,0 +1,92 @@
+import time
+from core.tools.result_cache import ToolResultCache, cache_result
+from core.tools.tool_manager import ToolManager
+
+TOOL_MODULE = '''
+from core.tools.result_cache import cache_result
+from core.tools.tool_interface import ToolInterface
+
+class EchoTool(ToolInterface):
+    @property
+    def name(self):
+        return "EchoTool"
+
+    def register(self, context):
+        @cache_result()
+        def echo(text: str) -> str:
+            return "{prefix}" + text
+
+        return [echo]
+
+def register():
+    return EchoTool()
+'''
+
+def counting_tool(cache: ToolResultCache, ttl_seconds=None):
+    calls = []
+
+    @cache_result(ttl_seconds=ttl_seconds)
+    def lookup(query: str) -> str:
+        calls.append(query)
+        return f"answer {len(calls)}"
+
+    return cache.wrap(lookup), calls
+
+def test_arguments_are_normalized(tmp_path):
+    cache = ToolResultCache(db_file=str(tmp_path / "cache.db"))
+    lookup, calls = counting_tool(cache)
+    assert lookup("Paris  weather") == lookup(" paris weather") == "answer 1"
+    assert calls == ["Paris  weather"]
+    cache.close()
+
+def test_entries_expire_in_memory_and_on_disk(tmp_path):
+    cache = ToolResultCache(db_file=str(tmp_path / "cache.db"))
+    lookup, calls = counting_tool(cache, ttl_seconds=0.2)
+    assert lookup("q") == "answer 1"
+    assert lookup("q") == "answer 1"
+    time.sleep(0.3)
+    assert lookup("q") == "answer 2"
+    cache.close()
+
+    cache = ToolResultCache(db_file=str(tmp_path / "disk_only.db"), memory_entries=0)
+    lookup, calls = counting_tool(cache, ttl_seconds=0.2)
+    assert lookup("q") == "answer 1"
+    assert lookup("q") == "answer 1"
+    assert len(calls) == 1
+    time.sleep(0.3)
+    assert lookup("q") == "answer 2"
+    cache.close()
+
+def test_results_survive_restart_but_not_a_changed_version(tmp_path):
+    cache = ToolResultCache(db_file=str(tmp_path / "cache.db"))
+    lookup, _ = counting_tool(cache)
+    lookup("q")
+    cache.close()
+    cache = ToolResultCache(db_file=str(tmp_path / "cache.db"))
+    lookup, calls = counting_tool(cache)
+    assert lookup("q") == "answer 1" and calls == []
+
+    @cache_result()
+    def lookup(query: str) -> str:
+        return "new code"
+
+    assert cache.wrap(lookup, version="v2")("q") == "new code"
+    cache.close()
+
+def test_reloaded_module_does_not_serve_stale_results(tmp_path, monkeypatch):
+    monkeypatch.setattr("core.tools.tool_manager.ToolContext", lambda **kwargs: None)
+    tool_dir = tmp_path / "tools"
+    tool_dir.mkdir()
+    module = tool_dir / "echo.py"
+    module.write_text(TOOL_MODULE.replace("{prefix}", "old: "))
+    cache = ToolResultCache(db_file=str(tmp_path / "cache.db"))
+    manager = ToolManager(result_cache=cache)
+    manager.tool_dir = tool_dir
+    [echo] = manager.load_tools()
+    assert echo("hi") == "old: hi"
+
+    module.write_text(TOOL_MODULE.replace("{prefix}", "new: "))
+    assert manager.reload_changed()
+    [echo] = manager.tools
+    assert echo("hi") == "new: hi"
+    cache.close()
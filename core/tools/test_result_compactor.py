@@ -0,0 +1,55 @@
+from core.tools.result_compactor import ResultCompactor
+
+def listing(lines: int) -> str:
+    rows = [f"-rw-r--r-- 1 user user {i * 37:>6} Jan  1 12:00 file_{i:03d}.txt" for i in range(lines)]
+    rows.insert(10, "Login")
+    return "\n".join(rows)
+
+def test_tools_without_budget_are_not_wrapped_or_changed():
+    compactor = ResultCompactor(tool_budgets={"websearch": 100})
+
+    def execute_command_tool(command: str) -> str:
+        return listing(63)
+
+    assert compactor.wrap_all([execute_command_tool]) == [execute_command_tool]
+    text = listing(63)
+    assert compactor.compact("execute_command_tool", "ls -l", text) == text
+
+def test_result_within_budget_is_returned_unchanged():
+    compactor = ResultCompactor(tool_budgets={"websearch": 2000})
+    text = listing(63)
+    assert len(text) > compactor.min_chars
+    assert compactor.compact("websearch", "ls -l", text) is text
+
+def test_compaction_keeps_line_structure():
+    compactor = ResultCompactor(tool_budgets={"websearch": 100})
+    paragraphs = [f"Paragraph {i} about {'rockets' if i % 5 == 0 else 'gardening'} " + "filler words " * 10
+                  for i in range(40)]
+    text = "--- Content from: https://example.com ---\n" + "\n".join(paragraphs)
+    compacted = compactor.compact("websearch", "rockets", text)
+    lines = compacted.splitlines()
+    assert lines[0] == "--- Content from: https://example.com ---"
+    assert len(lines) > 3
+    assert len(compacted) <= 100 * 4 + 50
+    assert all("rockets" in line for line in lines[1:] if line != "[...]")
+
+def test_boilerplate_and_duplicates_removed_only_when_over_budget():
+    compactor = ResultCompactor(tool_budgets={"websearch": 150}, min_chars=10)
+    body = "\n".join(f"Useful fact number {i} " + "detail " * 12 for i in range(20))
+    text = "Accept all cookies\n" + body + "\n" + body.splitlines()[0]
+    compacted = compactor.compact("websearch", "fact", text)
+    assert "cookies" not in compacted
+    assert compacted.count("Useful fact number 0 ") <= 1
+    short = "Accept all cookies\nUseful fact"
+    assert compactor.compact("websearch", "fact", short) == short
+
+def test_dict_results_have_their_text_fields_compacted():
+    compactor = ResultCompactor(tool_budgets={"fetch_transcript": 300})
+    # Auto-generated transcripts have no punctuation to split sentences at.
+    words = [f"{'rocket' if i % 50 == 0 else 'garden'} word{i}" for i in range(1000)]
+    result = {"transcript": " ".join(words), "snippet_count": 1000, "last_snippet": {"text": "bye"}}
+    compacted = compactor.compact("fetch_transcript", "rocket", result)
+    assert compacted["snippet_count"] == 1000
+    assert compacted["last_snippet"] == {"text": "bye"}
+    assert 0 < len(compacted["transcript"]) <= 300 * 4 + 50
+    assert "rocket" in compacted["transcript"]
@@ -0,0 +1,102 @@
+import time
+import asyncio
+import threading
+from google.genai import types
+from core.tools.tool_executor import ToolExecutor
+from core.tools.tool_flags import side_effects
+
+def call(name: str, **args) -> types.FunctionCall:
+    return types.FunctionCall(id=f"{name}-{time.monotonic_ns()}", name=name, args=args)
+
+def responses(parts) -> list:
+    return [part.function_response.response for part in parts]
+
+def make_tools(log: list):
+    def slow_read(seconds: float) -> str:
+        time.sleep(seconds)
+        return f"read {seconds}"
+
+    @side_effects
+    def write(label: str, seconds: float = 0.0) -> str:
+        time.sleep(seconds)
+        log.append(label)
+        return f"wrote {label}"
+
+    def repeat(text: str, times: int) -> str:
+        return text * times
+
+    async def async_read(seconds: float) -> str:
+        await asyncio.sleep(seconds)
+        return f"async {seconds}"
+
+    return [slow_read, write, repeat, async_read]
+
+def test_independent_calls_run_in_parallel():
+    executor = ToolExecutor(make_tools([]), max_workers=4)
+    start = time.monotonic()
+    results = responses(executor.execute([call("slow_read", seconds=0.3) for _ in range(3)]))
+    assert time.monotonic() - start < 0.6
+    assert results == [{"result": "read 0.3"}] * 3
+    executor.shutdown()
+
+def test_side_effect_calls_keep_model_order():
+    log = []
+    executor = ToolExecutor(make_tools(log), max_workers=4)
+    calls = [call("write", label="a", seconds=0.2), call("slow_read", seconds=0.1),
+             call("write", label="b", seconds=0.0), call("write", label="c", seconds=0.1)]
+    results = responses(executor.execute(calls))
+    assert log == ["a", "b", "c"]
+    assert [r["result"] for r in results] == ["wrote a", "read 0.1", "wrote b", "wrote c"]
+    executor.shutdown()
+
+def test_timed_out_side_effect_call_skips_the_rest_of_the_chain():
+    log = []
+    executor = ToolExecutor(make_tools(log), max_workers=4, tool_timeouts={"write": 0.2})
+    calls = [call("write", label="stuck", seconds=1.0), call("write", label="never"), call("slow_read", seconds=0)]
+    results = responses(executor.execute(calls))
+    assert "timed out" in results[0]["error"]
+    assert results[1]["error"].startswith("Skipped")
+    assert results[2] == {"result": "read 0"}
+    time.sleep(1.0)
+    assert log == ["stuck"]
+    executor.shutdown()
+
+def test_parallel_timeouts_are_per_call():
+    executor = ToolExecutor(make_tools([]), max_workers=4, timeout_seconds=0.3)
+    start = time.monotonic()
+    results = responses(executor.execute([call("slow_read", seconds=1.0), call("slow_read", seconds=0.1)]))
+    assert time.monotonic() - start < 0.8
+    assert "timed out" in results[0]["error"]
+    assert results[1] == {"result": "read 0.1"}
+    executor.shutdown()
+
+def test_unknown_tools_errors_and_argument_conversion():
+    executor = ToolExecutor(make_tools([]), max_workers=2)
+    results = responses(executor.execute([call("missing"), call("repeat", text="ab", times=2.0, extra=1)]))
+    assert results == [{"error": "Unknown tool missing"}, {"result": "abab"}]
+    executor.shutdown()
+
+def test_execute_async_orders_side_effects_and_awaits_coroutines():
+    log = []
+    executor = ToolExecutor(make_tools(log), max_workers=4, tool_timeouts={"async_read": 0.2})
+    calls = [call("write", label="a", seconds=0.1), call("async_read", seconds=0.05),
+             call("async_read", seconds=1.0), call("write", label="b")]
+    results = responses(asyncio.run(executor.execute_async(calls)))
+    assert log == ["a", "b"]
+    assert results[1] == {"result": "async 0.05"}
+    assert "timed out" in results[2]["error"]
+    executor.shutdown()
+
+def test_bound_copies_share_the_pool_but_not_tools_or_status():
+    statuses = []
+    executor = ToolExecutor(make_tools([]), max_workers=2)
+
+    def session_tool() -> str:
+        return threading.current_thread().name
+
+    bound = executor.bind([session_tool], on_status=statuses.append)
+    assert bound.pool is executor.pool
+    assert responses(bound.execute([call("session_tool")]))[0]["result"].startswith("iris-tool")
+    assert statuses == [["session_tool"], None]
+    assert "session_tool" not in executor.tools
+    executor.shutdown()
@@ -0,0 +1,46 @@
+import time
+from core.tools.tool_manager import ToolManager
+
+TOOL_MODULE = '''
+import time
+from core.tools.tool_interface import ToolInterface
+
+time.sleep({delay})
+
+class SlowTool(ToolInterface):
+    @property
+    def name(self):
+        return "{name}"
+
+    def register(self, context):
+        def {name}() -> str:
+            return "{name}"
+
+        return [{name}]
+
+def register():
+    return SlowTool()
+'''
+
+def make_manager(tmp_path, monkeypatch, delays: dict, **kwargs) -> ToolManager:
+    monkeypatch.setattr("core.tools.tool_manager.ToolContext", lambda **kwargs: None)
+    tool_dir = tmp_path / "tools"
+    tool_dir.mkdir()
+    for name, delay in delays.items():
+        (tool_dir / f"{name}.py").write_text(TOOL_MODULE.format(name=name, delay=delay))
+    manager = ToolManager(parallel=True, **kwargs)
+    manager.tool_dir = tool_dir
+    return manager
+
+def test_timeout_runs_from_when_a_module_starts_loading(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path, monkeypatch, {"first": 0.6, "second": 0.6}, max_workers=1, module_timeout=1.0)
+    tools = manager.load_tools()
+    assert [tool.__name__ for tool in tools] == ["first", "second"]
+
+def test_slow_module_is_skipped_without_holding_up_the_rest(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path, monkeypatch, {"a_fast": 0, "b_stuck": 3, "c_fast": 0},
+                           max_workers=2, module_timeout=0.5)
+    start = time.monotonic()
+    tools = manager.load_tools()
+    assert time.monotonic() - start < 2
+    assert [tool.__name__ for tool in tools] == ["a_fast", "c_fast"]
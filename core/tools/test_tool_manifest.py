@@ -0,0 +1,31 @@
+import inspect
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pytest
+from core.tools.tool_manifest import ToolManifest, _annotation, describe, signature_of
+
+def lookup_tool(query: str, limit: Optional[int] = None, tags: List[str] = None, extra: Dict[str, Any] = None,
+                ratio: float | None = None) -> str:
+    return query
+
+def test_annotations_round_trip_through_the_manifest():
+    spec = describe(lookup_tool)
+    assert signature_of(spec) == inspect.signature(lookup_tool)
+
+@pytest.mark.parametrize("text", [
+    "__import__('os').system('true')",
+    "().__class__.__base__.__subclasses__()",
+    "open",
+    "List[str].__args__",
+    "exit()",
+])
+def test_code_in_annotations_is_rejected(text):
+    with pytest.raises(ValueError):
+        _annotation(text)
+
+def test_lookup_ignores_records_with_bad_annotations(tmp_path):
+    manifest = ToolManifest(str(tmp_path / "manifest.json"))
+    spec = describe(lookup_tool)
+    spec["returns"] = "__import__('os').getcwd()"
+    manifest.modules["mod.py"] = {"sha256": "abc", "tool": "Mod", "functions": [spec]}
+    assert manifest.lookup(Path("tools/mod.py"), "abc") is None
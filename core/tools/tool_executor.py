@@ -0,0 +1,203 @@
+import copy
+import time
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List
+from google.genai import types
+from core.tools.isolation import get_worker_pool
+from core.tools.tool_flags import has_side_effects
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+def _convert_args(func: Callable, args: dict) -> dict:
+    """Keep only parameters `func` accepts and turn integral floats into ints where an int is expected."""
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return dict(args)
+    accepts_kwargs = any(p.kind == p.VAR_KEYWORD for p in params.values())
+    converted = {}
+    for name, value in args.items():
+        param = params.get(name)
+        if param is None and not accepts_kwargs:
+            continue
+        if param is not None and param.annotation is int and isinstance(value, float) and value.is_integer():
+            value = int(value)
+        converted[name] = value
+    return converted
+
+class ToolExecutor:
+    """
+    Runs the function calls of one model turn.
+
+    Calls to tools without side effects start at once on a bounded thread pool, so a
+    turn takes as long as its slowest tool rather than the sum. Calls to tools marked
+    with @side_effects run one after another in the order the model issued them; if one
+    does not finish in time the rest of that chain is skipped rather than reordered.
+    Every call has a timeout (per tool, or the default). A timed-out thread cannot be
+    killed and keeps its pool slot until it returns, unless the tool runs in an isolated
+    worker process (see core.tools.isolation): that worker is killed on timeout.
+    """
+    def __init__(self, tools: List[Callable], max_workers: int = 8, timeout_seconds: float = 60.0,
+                 tool_timeouts: Dict[str, float] = None, max_rounds: int = 10, on_status: Callable = None):
+        """
+        Parameters:
+            tools (list): The tool callables the model may call.
+            max_workers (int): Size of the thread pool shared by all turns.
+            timeout_seconds (float): Default per-call timeout.
+            tool_timeouts (dict): Per-tool timeouts by function name.
+            max_rounds (int): Function-calling rounds allowed per user message.
+            on_status (Callable): Called with the list of tool names about to run, and with None when done.
+        """
+        self.tools = {getattr(tool, "__name__", ""): tool for tool in tools}
+        self.timeout_seconds = timeout_seconds
+        self.tool_timeouts = tool_timeouts or {}
+        self.max_rounds = max_rounds
+        self.on_status = on_status
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="iris-tool")
+        # Thread running each call in progress, by id(call), so a timed-out isolated call can be cancelled.
+        self._threads = {}
+
+    def bind(self, tools: List[Callable], on_status: Callable = None) -> "ToolExecutor":
+        """
+        A ToolExecutor for one conversation's `tools` and status callback that shares this
+        one's thread pool and settings. Shut down the original, not the bound copies.
+        """
+        bound = copy.copy(self)
+        bound.set_tools(tools)
+        bound.on_status = on_status
+        return bound
+
+    def set_tools(self, tools: List[Callable]) -> None:
+        """Dispatch later calls to `tools`; calls already running keep their callable."""
+        self.tools = {getattr(tool, "__name__", ""): tool for tool in tools}
+
+    def timeout_for(self, name: str) -> float:
+        return self.tool_timeouts.get(name, self.timeout_seconds)
+
+    def _invoke(self, call: types.FunctionCall) -> dict:
+        func = self.tools.get(call.name)
+        if func is None:
+            return {"error": f"Unknown tool {call.name}"}
+        self._threads[id(call)] = threading.get_ident()
+        try:
+            return {"result": func(**_convert_args(func, call.args or {}))}
+        except Exception as e:
+            logger.error(f"Tool {call.name} failed: {e}")
+            return {"error": str(e)}
+        finally:
+            self._threads.pop(id(call), None)
+
+    def _timeout_error(self, call: types.FunctionCall) -> dict:
+        ident = self._threads.get(id(call))
+        if ident is not None:
+            get_worker_pool().cancel_thread(ident)
+        logger.warning(f"Tool {call.name} timed out after {self.timeout_for(call.name)}s")
+        return {"error": f"{call.name} timed out after {self.timeout_for(call.name)} seconds"}
+
+    def _is_ordered(self, call: types.FunctionCall) -> bool:
+        return has_side_effects(self.tools.get(call.name))
+
+    def _parts(self, calls: List[types.FunctionCall], results: List[dict]) -> List[types.Part]:
+        return [
+            types.Part(function_response=types.FunctionResponse(id=call.id, name=call.name, response=result))
+            for call, result in zip(calls, results)
+        ]
+
+    def abandon(self, calls: List[types.FunctionCall]) -> List[types.Part]:
+        """
+        Function response parts answering `calls` with an error instead of running them,
+        for when the model is still calling tools after `max_rounds` rounds.
+        """
+        error = {"error": f"Not run: the limit of {self.max_rounds} tool-calling rounds for this message was reached."}
+        return self._parts(calls, [error] * len(calls))
+
+    def execute(self, calls: List[types.FunctionCall]) -> List[types.Part]:
+        """
+        Run one turn's function calls and return their function response parts, in call order.
+        """
+        if self.on_status:
+            self.on_status([call.name for call in calls])
+        start = time.monotonic()
+        results = [None] * len(calls)
+        futures = {
+            i: self.pool.submit(self._invoke, call)
+            for i, call in enumerate(calls) if not self._is_ordered(call)
+        }
+        blocked = None
+        for i, call in enumerate(calls):
+            if not self._is_ordered(call):
+                continue
+            if blocked is not None:
+                results[i] = {"error": f"Skipped: the earlier call to {blocked} did not finish"}
+                continue
+            future = self.pool.submit(self._invoke, call)
+            try:
+                results[i] = future.result(timeout=self.timeout_for(call.name))
+            except FutureTimeout:
+                results[i] = self._timeout_error(call)
+                blocked = call.name
+        for i, future in futures.items():
+            remaining = start + self.timeout_for(calls[i].name) - time.monotonic()
+            try:
+                results[i] = future.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                results[i] = self._timeout_error(calls[i])
+        if self.on_status:
+            self.on_status(None)
+        return self._parts(calls, results)
+
+    async def _invoke_async(self, call: types.FunctionCall) -> dict:
+        func = self.tools.get(call.name)
+        if func is None or not inspect.iscoroutinefunction(func):
+            return await asyncio.get_running_loop().run_in_executor(self.pool, self._invoke, call)
+        try:
+            return {"result": await func(**_convert_args(func, call.args or {}))}
+        except Exception as e:
+            logger.error(f"Tool {call.name} failed: {e}")
+            return {"error": str(e)}
+
+    async def _invoke_with_timeout(self, call: types.FunctionCall) -> dict:
+        try:
+            return await asyncio.wait_for(self._invoke_async(call), self.timeout_for(call.name))
+        except asyncio.TimeoutError:
+            return self._timeout_error(call)
+
+    async def _run_ordered(self, calls: List[types.FunctionCall]) -> List[dict]:
+        results = []
+        blocked = None
+        for call in calls:
+            if blocked is not None:
+                results.append({"error": f"Skipped: the earlier call to {blocked} did not finish"})
+                continue
+            try:
+                results.append(await asyncio.wait_for(self._invoke_async(call), self.timeout_for(call.name)))
+            except asyncio.TimeoutError:
+                results.append(self._timeout_error(call))
+                blocked = call.name
+        return results
+
+    async def execute_async(self, calls: List[types.FunctionCall]) -> List[types.Part]:
+        """Async counterpart of `execute` for AsyncIRISAgent; coroutine tools are awaited on the loop."""
+        if self.on_status:
+            self.on_status([call.name for call in calls])
+        ordered = [i for i, call in enumerate(calls) if self._is_ordered(call)]
+        parallel = [i for i in range(len(calls)) if i not in ordered]
+        ordered_results, *parallel_results = await asyncio.gather(
+            self._run_ordered([calls[i] for i in ordered]),
+            *(self._invoke_with_timeout(calls[i]) for i in parallel),
+        )
+        results = [None] * len(calls)
+        for i, result in zip(ordered, ordered_results):
+            results[i] = result
+        for i, result in zip(parallel, parallel_results):
+            results[i] = result
+        if self.on_status:
+            self.on_status(None)
+        return self._parts(calls, results)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
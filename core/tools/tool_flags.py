@@ -0,0 +1,21 @@
+from typing import Callable, Iterable, Set
+
+SIDE_EFFECTS_ATTR = "__iris_side_effects__"
+
+def side_effects(func: Callable) -> Callable:
+    """
+    Mark a tool as changing state outside the conversation (running commands, opening
+    files, writing reminders or memory). Such calls must never be skipped or replayed
+    from a cache.
+
+    Usable on plain functions and on methods; bound methods expose the flag of their function.
+    """
+    setattr(func, SIDE_EFFECTS_ATTR, True)
+    return func
+
+def has_side_effects(func: Callable) -> bool:
+    return bool(getattr(func, SIDE_EFFECTS_ATTR, False))
+
+def side_effect_tool_names(tools: Iterable[Callable]) -> Set[str]:
+    """Names of the tools in `tools` that are marked with @side_effects."""
+    return {getattr(tool, "__name__", "") for tool in tools if has_side_effects(tool)}
@@ -1,55 +1,234 @@
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import importlib.util
+import threading
+import functools
+import time
 import sys
 from core.tools.tool_interface import ToolInterface
 from core.tools.tool_context import ToolContext
+from core.tools.tool_manifest import ToolManifest, file_hash, make_lazy_tool
 from core.utils.logger import get_logger
+from core.utils.profiler import get_profiler
 
 logger = get_logger()
 
 class ToolManager:
-    def __init__(self):
+    def __init__(self, lazy: bool = False, manifest_path: str = "data/tool_manifest.json",
+                 parallel: bool = False, max_workers: int = 8, module_timeout: float = 30.0, result_cache=None):
+        """
+        Parameters:
+            lazy (bool): Declare tools from the manifest and import their module on first call.
+                Modules that are new, changed or cannot be described are imported at once.
+            manifest_path (str): Where the tool manifest is cached.
+            parallel (bool): Import the modules loaded at startup concurrently on a thread pool.
+                Tools are still returned in file name order.
+            max_workers (int): Threads used for parallel loading.
+            module_timeout (float): Seconds a module may take to import and register when loading
+                in parallel; slower modules are skipped (their thread is left to finish in the background).
+            result_cache (ToolResultCache): Wraps tools declared with @cache_result; None disables caching.
+        """
         self.tools = []
         self.tool_dir = Path("tools")
+        self.lazy = lazy
+        self.manifest_path = manifest_path
+        self.parallel = parallel
+        self.max_workers = max(1, max_workers)
+        self.module_timeout = module_timeout
+        self.result_cache = result_cache
+        self.context = None
+        self._manifest = None
+        # (content hash, tools) of every module in tools/, by file path, as currently loaded.
+        self._modules = {}
+        # Real callables of lazily declared modules, by file path, once imported.
+        self._resolved = {}
+        self._resolve_lock = threading.Lock()
+        self._loaded = False
+
+    def _load_module(self, tool_file: Path, parent: str = None):
+        """Import one tool module and register it. Returns (tool name, callables) or None on failure."""
+        with get_profiler().phase(f"tool:{tool_file.name}", parent=parent):
+            return self._import_and_register(tool_file)
+
+    def _import_and_register(self, tool_file: Path):
+        # Hashed before the import, so cached results are keyed by the code that produced them.
+        version = file_hash(tool_file) if self.result_cache is not None else ""
+        spec = importlib.util.spec_from_file_location(tool_file.stem, str(tool_file))
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as inner_e:
+            logger.error(f"Error executing module {tool_file.name}: {inner_e}")
+            return None
+        if not hasattr(module, "register"):
+            logger.error(f"No register() function found in {tool_file.name}")
+            return None
+        tool_instance = module.register()
+        if not isinstance(tool_instance, ToolInterface):
+            logger.error(f"Tool {tool_file.name} does not implement ToolInterface.")
+            return None
+        try:
+            tool_tools = tool_instance.register(self.context)
+        except Exception as reg_e:
+            logger.error(f"Failed to register tool from {tool_file.name}: {reg_e}")
+            return None
+        if self.result_cache is not None:
+            tool_tools = self.result_cache.wrap_all(tool_tools, version=version)
+        logger.success(f"Successfully loaded tool: {tool_instance.name}")
+        return tool_instance.name, tool_tools
+
+    def _resolve(self, tool_file: Path, name: str):
+        """Return the real callable behind a lazily declared tool, importing its module on first use."""
+        with self._resolve_lock:
+            functions = self._resolved.get(tool_file)
+            if functions is None:
+                loaded = self._load_module(tool_file)
+                if loaded is None:
+                    raise RuntimeError(f"Tool module {tool_file.name} failed to load")
+                functions = {getattr(tool, "__name__", ""): tool for tool in loaded[1]}
+                self._resolved[tool_file] = functions
+        if name not in functions:
+            raise RuntimeError(f"Tool {name} is no longer provided by {tool_file.name}")
+        return functions[name]
+
+    def _load_parallel(self, tool_files: list) -> list:
+        """Load `tool_files` on a thread pool; return their results in the same order (None if failed or too slow)."""
+        started = {}
+        # Set when a worker picks the module up; a module's timeout runs from then, not from when it was queued.
+        picked_up = {tool_file: threading.Event() for tool_file in tool_files}
+
+        def load(tool_file):
+            started[tool_file] = time.monotonic()
+            picked_up[tool_file].set()
+            return self._load_module(tool_file, parent="tools")
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(tool_files)), thread_name_prefix="iris-tool-loader")
+        futures = [pool.submit(load, tool_file) for tool_file in tool_files]
+        results = []
+        for position, (tool_file, future) in enumerate(zip(tool_files, futures)):
+            try:
+                # Modules ahead of it take at most module_timeout each unless a worker is stuck for good.
+                if not picked_up[tool_file].wait(self.module_timeout * (position + 1)):
+                    raise FutureTimeout()
+                remaining = started[tool_file] + self.module_timeout - time.monotonic()
+                results.append(future.result(timeout=max(0.0, remaining)))
+            except FutureTimeout:
+                logger.error(f"Tool module {tool_file.name} did not load within {self.module_timeout}s; skipping it.")
+                results.append(None)
+            except Exception as e:
+                logger.error(f"Error loading tool module {tool_file.name}: {e}")
+                results.append(None)
+        pool.shutdown(wait=False, cancel_futures=True)
+        return results
 
     def load_tools(self) -> list:
-        context = ToolContext(logger=get_logger(), config=None, ui=None)
+        self.context = ToolContext(logger=get_logger(), config=None, ui=None)
         if not self.tool_dir.exists():
             logger.error("Tool directory does not exist.")
             return self.tools
 
-        for tool_file in self.tool_dir.glob("*.py"):
-            if tool_file.name == "__init__.py":
-                continue
-            spec = importlib.util.spec_from_file_location(tool_file.stem, str(tool_file))
-            module = importlib.util.module_from_spec(spec)
-            try:
-                spec.loader.exec_module(module)
-            except Exception as inner_e:
-                logger.error(f"Error executing module {tool_file.name}: {inner_e}")
-                continue
-            if hasattr(module, "register"):
-                tool_instance = module.register()
-                if isinstance(tool_instance, ToolInterface):
-                    try:
-                        tool_tools = tool_instance.register(context)
-                        self.tools.extend(tool_tools)
-                        logger.success(f"Successfully loaded tool: {tool_instance.name}")
-                    except Exception as reg_e:
-                        logger.error(f"Failed to register tool from {tool_file.name}: {reg_e}")
-                else:
-                    logger.error(f"Tool {tool_file.name} does not implement ToolInterface.")
+        self._loaded = True
+        manifest = self._manifest = ToolManifest(self.manifest_path) if self.lazy else None
+        tool_files = self._tool_files()
+        digests = {f: file_hash(f) for f in tool_files}
+        entries = {f: manifest.lookup(f, digests[f]) for f in tool_files} if manifest else {}
+        to_load = [f for f in tool_files if entries.get(f) is None]
+        if self.parallel and len(to_load) > 1:
+            loaded = dict(zip(to_load, self._load_parallel(to_load)))
+        else:
+            loaded = {f: self._load_module(f) for f in to_load}
+
+        for tool_file in tool_files:
+            entry = entries.get(tool_file)
+            if entry is not None:
+                tools = [
+                    make_lazy_tool(spec, functools.partial(self._resolve, tool_file, spec["name"]))
+                    for spec in entry["functions"]
+                ]
+                logger.success(f"Declared tool (loads on first use): {entry['tool']}")
+            elif loaded[tool_file] is None:
+                tools = []
             else:
-                logger.error(f"No register() function found in {tool_file.name}")
+                tool_name, tools = loaded[tool_file]
+                if manifest:
+                    manifest.record(tool_file, digests[tool_file], tool_name, tools)
+            self._modules[tool_file] = (digests[tool_file], tools)
+            self.tools.extend(tools)
+        if manifest:
+            manifest.prune(f.name for f in tool_files)
+            manifest.save()
         return self.tools
 
+    def _tool_files(self) -> list:
+        return sorted(f for f in self.tool_dir.glob("*.py") if f.name != "__init__.py")
+
+    def reload_changed(self) -> bool:
+        """
+        Re-import only the tool modules whose content changed since they were loaded, load new
+        modules and drop deleted ones. A module that fails to load keeps its previous tools.
+        `self.tools` is updated in place.
+
+        Returns:
+            bool: True if the tool list changed.
+        """
+        if not self._loaded or not self.tool_dir.exists():
+            return False
+        tool_files = self._tool_files()
+        changed = False
+        for tool_file in set(self._modules) - set(tool_files):
+            del self._modules[tool_file]
+            with self._resolve_lock:
+                self._resolved.pop(tool_file, None)
+            logger.success(f"Tool module {tool_file.name} removed.")
+            changed = True
+        for tool_file in tool_files:
+            try:
+                digest = file_hash(tool_file)
+            except OSError:
+                continue
+            known = self._modules.get(tool_file)
+            if known is not None and known[0] == digest:
+                continue
+            loaded = self._load_module(tool_file)
+            if loaded is None:
+                # Keep serving the previous version until the module loads again.
+                self._modules[tool_file] = (digest, known[1] if known else [])
+                continue
+            tool_name, tools = loaded
+            with self._resolve_lock:
+                self._resolved.pop(tool_file, None)
+            self._modules[tool_file] = (digest, tools)
+            if self._manifest is not None:
+                self._manifest.record(tool_file, digest, tool_name, tools)
+            logger.success(f"Reloaded tool module {tool_file.name}")
+            changed = True
+        if changed:
+            self.tools[:] = [tool for f in sorted(self._modules) for tool in self._modules[f][1]]
+            if self._manifest is not None:
+                self._manifest.prune(f.name for f in tool_files)
+                self._manifest.save()
+        return changed
+
     def reload_tools(self) -> list:
         self.tools.clear()
+        self._resolved.clear()
+        self._modules.clear()
         for tool_file in self.tool_dir.glob("*.py"):
-            if tool_file.name == "__init__":
+            if tool_file.name == "__init__.py":
                 continue
             module_name = tool_file.stem
             if module_name in sys.modules:
                 del sys.modules[module_name]
         logger.success("Reloading tools...")
-        return self.load_tools() 
\ No newline at end of file
+        return self.load_tools()
+
+def load_tool_manager(loading_conf: dict, result_cache=None) -> ToolManager:
+    """Build the ToolManager described by the tool_loading config section."""
+    return ToolManager(
+        lazy=loading_conf.get("lazy", True),
+        manifest_path=loading_conf.get("manifest", "data/tool_manifest.json"),
+        parallel=loading_conf.get("parallel", True),
+        max_workers=loading_conf.get("max_workers", 8),
+        module_timeout=loading_conf.get("module_timeout_seconds", 30),
+        result_cache=result_cache,
+    )
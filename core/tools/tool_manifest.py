@@ -0,0 +1,169 @@
+import ast
+import json
+import typing
+import hashlib
+import inspect
+from pathlib import Path
+from typing import Callable, List, Optional
+from core.storage.writer import atomic_write_text
+from core.tools.tool_flags import has_side_effects, side_effects
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+MANIFEST_VERSION = 1
+
+# Names annotations in the manifest may use; anything else makes a module load eagerly.
+ANNOTATION_NAMES = {name: getattr(typing, name) for name in ("Any", "Dict", "List", "Optional", "Tuple", "Union")}
+ANNOTATION_NAMES.update({t.__name__: t for t in (str, int, float, bool, list, dict, tuple, type(None))})
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def _annotation_text(annotation) -> str:
+    if isinstance(annotation, str):
+        return annotation
+    if isinstance(annotation, type) and annotation.__module__ == "builtins":
+        return annotation.__name__
+    return repr(annotation).replace("typing.", "")
+
+def _resolve_annotation(node: ast.AST):
+    if isinstance(node, ast.Name) and node.id in ANNOTATION_NAMES:
+        return ANNOTATION_NAMES[node.id]
+    if isinstance(node, ast.Constant) and node.value is None:
+        return type(None)
+    if isinstance(node, ast.Subscript):
+        origin = _resolve_annotation(node.value)
+        if isinstance(node.slice, ast.Tuple):
+            return origin[tuple(_resolve_annotation(item) for item in node.slice.elts)]
+        return origin[_resolve_annotation(node.slice)]
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _resolve_annotation(node.left) | _resolve_annotation(node.right)
+    raise ValueError(f"unsupported annotation {ast.unparse(node)!r}")
+
+def _annotation(text: str):
+    """Rebuild an annotation from its manifest text. Only names in ANNOTATION_NAMES, subscripts and | are accepted."""
+    return _resolve_annotation(ast.parse(text, mode="eval").body)
+
+def describe(func: Callable) -> dict:
+    """
+    Record a tool's name, docstring, signature and flags as JSON-compatible data.
+    Raises ValueError if the signature cannot be rebuilt from the record.
+    """
+    signature = inspect.signature(func)
+    parameters = []
+    for param in signature.parameters.values():
+        entry = {"name": param.name, "kind": param.kind.name}
+        if param.annotation is not param.empty:
+            entry["annotation"] = _annotation_text(param.annotation)
+        if param.default is not param.empty:
+            try:
+                json.dumps(param.default)
+            except TypeError:
+                raise ValueError(f"default of {param.name} is not JSON serializable")
+            entry["default"] = param.default
+        parameters.append(entry)
+    spec = {"name": func.__name__, "doc": func.__doc__, "parameters": parameters,
+            "side_effects": has_side_effects(func)}
+    if signature.return_annotation is not signature.empty:
+        spec["returns"] = _annotation_text(signature.return_annotation)
+    try:
+        signature_of(spec)
+    except Exception as e:
+        raise ValueError(f"signature of {func.__name__} cannot be recorded: {e}")
+    return spec
+
+def signature_of(spec: dict) -> inspect.Signature:
+    parameters = [
+        inspect.Parameter(
+            p["name"], getattr(inspect.Parameter, p["kind"]),
+            default=p.get("default", inspect.Parameter.empty),
+            annotation=_annotation(p["annotation"]) if "annotation" in p else inspect.Parameter.empty,
+        )
+        for p in spec["parameters"]
+    ]
+    returns = _annotation(spec["returns"]) if "returns" in spec else inspect.Signature.empty
+    return inspect.Signature(parameters, return_annotation=returns)
+
+def make_lazy_tool(spec: dict, resolve: Callable[[], Callable]) -> Callable:
+    """
+    Build a stand-in for a tool from its manifest record. It has the tool's name,
+    docstring, signature and flags, so declarations can be generated from it, and calls
+    `resolve()` (which imports the real module) on first use.
+    """
+    def tool(*args, **kwargs):
+        return resolve()(*args, **kwargs)
+
+    tool.__name__ = tool.__qualname__ = spec["name"]
+    tool.__doc__ = spec.get("doc")
+    tool.__signature__ = signature_of(spec)
+    tool.__annotations__ = {
+        name: param.annotation for name, param in tool.__signature__.parameters.items()
+        if param.annotation is not param.empty
+    }
+    if tool.__signature__.return_annotation is not inspect.Signature.empty:
+        tool.__annotations__["return"] = tool.__signature__.return_annotation
+    if spec.get("side_effects"):
+        side_effects(tool)
+    return tool
+
+class ToolManifest:
+    """
+    Cached description of the tool modules in `tools/`, keyed by file name and checked
+    against each file's SHA-256, so unchanged modules need not be imported to declare
+    their tools.
+    """
+    def __init__(self, path: str = "data/tool_manifest.json"):
+        self.path = Path(path)
+        self.modules = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                with self.path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.modules = data.get("modules", {})
+            except Exception as e:
+                logger.error(f"Error reading tool manifest {self.path}: {e}")
+
+    def lookup(self, tool_file: Path, digest: str) -> Optional[dict]:
+        """Return the record for `tool_file` if it was made from content with `digest`."""
+        entry = self.modules.get(tool_file.name)
+        if entry is None or entry.get("sha256") != digest:
+            return None
+        try:
+            for spec in entry["functions"]:
+                signature_of(spec)
+        except Exception as e:
+            logger.warning(f"Ignoring unusable manifest record for {tool_file.name}: {e}")
+            return None
+        return entry
+
+    def record(self, tool_file: Path, digest: str, tool_name: str, tools: List[Callable]) -> None:
+        """Remember a freshly imported module's tools; modules that cannot be described are dropped."""
+        try:
+            functions = [describe(tool) for tool in tools]
+        except (ValueError, TypeError) as e:
+            logger.debug(f"{tool_file.name} will load eagerly: {e}")
+            functions = None
+        if functions is None:
+            if self.modules.pop(tool_file.name, None) is not None:
+                self._dirty = True
+            return
+        self.modules[tool_file.name] = {"sha256": digest, "tool": tool_name, "functions": functions}
+        self._dirty = True
+
+    def prune(self, names) -> None:
+        """Forget modules whose file no longer exists."""
+        for name in set(self.modules) - set(names):
+            del self.modules[name]
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            atomic_write_text(self.path, json.dumps({"version": MANIFEST_VERSION, "modules": self.modules}, indent=2))
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Error writing tool manifest {self.path}: {e}")
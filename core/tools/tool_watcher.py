@@ -0,0 +1,69 @@
+import threading
+from typing import Callable
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+class ToolWatcher:
+    """
+    Polls the tool directory and hot-reloads tool modules that were added, edited or removed.
+
+    A cheap stat of tools/*.py (modification time and size) runs every `interval_seconds`;
+    only when it differs does the ToolManager hash the files and re-import the modules
+    whose content actually changed. `on_change(tools)` is then called on the watcher
+    thread with the new tool list; it should hand the tools to the agent between turns.
+    """
+    def __init__(self, manager, on_change: Callable, interval_seconds: float = 2.0):
+        self.manager = manager
+        self.on_change = on_change
+        self.interval_seconds = max(0.1, interval_seconds)
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = None
+
+    def _stat(self) -> dict:
+        snapshot = {}
+        for tool_file in self.manager.tool_dir.glob("*.py"):
+            try:
+                stat = tool_file.stat()
+            except OSError:
+                continue
+            snapshot[tool_file.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def check(self) -> bool:
+        """Reload changed modules now. Returns True if the tool list changed."""
+        snapshot = self._stat()
+        if snapshot == self._snapshot:
+            return False
+        self._snapshot = snapshot
+        if not self.manager.reload_changed():
+            return False
+        self.on_change(list(self.manager.tools))
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Tool watcher error: {e}")
+
+    def start(self) -> "ToolWatcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="iris-tool-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        self._thread = None
+
+def load_tool_watcher(loading_conf: dict, manager, on_change: Callable):
+    """Build the ToolWatcher described by the tool_loading config section, or None when disabled."""
+    if not loading_conf.get("watch", False):
+        return None
+    return ToolWatcher(manager, on_change, interval_seconds=loading_conf.get("watch_interval_seconds", 2.0))
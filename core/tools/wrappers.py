@@ -0,0 +1,38 @@
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+def make_async(func: Callable, executor: ThreadPoolExecutor = None) -> Callable:
+    """
+    Return an awaitable version of a tool callable.
+
+    Coroutine functions are returned unchanged. Synchronous tools are wrapped in a
+    coroutine that runs them on `executor` (the loop's default executor when None),
+    so a slow tool never blocks the event loop. The wrapper keeps the original name,
+    docstring and signature, which the Gemini SDK reads to build the function declaration.
+
+    Parameters:
+        func (Callable): The tool to wrap.
+        executor (ThreadPoolExecutor): Optional pool that bounds concurrent tool threads.
+
+    Returns:
+        Callable: A coroutine function with the same signature as `func`.
+    """
+    if inspect.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    # Bound methods: expose the signature without `self` rather than letting
+    # inspect follow __wrapped__ through to the underlying function.
+    wrapper.__signature__ = inspect.signature(func)
+    return wrapper
+
+def make_async_tools(tools: List[Callable], executor: ThreadPoolExecutor = None) -> List[Callable]:
+    """Wrap every tool in `tools` with make_async, preserving order."""
+    return [make_async(tool, executor) for tool in tools]
@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import time
+import platform
+import threading
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+REPORT_VERSION = 1
+
+def _rss_bytes() -> int:
+    """Resident set size of this process, or 0 where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        import resource
+        # ru_maxrss is a high-water mark in KiB on Linux (bytes on macOS); good enough for deltas.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return 0
+
+@dataclass
+class PhaseTiming:
+    name: str
+    parent: Optional[str]
+    wall_seconds: float = 0.0
+    import_seconds: float = 0.0
+    imports: int = 0
+    rss_delta_bytes: int = 0
+
+class _ImportTimer:
+    """
+    sys.meta_path hook that times module execution. It asks the other finders for the
+    spec and wraps the loader's exec_module; time spent importing nested modules is
+    subtracted, so each module is charged only its own execution time.
+    """
+    def __init__(self, profiler: "StartupProfiler"):
+        self.profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                find = getattr(finder, "find_spec", None)
+                if finder is self or find is None:
+                    continue
+                spec = find(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._local.finding = False
+        loader = getattr(spec, "loader", None)
+        # Class-level loaders (builtin, frozen) are shared by every module; leave them alone.
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        exec_module = loader.exec_module
+        if getattr(exec_module, "__iris_timed__", False):
+            return spec
+        profiler = self.profiler
+
+        def timed_exec_module(module):
+            profiler._time_import(module.__name__, exec_module, module)
+
+        timed_exec_module.__iris_timed__ = True
+        try:
+            loader.exec_module = timed_exec_module
+        except (AttributeError, TypeError):
+            pass
+        return spec
+
+class StartupProfiler:
+    """
+    Measures IRIS start-up: wall time, import time and RSS growth per phase.
+
+    Disabled by default, so `phase()` costs nothing in normal runs. `enable()` installs
+    an import hook; phases nest (tool modules run inside the "tools" phase) and each
+    import's own time is charged to every phase open on its thread. `finish()` prints
+    a summary, optionally writes a JSON report and removes the hook.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.report_path = None
+        self.phases: List[PhaseTiming] = []
+        self.imports = []
+        self._hook = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = None
+        self._rss_start = 0
+
+    def enable(self, report_path: str = None) -> "StartupProfiler":
+        self.enabled = True
+        self.report_path = report_path
+        self._started = time.perf_counter()
+        self._rss_start = _rss_bytes()
+        self._hook = _ImportTimer(self)
+        sys.meta_path.insert(0, self._hook)
+        return self
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "phases"):
+            self._local.phases = []
+            self._local.imports = []
+        return self._local.phases
+
+    def _time_import(self, name: str, exec_module, module) -> None:
+        phases = self._stack()
+        import_stack = self._local.imports
+        import_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - import_stack.pop()
+            if import_stack:
+                import_stack[-1] += elapsed
+            with self._lock:
+                self.imports.append((name, elapsed, own))
+                for timing in phases:
+                    timing.import_seconds += own
+                    timing.imports += 1
+
+    @contextmanager
+    def _measure(self, name: str, parent: str = None):
+        phases = self._stack()
+        if parent is None and phases:
+            parent = phases[-1].name
+        timing = PhaseTiming(name, parent)
+        with self._lock:
+            self.phases.append(timing)
+        phases.append(timing)
+        rss = _rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.wall_seconds = time.perf_counter() - start
+            timing.rss_delta_bytes = _rss_bytes() - rss
+            phases.remove(timing)
+
+    def phase(self, name: str, parent: str = None):
+        """
+        Context manager timing one start-up phase. `parent` defaults to the phase open on
+        this thread; pass it explicitly for work done on other threads.
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(name, parent)
+
+    def report(self) -> dict:
+        with self._lock:
+            slowest = sorted(self.imports, key=lambda item: item[2], reverse=True)[:25]
+            phases = [asdict(timing) for timing in self.phases]
+            import_seconds = sum(own for _, _, own in self.imports)
+            import_count = len(self.imports)
+        return {
+            "version": REPORT_VERSION,
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pid": os.getpid(),
+            "total_seconds": time.perf_counter() - self._started if self._started else 0.0,
+            "import_seconds": import_seconds,
+            "imports": import_count,
+            "rss_delta_bytes": _rss_bytes() - self._rss_start,
+            "phases": [p for p in phases if not p["name"].startswith("tool:")],
+            "tool_modules": [p for p in phases if p["name"].startswith("tool:")],
+            "slowest_imports": [
+                {"module": name, "seconds": elapsed, "self_seconds": own} for name, elapsed, own in slowest
+            ],
+        }
+
+    def print_report(self, report: dict) -> None:
+        from rich.console import Console
+        from rich.table import Table
+        table = Table(title=f"Startup profile: {report['total_seconds']:.2f}s, "
+                            f"{report['imports']} imports in {report['import_seconds']:.2f}s")
+        for column in ("Phase", "Wall (s)", "Imports (s)", "Modules", "RSS delta (MB)"):
+            table.add_column(column, justify="left" if column == "Phase" else "right")
+        children = {}
+        for timing in report["tool_modules"]:
+            children.setdefault(timing["parent"], []).append(timing)
+        for timing in report["phases"]:
+            for row in [timing] + children.pop(timing["name"], []):
+                indent = "  " if row is not timing else ""
+                table.add_row(f"{indent}{row['name']}", f"{row['wall_seconds']:.3f}",
+                              f"{row['import_seconds']:.3f}", str(row["imports"]),
+                              f"{row['rss_delta_bytes'] / 1048576:+.1f}")
+        for orphans in children.values():
+            for row in orphans:
+                table.add_row(row["name"], f"{row['wall_seconds']:.3f}", f"{row['import_seconds']:.3f}",
+                              str(row["imports"]), f"{row['rss_delta_bytes'] / 1048576:+.1f}")
+        Console().print(table)
+
+    def finish(self) -> Optional[dict]:
+        """Stop profiling; print the summary and write the JSON report if a path was given."""
+        if not self.enabled:
+            return None
+        self.enabled = False
+        if self._hook in sys.meta_path:
+            sys.meta_path.remove(self._hook)
+        report = self.report()
+        self.print_report(report)
+        if self.report_path:
+            path = Path(self.report_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return report
+
+_profiler = StartupProfiler()
+
+def get_profiler() -> StartupProfiler:
+    return _profiler
@@ -0,0 +1,38 @@
+import re
+
+# A sentence ends at ., ! or ? (optionally followed by closing quotes/brackets) and then whitespace,
+# or at a blank line.
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n")
+
+class SentenceSplitter:
+    """
+    Incrementally splits streamed text into complete sentences for text-to-speech.
+    """
+    def __init__(self, min_length: int = 12):
+        # Very short fragments ("e.g.", "1.") are merged into the next sentence.
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> list:
+        """
+        Add a chunk of text and return the sentences it completed.
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_length:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        """
+        Return whatever text is left once the stream has ended.
+        """
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest
@@ -0,0 +1,34 @@
+import queue
+import threading
+from core.utils.logger import get_logger
+
+logger = get_logger()
+
+class SpeechQueue:
+    """
+    Speaks queued sentences one after another on a dedicated thread, so the
+    caller can keep rendering a streamed response while earlier sentences play.
+    """
+    def __init__(self, tts):
+        self.tts = tts
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="iris-tts", daemon=True)
+        self._thread.start()
+
+    def say(self, text: str) -> None:
+        if text:
+            self._queue.put(text)
+
+    def wait(self) -> None:
+        """Block until everything queued so far has been spoken."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            text = self._queue.get()
+            try:
+                self.tts.speak(text)
+            except Exception as e:
+                logger.error(f"TTS speak error: {e}")
+            finally:
+                self._queue.task_done()
@@ -17,7 +17,7 @@ class UIHandler:
         self.console = Console()
         self.tts = get_tts()
 
-    def print_message(self, message: str, style: str = None, panel_title: str = None, sender: str = None, timestamp: str = None):
+    def _panel(self, message: str, style: str = None, panel_title: str = None, sender: str = None, timestamp: str = None):
         from rich import box
         if sender:
             if timestamp:
@@ -37,7 +37,29 @@ class UIHandler:
                 rich_style = "cyan"
         else:
             rich_style = self.STYLE_MAPPING.get(style, style)
-        self.console.print(Panel(message, title=title, style=rich_style, box=box.ROUNDED, expand=False))
+        return Panel(message, title=title, style=rich_style, box=box.ROUNDED, expand=False)
+
+    def print_message(self, message: str, style: str = None, panel_title: str = None, sender: str = None, timestamp: str = None):
+        self.console.print(self._panel(message, style, panel_title, sender, timestamp))
+
+    def stream_message(self, chunks, style: str = None, sender: str = None, timestamp: str = None, on_chunk=None) -> str:
+        """
+        Render a chat bubble that grows as text chunks arrive and return the full text.
+
+        Parameters:
+            chunks: Iterable of text chunks.
+            on_chunk (callable): Optional callback invoked with each chunk as it is rendered.
+        """
+        from rich.live import Live
+        text = ""
+        with Live(self._panel("...", style, None, sender, timestamp), console=self.console,
+                  refresh_per_second=15, transient=False) as live:
+            for chunk in chunks:
+                text += chunk
+                live.update(self._panel(text, style, None, sender, timestamp))
+                if on_chunk:
+                    on_chunk(chunk)
+        return text
 
     def get_input(self, prompt: str = "You: ") -> str:
         from rich.prompt import Prompt
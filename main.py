@@ -1,7 +1,7 @@
 import warnings
 import argparse
-from core import app
 from core.utils.logger import get_logger
+from core.utils.profiler import get_profiler
 
 warnings.filterwarnings("ignore")
 
@@ -9,9 +9,26 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="IRIS application")
     parser.add_argument("--log-level", type=str, choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], 
                         default="WARNING", help="Set the logging level (default: WARNING)")
+    parser.add_argument("--server", action="store_true",
+                        help="Serve many users over HTTP/WebSocket instead of the terminal UI")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report wall time, import time and memory growth of each start-up phase and tool module")
+    parser.add_argument("--profile-report", type=str, default=None, metavar="PATH",
+                        help="With --profile-startup, also write the report as JSON to PATH")
     args = parser.parse_args()
 
     logger = get_logger(level=args.log_level)
     logger.success(f"Log level set to {args.log_level}")
 
-    app.main()
\ No newline at end of file
+    profiler = get_profiler()
+    if args.profile_startup:
+        profiler.enable(args.profile_report)
+
+    # Imported after the profiler is enabled so module imports are measured too.
+    with profiler.phase("imports"):
+        from core import app, server
+
+    if args.server:
+        server.main()
+    else:
+        app.main()
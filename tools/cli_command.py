@@ -1,7 +1,42 @@
 from core.tools.tool_interface import ToolInterface, ToolContext
+from core.tools.tool_flags import side_effects
+from core.tools.isolation import isolated, kill_process_group, track_process_group, untrack_process_group
 from typing import List, Callable
+import os
 import subprocess
 
+MAX_OUTPUT_CHARS = 20000
+
+@isolated(timeout_seconds=120, max_output_chars=MAX_OUTPUT_CHARS)
+def run_shell_command(command: str) -> str:
+    """
+    Run `command` in a shell and return its combined stdout and stderr, followed by the
+    exit code when it is not zero. Runs in a worker process; reading stops after
+    MAX_OUTPUT_CHARS, and the command is then killed.
+    """
+    # A session of its own, so the whole pipeline (not only the shell) can be killed.
+    new_session = hasattr(os, "killpg")
+    process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, errors="replace", start_new_session=new_session)
+    if new_session:
+        track_process_group(process.pid)
+    try:
+        output = process.stdout.read(MAX_OUTPUT_CHARS + 1)
+        truncated = len(output) > MAX_OUTPUT_CHARS
+        if truncated:
+            if new_session:
+                kill_process_group(process.pid)
+            else:
+                process.kill()
+        process.stdout.close()
+        returncode = process.wait()
+    finally:
+        if new_session:
+            untrack_process_group(process.pid)
+    if returncode and not truncated:
+        return f"{output}\n[command exited with code {returncode}]"
+    return output
+
 class CommandTool(ToolInterface):
     @property
     def name(self) -> str:
@@ -10,12 +45,11 @@ class CommandTool(ToolInterface):
     def register(self, context: ToolContext) -> List[Callable]:
         context.success("Registering CommandTool tools.")
 
+        @side_effects
         def execute_command_tool(command: str) -> str:
             context.success(f"Executing command: {command}")
             try:
-                result = subprocess.check_output(
-                    command, shell=True, stderr=subprocess.STDOUT, text=True
-                )
+                result = run_shell_command(command)
                 context.success(f"Command output: {result}")
                 return result
             except Exception as e:
@@ -1,5 +1,6 @@
 from youtubesearchpython import VideosSearch
 from core.tools.tool_interface import ToolInterface
+from core.tools.result_cache import cache_result
 
 class ExtractYoutubeVideoIDTool(ToolInterface):
     @property
@@ -16,6 +17,7 @@ class ExtractYoutubeVideoIDTool(ToolInterface):
         """
         context.debug("Registering ExtractYoutubeVideoIDTool.")
         
+        @cache_result(ttl_seconds=86400)
         def extract_youtube_video_id(query: str) -> str:
             """
             Search YouTube for the given query and return the id of the first video found. Can be used to play videos in frontend.
@@ -1,6 +1,8 @@
 import PyPDF2
 from pathlib import Path
 from core.tools.tool_interface import ToolInterface, ToolContext
+from core.tools.tool_flags import side_effects
+from core.tools.isolation import isolated
 from typing import List, Callable
 import subprocess
 import os
@@ -9,6 +11,8 @@ import os
 def extract_text_from_pdf(pdf_file_path: str, context: ToolContext) -> str:
     """
     Extracts text from a single PDF file or all PDF files within a directory.
+    Parsing runs in a worker process with time, CPU and memory limits, so a huge or
+    malformed PDF cannot stall the assistant.
     
     Args:
         pdf_file_path (str): The path to a PDF file or a directory containing PDF files.
@@ -18,7 +22,20 @@ def extract_text_from_pdf(pdf_file_path: str, context: ToolContext) -> str:
         str: The extracted text. If multiple files are read, each file's content is 
              prefixed with a header indicating the file name.
     """
+    try:
+        text, messages = read_pdf_text(pdf_file_path)
+    except Exception as e:
+        context.error(f"Error reading {pdf_file_path}: {e}")
+        return f"Error reading {pdf_file_path}: {e}"
+    for level, message in messages:
+        getattr(context, level)(message)
+    return text
+
+@isolated(timeout_seconds=120, cpu_seconds=90, memory_mb=2048, max_output_chars=500000)
+def read_pdf_text(pdf_file_path: str) -> tuple:
+    """Extract the text of a PDF file or directory. Returns (text, [(log level, message), ...])."""
     text = ""
+    messages = []
     path = Path(pdf_file_path)
     
     if path.is_dir():
@@ -34,9 +51,9 @@ def extract_text_from_pdf(pdf_file_path: str, context: ToolContext) -> str:
                             file_text += page_text
                 if file_text:
                     text += f"--- Content from: {pdf.name} ---\n{file_text}\n\n"
-                    context.success(f"Extracted text from PDF: {pdf.name}")
+                    messages.append(("success", f"Extracted text from PDF: {pdf.name}"))
             except Exception as e:
-                context.error(f"Error reading file {pdf.name}: {e}")
+                messages.append(("error", f"Error reading file {pdf.name}: {e}"))
                 text += f"Error reading file {pdf.name}: {e}\n"
     else:
         # Process a single PDF file
@@ -47,12 +64,12 @@ def extract_text_from_pdf(pdf_file_path: str, context: ToolContext) -> str:
                     page_text = page.extract_text()
                     if page_text:
                         text += page_text
-            context.success(f"Extracted text from PDF: {pdf_file_path}")
+            messages.append(("success", f"Extracted text from PDF: {pdf_file_path}"))
         except Exception as e:
-            context.error(f"Error reading {pdf_file_path}: {e}")
+            messages.append(("error", f"Error reading {pdf_file_path}: {e}"))
             text = f"Error reading {pdf_file_path}: {e}"
     
-    return text
+    return text, messages
 
 class OpenPDFTool(ToolInterface):
     @property
@@ -62,6 +79,7 @@ class OpenPDFTool(ToolInterface):
     def register(self, context: ToolContext) -> List[Callable]:
         context.success("Registering OpenPDFTool tools.")
 
+        @side_effects
         def open_pdf(filepath: str) -> str:
             try:
                 if os.path.exists(filepath):
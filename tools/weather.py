@@ -2,6 +2,7 @@ import requests
 from bs4 import BeautifulSoup
 from core.utils.logger import get_logger
 from core.tools.tool_interface import ToolInterface, ToolContext
+from core.tools.result_cache import cache_result
 from typing import List, Callable
 
 logger = get_logger()
@@ -43,6 +44,7 @@ class WeatherTool(ToolInterface):
     def register(self, context: ToolContext) -> List[Callable]:
         context.success("Registering WeatherTool tools.")
 
+        @cache_result(ttl_seconds=600)
         def get_weather(city: str) -> str:
             try:
                 response = requests.get(f"https://wttr.in/{city}?format=3")
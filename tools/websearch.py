@@ -13,6 +13,11 @@ from tenacity import retry, stop_after_attempt, wait_exponential, before_sleep_l
 from typing import List, Callable
 from core.tools.tool_interface import ToolInterface  # Refactored naming
 from core.tools.tool_context import ToolContext      # Refactored naming
+from core.tools.result_cache import cache_result, is_cacheable_result
+
+def has_page_content(result) -> bool:
+    """Cache test for searches: at least one page was fetched, so not "No results found." or only fetch errors."""
+    return is_cacheable_result(result) and "--- Content from " in result
 
 class WebSearch:
     def __init__(self, max_results=7, concurrency=5):
@@ -92,6 +97,7 @@ class WebSearchTool(ToolInterface):
         # Instantiate our local WebSearch implementation.
         web_search_instance = WebSearch()
 
+        @cache_result(ttl_seconds=3600, cache_if=has_page_content)
         def websearch(query: str) -> str:
             context.info(f"Performing web search for: {query}")
             return web_search_instance.search(query)
@@ -2,6 +2,7 @@ import os
 import wolframalpha
 from core.utils.logger import get_logger
 from core.tools.tool_interface import ToolInterface, ToolContext
+from core.tools.result_cache import cache_result
 from typing import List, Callable
 
 logger = get_logger()
@@ -14,6 +15,8 @@ class WolframTool(ToolInterface):
     def register(self, context: ToolContext) -> List[Callable]:
         context.success("Registering WolframTool tools.")
 
+        # Short TTL: answers such as the local time or weather change quickly.
+        @cache_result(ttl_seconds=600)
         def query_wolfram_alpha(query: str) -> str:
             context.success(f"Querying Wolfram Alpha for: {query}")
             try:
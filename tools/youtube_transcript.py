@@ -1,4 +1,5 @@
 from core.tools.tool_interface import ToolInterface
+from core.tools.result_cache import cache_result
 from youtubesearchpython import VideosSearch
 from youtube_transcript_api import YouTubeTranscriptApi
 
@@ -17,6 +18,8 @@ class YoutubeTranscriptTool(ToolInterface):
         self.ctx = context
         return [self.fetch_transcript]
 
+    # Transcripts do not change; video ids are case-sensitive, so only whitespace is trimmed.
+    @cache_result(key=lambda video_id: video_id.strip() if isinstance(video_id, str) else video_id)
     def fetch_transcript(self, video_id: str):
         """
         Fetches the transcript of a YouTube video. Used when user asks to watch the video, meaning to understand the video content. Get the video id from other tools if input in just plain search term.
@@ -36,10 +39,8 @@ class YoutubeTranscriptTool(ToolInterface):
             self.ctx.error(f"Error fetching transcript for video id {video_id}: {e}")
             return None
 
-        transcript_text = ""
-        # Iterate over the transcript snippets (each snippet is a dict with a 'text' entry).
-        for snippet in fetched_transcript:
-            transcript_text += snippet.get("text", "")
+        # Each snippet is a dict with a 'text' entry; keep a space between them so words stay apart.
+        transcript_text = " ".join(snippet.get("text", "").strip() for snippet in fetched_transcript)
 
         snippet_count = len(fetched_transcript)
         last_snippet = fetched_transcript[-1] if snippet_count > 0 else None